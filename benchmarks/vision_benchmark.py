@@ -0,0 +1,347 @@
+"""
+비전 파이프라인 벤치마크.
+
+캡처→인원수 지연 시간, 추론 FPS, 감지 스트림 JPEG 인코딩 비용, 스트림 시청자당
+메모리를 측정하여 JSON으로 출력하고, 저장된 기준 결과와 비교합니다.
+
+사용 예 (저장소 루트에서 실행):
+    # 카메라 없이 생성 프레임으로 CPU 전용 측정
+    python -m benchmarks.vision_benchmark --source synthetic --profile cpu
+
+    # 녹화된 영상으로 측정하고 기준 결과로 저장
+    python -m benchmarks.vision_benchmark --source clip.mp4 --output baseline.json
+
+    # 기준 결과와 비교 (허용 오차를 넘게 느려지면 종료 코드 1)
+    python -m benchmarks.vision_benchmark --source clip.mp4 --baseline baseline.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+# 인코딩 비용을 측정할 (JPEG 품질, 너비) 조합 기본값
+DEFAULT_VARIANTS = "80x0,60x640"
+
+# 인코딩 측정에 사용할 (프레임, 감지 결과) 표본 수
+ENCODE_SAMPLES = 30
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="비전 파이프라인 벤치마크")
+    parser.add_argument(
+        "--source",
+        default="synthetic:1280x720",
+        help="프레임 공급원 (synthetic[:WxH], 동영상 파일, 이미지 디렉토리, 카메라 인덱스)",
+    )
+    parser.add_argument(
+        "--profile",
+        choices=["default", "cpu"],
+        default="default",
+        help="cpu이면 GPU를 숨기고 서버 프로세스 안에서만 추론",
+    )
+    parser.add_argument("--backend", help="DETECTOR_BACKEND 대신 사용할 추론 백엔드")
+    parser.add_argument("--frames", type=int, default=100, help="측정할 프레임 수")
+    parser.add_argument("--warmup", type=int, default=5, help="측정 전 버릴 프레임 수")
+    parser.add_argument(
+        "--realtime",
+        action="store_true",
+        help="파일/디렉토리를 원래 속도로 재생 (기본값: 가능한 한 빠르게)",
+    )
+    parser.add_argument(
+        "--variants",
+        default=DEFAULT_VARIANTS,
+        help="인코딩을 측정할 품질x너비 목록 (쉼표로 구분, 너비 0은 원본)",
+    )
+    parser.add_argument(
+        "--viewers", type=int, default=4, help="메모리 측정에 사용할 스트림 시청자 수"
+    )
+    parser.add_argument(
+        "--skip-stream", action="store_true", help="스트림 시청자 메모리 측정 생략"
+    )
+    parser.add_argument("--output", help="결과 JSON을 저장할 경로 (없으면 표준 출력)")
+    parser.add_argument("--baseline", help="비교할 기준 결과 JSON 경로")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.15,
+        help="기준 대비 허용하는 성능 저하 비율 (0.15 = 15%%)",
+    )
+    return parser.parse_args(argv)
+
+
+def configure_environment(args):
+    """
+    설정 모듈을 import하기 전에 벤치마크용 환경변수를 지정합니다.
+    """
+    # 서버 설정이 없어도 config.py를 import할 수 있도록 기본값 지정
+    os.environ.setdefault("BUS_STOP_ID", "0")
+    # 스트림 측정은 프레임 버스를 통하므로 같은 공급원을 사용
+    os.environ["FRAME_SOURCE"] = args.source
+    os.environ["FRAME_SOURCE_LOOP"] = "true"
+    os.environ["FRAME_SOURCE_REALTIME"] = "true" if args.realtime else "false"
+    if args.backend:
+        os.environ["DETECTOR_BACKEND"] = args.backend
+    if args.profile == "cpu":
+        os.environ["CUDA_VISIBLE_DEVICES"] = ""
+        os.environ["INFERENCE_WORKERS"] = "0"
+
+
+def parse_variants(text):
+    variants = []
+    for item in text.split(","):
+        quality, _, width = item.strip().lower().partition("x")
+        variants.append((int(quality), int(width or 0)))
+    return variants
+
+
+def _percentile_ms(values, q):
+    return round(float(np.percentile(values, q)) * 1000, 3) if values else None
+
+
+def bench_pipeline(args):
+    """
+    공급원에서 프레임을 읽어 사람을 감지하고 세는 경로를 측정합니다.
+
+    Returns:
+        (지표 딕셔너리, 인코딩 측정용 (프레임, 감지 결과) 표본 목록)
+    """
+    from services.detections import count as count_detections
+    from services.yolo_tracker import DetectionResult, get_detector
+    from utils.frame_source import open_frame_source
+
+    detector = get_detector()
+    detector.warmup()
+
+    source = open_frame_source(args.source, realtime=args.realtime, loop=True)
+    source.open()
+    latencies = []
+    inference_times = []
+    read_times = []
+    people = []
+    samples = []
+    try:
+        for index in range(args.warmup + args.frames):
+            read_started = time.monotonic()
+            frame, captured_at = source.read()
+            read_finished = time.monotonic()
+
+            detections = detector.detect(frame, captured_at)
+            inferred = time.monotonic()
+            people.append(count_detections(detections))
+            counted = time.monotonic()
+
+            if index < args.warmup:
+                continue
+            read_times.append(read_finished - read_started)
+            inference_times.append(inferred - read_finished)
+            latencies.append(counted - captured_at)
+            if len(samples) < ENCODE_SAMPLES:
+                result = DetectionResult(index, captured_at, detections)
+                samples.append((frame.copy(), result))
+    finally:
+        source.release()
+
+    total_inference = sum(inference_times)
+    metrics = {
+        "capture_to_count_ms_p50": _percentile_ms(latencies, 50),
+        "capture_to_count_ms_p95": _percentile_ms(latencies, 95),
+        "capture_read_ms_p50": _percentile_ms(read_times, 50),
+        "inference_ms_p50": _percentile_ms(inference_times, 50),
+        "inference_ms_p95": _percentile_ms(inference_times, 95),
+        "inference_fps": (
+            round(len(inference_times) / total_inference, 2)
+            if total_inference
+            else None
+        ),
+        "people_mean": round(float(np.mean(people)), 3) if people else 0.0,
+    }
+    return metrics, samples
+
+
+def bench_encode(samples, variants, repeats=3):
+    """
+    감지 스트림이 프레임마다 수행하는 오버레이 그리기와 JPEG 인코딩 비용을 측정합니다.
+    """
+    from services.detection_stream import encode_jpeg
+    from services.yolo_tracker import get_detection_frame
+
+    metrics = {}
+    overlay_times = []
+    for frame, detections in samples:
+        started = time.perf_counter()
+        get_detection_frame(frame, detections)
+        overlay_times.append(time.perf_counter() - started)
+    metrics["overlay_ms_p50"] = _percentile_ms(overlay_times, 50)
+
+    annotated = [
+        get_detection_frame(frame, detections) for frame, detections in samples
+    ]
+    for quality, width in variants:
+        times = []
+        sizes = []
+        for _ in range(repeats):
+            for frame in annotated:
+                started = time.perf_counter()
+                data = encode_jpeg(frame, quality, width)
+                times.append(time.perf_counter() - started)
+                sizes.append(len(data))
+        name = f"q{quality}_w{width}"
+        metrics[f"encode_ms_p50_{name}"] = _percentile_ms(times, 50)
+        metrics[f"encode_ms_p95_{name}"] = _percentile_ms(times, 95)
+        metrics[f"jpeg_bytes_{name}"] = int(np.mean(sizes)) if sizes else 0
+    return metrics
+
+
+async def _watch_stream(viewers, frames, quality, width):
+    # 시청자들이 각자 frames장을 받은 상태(스트림 유지 중)에서의 메모리를 측정
+    from routers.vision import generate_frames
+
+    streams = [generate_frames(quality, width, fps=30) for _ in range(viewers)]
+
+    async def consume(stream):
+        for _ in range(frames):
+            await stream.__anext__()
+
+    try:
+        await asyncio.wait_for(
+            asyncio.gather(*(consume(stream) for stream in streams)), timeout=120
+        )
+        return tracemalloc.get_traced_memory()[0]
+    finally:
+        for stream in streams:
+            await stream.aclose()
+
+
+def _rss_bytes():
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.Process().memory_info().rss
+
+
+def bench_stream_memory(viewers, frames=10, quality=80, width=0):
+    """
+    감지 스트림 시청자 수에 따른 파이썬 힙 사용량을 비교하여 시청자당 메모리를 구합니다.
+    """
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        rss_before = _rss_bytes()
+        single = asyncio.run(_watch_stream(1, frames, quality, width)) - baseline
+        many = asyncio.run(_watch_stream(viewers, frames, quality, width)) - baseline
+        rss_after = _rss_bytes()
+    finally:
+        tracemalloc.stop()
+
+    metrics = {
+        "stream_heap_bytes_1_viewer": single,
+        f"stream_heap_bytes_{viewers}_viewers": many,
+        "stream_heap_bytes_per_viewer": (
+            int((many - single) / (viewers - 1)) if viewers > 1 else single
+        ),
+    }
+    if rss_before is not None:
+        metrics["stream_rss_growth_bytes"] = rss_after - rss_before
+    return metrics
+
+
+def higher_is_better(name):
+    return name.endswith("_fps")
+
+
+def compare(results, baseline, tolerance):
+    """
+    기준 결과와 비교하여 허용 오차보다 나빠진 지표 목록을 반환합니다.
+    """
+    regressions = []
+    base_metrics = baseline.get("metrics", {})
+    for name, value in results["metrics"].items():
+        base = base_metrics.get(name)
+        if not isinstance(value, (int, float)) or not isinstance(base, (int, float)):
+            continue
+        if name.startswith(("people_", "jpeg_bytes_")) or base <= 0:
+            # 측정값이 아닌 참고용 지표
+            continue
+        change = (value - base) / base
+        if higher_is_better(name):
+            regressed = change < -tolerance
+        else:
+            regressed = change > tolerance
+        marker = "저하" if regressed else "ok"
+        print(f"  {name}: {base} -> {value} ({change:+.1%}) {marker}", file=sys.stderr)
+        if regressed:
+            regressions.append(name)
+    return regressions
+
+
+def run(args):
+    configure_environment(args)
+    # 저장소 루트에서 실행하지 않아도 프로젝트 모듈을 찾을 수 있도록 경로 추가
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    from config import DETECTOR_BACKEND, INFERENCE_WORKERS, YOLO_IMGSZ, YOLO_MODEL
+
+    metrics, samples = bench_pipeline(args)
+    metrics.update(bench_encode(samples, parse_variants(args.variants)))
+    if not args.skip_stream:
+        metrics.update(bench_stream_memory(args.viewers))
+
+    return {
+        "meta": {
+            "source": args.source,
+            "profile": args.profile,
+            "backend": DETECTOR_BACKEND,
+            "model": YOLO_MODEL,
+            "imgsz": YOLO_IMGSZ,
+            "inference_workers": INFERENCE_WORKERS,
+            "frames": args.frames,
+            "realtime": args.realtime,
+            "python": platform.python_version(),
+            "machine": f"{platform.system()} {platform.machine()}",
+            "cpu_count": os.cpu_count(),
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "metrics": metrics,
+    }
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = run(args)
+
+    text = json.dumps(results, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+        print(f"벤치마크 결과 저장: {args.output}", file=sys.stderr)
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+        for key in ("source", "profile", "backend", "imgsz"):
+            if baseline.get("meta", {}).get(key) != results["meta"][key]:
+                print(
+                    f"경고: 기준 결과와 {key} 설정이 다릅니다 "
+                    f"({baseline.get('meta', {}).get(key)} != {results['meta'][key]})",
+                    file=sys.stderr,
+                )
+        print(f"기준 결과와 비교 (허용 오차 {args.tolerance:.0%}):", file=sys.stderr)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"성능 저하 지표: {', '.join(regressions)}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
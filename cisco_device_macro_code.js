@@ -1,35 +1,63 @@
 import xapi from 'xapi';
 
-const BASE_URL = "챗봇 서버 주소";
+// 인원 수 이벤트를 모아서 받는 디바이스 컨트롤러 주소 (챗봇 서버로는 컨트롤러가 전달)
+const BASE_URL = "디바이스 컨트롤러 주소";
 const INTERVAL = 1000;
+// 모아 둔 이벤트를 전송하는 주기(ms)
+const FLUSH_INTERVAL = 2000;
+// 전송 실패 시 보관할 최대 이벤트 수 (넘으면 오래된 것부터 버림)
+const MAX_BUFFER = 500;
+// 디바이스 식별자 (컨트롤러 정류장 레지스트리의 device_id, 비워 두면 일련번호 사용)
+const DEVICE_ID = "";
+// 일련번호와 MAC 주소를 모두 조회하지 못했을 때 다시 시도할 간격(ms)
+// (모든 디바이스가 같은 기본 식별자를 쓰면 컨트롤러에서 정류장이 섞이므로 기본값 없이 재시도)
+const ID_RETRY_INTERVAL = 5000;
 
-let previousCount = 0;
+let previousCount = null;
+let deviceId = null;
+let seq = 0;
+let buffer = [];
+let sending = false;
+
+function logError(label, err) {
+  console.error(label);
+  console.error('━━━━━━━━━━━━━━━━━━━━━━━');
+  if (err.message) console.error('메시지:', err.message);
+  if (err.code !== undefined) console.error('오류 코드:', err.code);
+  if (err.stack) console.error('스택:', err.stack);
+  if (err.data) {
+    console.error('요청 데이터 정보:', JSON.stringify(err.data, null, 2));
+  }
+  console.error('━━━━━━━━━━━━━━━━━━━━━━━');
+}
+
+function flushEvents() {
+  if (sending || buffer.length === 0) return;
+
+  const events = buffer;
+  buffer = [];
+  sending = true;
 
-function postToEndpoint(endpoint, data = {}) {
   const payload = {
-    Url: `${BASE_URL}${endpoint}`,
+    Url: `${BASE_URL}/occupancy/events`,
     Header: ['Content-Type: application/json'],
     AllowInsecureHTTPS: true,
   };
+  const body = JSON.stringify({ events });
 
-  const body = JSON.stringify(data);
-
-  console.log(`[전송 시도] ${endpoint}로 요청:`, body);
+  console.log(`[전송 시도] 인원 수 이벤트 ${events.length}건`);
 
   xapi.command('HttpClient Post', payload, body)
     .then(() => {
-      console.log(`[전송 성공] ${endpoint}`);
+      console.log(`[전송 성공] 인원 수 이벤트 ${events.length}건`);
     })
     .catch(err => {
-      console.error(`[전송 실패] ${endpoint} 오류 발생`);
-      console.error('━━━━━━━━━━━━━━━━━━━━━━━');
-      if (err.message) console.error('메시지:', err.message);
-      if (err.code !== undefined) console.error('오류 코드:', err.code);
-      if (err.stack) console.error('스택:', err.stack);
-      if (err.data) {
-        console.error('요청 데이터 정보:', JSON.stringify(err.data, null, 2));
-      }
-      console.error('━━━━━━━━━━━━━━━━━━━━━━━');
+      // 다음 주기에 다시 보냄 (컨트롤러가 중복/순서를 정리함)
+      buffer = events.concat(buffer).slice(-MAX_BUFFER);
+      logError('[전송 실패] /occupancy/events 오류 발생', err);
+    })
+    .finally(() => {
+      sending = false;
     });
 }
 
@@ -45,13 +73,16 @@ function checkPeopleCount() {
 
       console.log('[현재 감지된 인원 수]:', currentCount);
 
-      // 상태 변화 감지
-      if (previousCount <= 0 && currentCount > 0) {
-        // 인원이 처음 감지됨
-        postToEndpoint('/sessionStart', { count: currentCount });
-      } else if (previousCount > 0 && currentCount === 0) {
-        // 모든 인원이 사라짐
-        postToEndpoint('/sessionReset');
+      // 인원 수가 바뀐 경우에만 이벤트로 기록 (세션 시작/종료 판단은 컨트롤러가 함)
+      if (currentCount !== previousCount) {
+        seq += 1;
+        buffer.push({
+          device_id: deviceId,
+          timestamp: Date.now() / 1000,
+          seq,
+          count: currentCount,
+        });
+        if (buffer.length > MAX_BUFFER) buffer.shift();
       }
 
       previousCount = currentCount;
@@ -59,5 +90,39 @@ function checkPeopleCount() {
     .catch(err => console.error('[카운트 조회 실패]', err.message));
 }
 
-// 주기적으로 감지
-setInterval(checkPeopleCount, INTERVAL);
\ No newline at end of file
+function start(id) {
+  deviceId = id;
+  console.log('[디바이스 식별자]:', deviceId);
+
+  // 주기적으로 감지하고 모아서 전송
+  setInterval(checkPeopleCount, INTERVAL);
+  setInterval(flushEvents, FLUSH_INTERVAL);
+}
+
+// 디바이스마다 고유한 식별자를 조회 (일련번호, 실패하면 이더넷 MAC 주소)
+function lookupDeviceId() {
+  return xapi.status.get('SystemUnit/Hardware/Module/SerialNumber')
+    .catch(err => {
+      logError('[일련번호 조회 실패] MAC 주소로 대신 조회', err);
+      return xapi.status.get('Network/1/Ethernet/MacAddress');
+    })
+    .then(id => {
+      if (!id) throw new Error('빈 식별자');
+      return id;
+    });
+}
+
+function startWithLookup() {
+  lookupDeviceId()
+    .then(start)
+    .catch(err => {
+      logError(`[디바이스 식별자 조회 실패] ${ID_RETRY_INTERVAL}ms 후 다시 시도`, err);
+      setTimeout(startWithLookup, ID_RETRY_INTERVAL);
+    });
+}
+
+if (DEVICE_ID) {
+  start(DEVICE_ID);
+} else {
+  startWithLookup();
+}
@@ -9,4 +9,98 @@ PASSWORD = os.getenv("DEVICE_PASSWORD")
 TARGET_EMAIL = os.getenv("TARGET_EMAIL")
 CHATBOT_SERVER = os.getenv("CHATBOT_SERVER")
 ADMIN_SERVER = os.getenv("ADMIN_SERVER")
-BUS_STOP_ID = int(os.getenv("BUS_STOP_ID"))
\ No newline at end of file
+BUS_STOP_ID = int(os.getenv("BUS_STOP_ID"))
+
+# 모션 게이트: 장면 변화가 있을 때만 YOLO 추론 실행 (기본값: 꺼짐)
+MOTION_GATING = os.getenv("MOTION_GATING", "false").lower() == "true"
+# 변화한 픽셀 비율이 이 값 이상이면 추론 (0~1)
+MOTION_THRESHOLD = float(os.getenv("MOTION_THRESHOLD", "0.01"))
+# 변화가 없어도 이 시간(초)이 지나면 추론
+MOTION_MAX_STALENESS = float(os.getenv("MOTION_MAX_STALENESS", "30"))
+
+# 사람 감지 추론 백엔드: torch(기본값), onnx, openvino
+DETECTOR_BACKEND = os.getenv("DETECTOR_BACKEND", "torch").lower()
+# YOLO 가중치 파일 (내보낸 ONNX/OpenVINO 모델도 같은 위치에 캐시됨)
+YOLO_MODEL = os.getenv("YOLO_MODEL", "yolov8n.pt")
+# 추론 입력 크기 (내보낸 모델은 이 크기로 고정됨)
+YOLO_IMGSZ = int(os.getenv("YOLO_IMGSZ", "640"))
+
+# 활성화할 라우터 목록 (쉼표로 구분, 예: "button,vision,occupancy,fleet")
+ENABLED_ROUTERS = [
+    name.strip()
+    for name in os.getenv("ENABLED_ROUTERS", "button").split(",")
+    if name.strip()
+]
+
+# 사람 감지를 별도 프로세스에서 실행할 워커 수 (0이면 서버 프로세스의 스레드에서 실행)
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "0"))
+
+# 인원 추적 방식: detect(매 샘플마다 감지, 기본값) 또는 keyframe(키프레임 감지 + 경량 추적)
+TRACKING_MODE = os.getenv("TRACKING_MODE", "detect").lower()
+# keyframe 모드에서 YOLO 감지를 실행할 프레임 간격 (그 사이의 프레임은 광학 흐름으로 추적)
+KEYFRAME_INTERVAL = int(os.getenv("KEYFRAME_INTERVAL", "5"))
+# 인원 추적 샘플링 간격(초). keyframe 모드는 사이 프레임이 가벼우므로 기본값을 줄여
+# 감지 횟수는 detect 모드와 비슷하게(초당 1회) 유지하면서 더 자주 샘플링함
+TRACKING_INTERVAL = float(
+    os.getenv("TRACKING_INTERVAL", "0.2" if TRACKING_MODE == "keyframe" else "1.0")
+)
+
+# 외부 서버 요청 제한 시간(초, 연결부터 응답 수신까지 전체)
+CHATBOT_TIMEOUT = float(os.getenv("CHATBOT_TIMEOUT", "3.0"))
+ADMIN_TIMEOUT = float(os.getenv("ADMIN_TIMEOUT", "5.0"))
+# 외부 서버별 최대 동시 연결 수 (연결은 keep-alive로 재사용)
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "4"))
+
+# 외부 서버로 보낼 이벤트(세션 시작/초기화, 비상 알림)를 저장하는 SQLite 파일
+OUTBOX_PATH = os.getenv("OUTBOX_PATH", "outbox.db")
+# 이벤트 전송 최대 시도 횟수. 넘으면 failed(전송 포기) 상태로 남기고 /outbox에 표시
+# (기본값 20회: 재시도 간격이 최대 5분이므로 약 1시간 동안 재시도)
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "20"))
+
+# 시스코 디바이스 xAPI 연결 방식 (스텁 서버로 시험할 때는 http)
+DEVICE_SCHEME = os.getenv("DEVICE_SCHEME", "https")
+# 디바이스 인증서 검증: false(기본값, 자체 서명 인증서), true, 또는 CA 번들 파일 경로
+DEVICE_VERIFY_TLS = os.getenv("DEVICE_VERIFY_TLS", "false")
+if DEVICE_VERIFY_TLS.lower() in ("true", "false"):
+    DEVICE_VERIFY_TLS = DEVICE_VERIFY_TLS.lower() == "true"
+# 디바이스 xAPI 요청 제한 시간(초)
+DEVICE_TIMEOUT = float(os.getenv("DEVICE_TIMEOUT", "5.0"))
+
+# 인원 수 공급원: yolo(기본값, 카메라 + YOLO) 또는 device(시스코 디바이스 RoomAnalytics, YOLO로 대체/검증)
+COUNT_SOURCE = os.getenv("COUNT_SOURCE", "yolo").lower()
+# 디바이스 인원 수 조회 간격(초)
+DEVICE_COUNT_POLL_INTERVAL = float(os.getenv("DEVICE_COUNT_POLL_INTERVAL", "1.0"))
+# 디바이스 인원 수를 YOLO와 비교하는 간격(초)
+COUNT_CROSS_CHECK_INTERVAL = float(os.getenv("COUNT_CROSS_CHECK_INTERVAL", "30"))
+# 사람 유무가 이 횟수만큼 연속으로 다르면 YOLO로 전환
+COUNT_DISAGREE_LIMIT = int(os.getenv("COUNT_DISAGREE_LIMIT", "2"))
+# YOLO로 전환한 뒤 디바이스 인원 수를 다시 시도하기까지의 시간(초)
+COUNT_FALLBACK_HOLD = float(os.getenv("COUNT_FALLBACK_HOLD", "300"))
+
+# 여러 정류장/디바이스를 관리하는 레지스트리 파일 (.yaml/.yml 또는 SQLite .db/.sqlite)
+# 비어 있으면 위의 DEVICE_IP, BUS_STOP_ID, TARGET_EMAIL로 정류장 하나만 관리
+FLEET_CONFIG = os.getenv("FLEET_CONFIG", "")
+
+# 비상 호출 버튼 입력 방식: pynput(기본값, X 세션 필요), evdev(리눅스 입력 장치 직접 읽기), none
+BUTTON_BACKEND = os.getenv("BUTTON_BACKEND", "pynput").lower()
+# 비상 호출 버튼 키 (pynput이면 문자, evdev면 KEY_1, BTN_0 같은 키 이름)
+# evdev에 문자를 지정하면 KEY_<문자>로 바꿔 사용 (예: 1 → KEY_1)
+BUTTON_KEY = os.getenv("BUTTON_KEY", "KEY_1" if BUTTON_BACKEND == "evdev" else "1")
+# evdev 입력 장치 경로 (비어 있으면 BUTTON_KEY를 가진 첫 번째 장치)
+BUTTON_DEVICE = os.getenv("BUTTON_DEVICE", "")
+# 이 시간(초) 안에 다시 눌린 입력은 무시
+BUTTON_DEBOUNCE = float(os.getenv("BUTTON_DEBOUNCE", "1.0"))
+# 0보다 크면 이 시간(초) 이상 누르고 있어야 호출 (0이면 누르는 즉시 호출)
+BUTTON_LONG_PRESS = float(os.getenv("BUTTON_LONG_PRESS", "0"))
+
+# 오디오 디코딩에 사용할 ffmpeg 실행 파일
+FFMPEG_PATH = os.getenv("FFMPEG_PATH", "ffmpeg")
+# 실시간 음성 인식에서 중간 결과를 보내는 간격(초, 새로 들어온 오디오 길이 기준)
+STT_PARTIAL_INTERVAL = float(os.getenv("STT_PARTIAL_INTERVAL", "1.5"))
+# 음성 인식 한 번에 받을 수 있는 최대 오디오 길이(초, 업로드와 실시간 인식 공통)
+STT_MAX_AUDIO_SECONDS = float(os.getenv("STT_MAX_AUDIO_SECONDS", "60"))
+# 음성 업로드 최대 크기(바이트). 업로드는 일정 크기까지만 메모리에 두고 넘으면 임시 파일로 보관됨
+STT_MAX_UPLOAD_BYTES = int(os.getenv("STT_MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+# 음성 인식 작업자 수와 대기열 한도 (넘는 요청은 기다리지 않고 바로 503 응답)
+STT_WORKERS = int(os.getenv("STT_WORKERS", "2"))
+STT_QUEUE_LIMIT = int(os.getenv("STT_QUEUE_LIMIT", "4"))
@@ -1,6 +1,12 @@
+from utils.startup_timer import startup_phase, mark, get_startup_report
+from utils.metrics import render_metrics
+from services.http_client import http_client
+from services.outbox import outbox
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from routers import button, vision, audio
+from config import ENABLED_ROUTERS
+import importlib
 import uvicorn
 import signal
 import sys
@@ -18,9 +24,62 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-app.include_router(button.router)
-# app.include_router(vision.router)
-# app.include_router(audio.router)
+# 활성화된 라우터만 import (비활성 라우터의 torch, ultralytics 등 무거운 의존성은 로드하지 않음)
+for router_name in ENABLED_ROUTERS:
+    with startup_phase(f"import:routers.{router_name}"):
+        module = importlib.import_module(f"routers.{router_name}")
+    if not hasattr(module, "router"):
+        print(f"routers.{router_name}에 router가 정의되어 있지 않아 건너뜁니다.")
+        continue
+    app.include_router(module.router)
+    print(f"라우터 활성화: {router_name}")
+
+
+@app.on_event("startup")
+def report_ready():
+    # 다른 라우터의 startup 핸들러가 끝나고 요청을 받기 직전 시점
+    mark("server:ready")
+
+
+@app.on_event("startup")
+def start_outbox():
+    # 이전 실행에서 전송하지 못한 이벤트(비상 알림 등)를 다시 전송
+    outbox.start()
+
+
+@app.get("/startup")
+async def startup_report():
+    """
+    기동 단계별 소요 시간(라우터 import, 모델 로드, 워밍업 등)을 반환합니다.
+    """
+    return get_startup_report()
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """
+    단계별 지연 시간/처리량 지표를 Prometheus 텍스트 형식으로 반환합니다.
+    """
+    return PlainTextResponse(
+        render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+@app.get("/http/pool")
+async def http_pool_stats():
+    """
+    외부 서버별 요청 수, 실패 수, 진행 중인 요청 수와 연결 풀 사용 현황을 반환합니다.
+    """
+    return http_client.stats()
+
+
+@app.get("/outbox")
+async def outbox_stats():
+    """
+    목적지별로 전송 대기 중인 이벤트 수와 가장 오래 기다린 시간,
+    최대 시도 횟수를 넘겨 전송을 포기한(failed) 이벤트를 반환합니다.
+    """
+    return outbox.stats()
 
 
 # Ctrl+C 시그널 핸들러
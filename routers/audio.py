@@ -1,109 +1,283 @@
-# from fastapi import APIRouter, UploadFile, File, HTTPException, Form
-# from fastapi.responses import JSONResponse
-# import logging
-# from services import speech_to_text
-# from typing import Optional
-
-# # 로깅 설정
-# logging.basicConfig(level=logging.INFO)
-# logger = logging.getLogger(__name__)
-
-# router = APIRouter(
-#     tags=["audio"],
-#     responses={404: {"description": "Not found"}},
-# )
-
-
-# @router.post("/audio/speech-to-text")
-# async def convert_speech_to_text(
-#     audio_file: UploadFile = File(...),
-#     language: Optional[str] = Form("ko-KR"),
-# ):
-#     """
-#     음성 파일을 받아 텍스트로 변환하는 엔드포인트
-
-#     Args:
-#         audio_file: 프론트엔드에서 전송한 오디오 파일 (WAV, MP3, WEBM 등)
-#         language: 인식할 언어 코드 (기본값: 한국어 'ko-KR')
-
-#     Returns:
-#         JSON 형태의 텍스트 변환 결과
-#     """
-#     try:
-#         logger.info(
-#             f"받은 오디오 파일: {audio_file.filename}, 콘텐츠 타입: {audio_file.content_type}"
-#         )
-
-#         # 오디오 파일 읽기
-#         contents = await audio_file.read()
-
-#         # 파일 형식 확인 및 처리
-#         format = audio_file.filename.split(".")[-1].lower()
-#         content_type = audio_file.content_type
-
-#         # WEBM 형식인 경우 WAV로 변환
-#         if "webm" in format or "webm" in content_type:
-#             logger.info("WebM 형식을 WAV로 변환 중...")
-#             contents = speech_to_text.webm_to_wav(contents)
-#             format = "wav"
-
-#         # 음성을 텍스트로 변환
-#         text = speech_to_text.audio_to_text(contents, format=format, language=language)
-#         logger.info(f"변환된 텍스트: {text}")
-
-#         return JSONResponse(content={"success": True, "text": text}, status_code=200)
-
-#     except Exception as e:
-#         logger.error(f"음성 처리 중 오류 발생: {str(e)}")
-#         raise HTTPException(
-#             status_code=500, detail=f"음성 처리 중 오류가 발생했습니다: {str(e)}"
-#         )
-
-
-# # 추가: /speech-to-text 경로 (프론트엔드 요청에 맞춤)
-# @router.post("/speech-to-text")
-# async def root_speech_to_text(
-#     audio: UploadFile = File(...),  # 'audio' 필드 이름으로 변경
-#     language: Optional[str] = Form("ko-KR"),
-# ):
-#     """
-#     프론트엔드 요청에 맞춘 음성 인식 엔드포인트
-
-#     Args:
-#         audio: 프론트엔드에서 전송한 오디오 파일 (WAV, MP3, WEBM 등) - 'audio' 필드로 전송
-#         language: 인식할 언어 코드 (기본값: 한국어 'ko-KR')
-
-#     Returns:
-#         JSON 형태의 텍스트 변환 결과
-#     """
-#     try:
-#         logger.info(
-#             f"받은 오디오 파일: {audio.filename}, 콘텐츠 타입: {audio.content_type}"
-#         )
-
-#         # 오디오 파일 읽기
-#         contents = await audio.read()
-
-#         # 파일 형식 확인 및 처리
-#         format = audio.filename.split(".")[-1].lower()
-#         content_type = audio.content_type
-
-#         # WEBM 형식인 경우 WAV로 변환
-#         if "webm" in format or "webm" in content_type:
-#             logger.info("WebM 형식을 WAV로 변환 중...")
-#             contents = speech_to_text.webm_to_wav(contents)
-#             format = "wav"
-
-#         # 음성을 텍스트로 변환
-#         text = speech_to_text.audio_to_text(contents, format=format, language=language)
-#         logger.info(f"변환된 텍스트: {text}")
-
-#         return JSONResponse(
-#             content={"text": text}, status_code=200  # 프론트엔드 예상 응답 형식에 맞춤
-#         )
-
-#     except Exception as e:
-#         logger.error(f"음성 처리 중 오류 발생: {str(e)}")
-#         raise HTTPException(
-#             status_code=500, detail=f"음성 처리 중 오류가 발생했습니다: {str(e)}"
-#         )
+from fastapi import (
+    APIRouter,
+    UploadFile,
+    File,
+    HTTPException,
+    Form,
+    WebSocket,
+    WebSocketDisconnect,
+)
+from fastapi.responses import JSONResponse
+import asyncio
+import logging
+from config import STT_MAX_UPLOAD_BYTES
+from services import speech_to_text
+from services.audio_decoder import AudioTooLong, ffmpeg_input_format
+from services.speech_stream import StreamingTranscriber
+from services.stt_pool import stt_pool, SttPoolFull
+from typing import Optional
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+router = APIRouter(
+    tags=["audio"],
+    responses={404: {"description": "Not found"}},
+)
+
+
+# 작업자 풀이 가득 찼을 때 다시 시도하라고 알려줄 시간(초)
+RETRY_AFTER = "2"
+
+
+def _check_upload_size(upload):
+    # 업로드는 일정 크기까지만 메모리에 두고(SpooledTemporaryFile) 이 크기를 넘으면 거부
+    if upload.size is not None and upload.size > STT_MAX_UPLOAD_BYTES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"오디오 파일이 최대 크기({STT_MAX_UPLOAD_BYTES}바이트)를 넘었습니다.",
+        )
+
+
+def _upload_format(upload):
+    # 브라우저 녹음(MediaRecorder)은 파일 이름보다 콘텐츠 타입이 정확함
+    # (허용 목록에 있는 형식만 ffmpeg에 넘기고, 나머지는 ffmpeg가 데이터로 판단)
+    if upload.content_type and ffmpeg_input_format(upload.content_type):
+        return upload.content_type
+    if upload.filename and "." in upload.filename:
+        extension = upload.filename.rsplit(".", 1)[-1].lower()
+        if ffmpeg_input_format(extension):
+            return extension
+    return None
+
+
+@router.post("/audio/speech-to-text")
+async def convert_speech_to_text(
+    audio_file: UploadFile = File(...),
+    language: Optional[str] = Form("ko-KR"),
+):
+    """
+    음성 파일을 받아 텍스트로 변환하는 엔드포인트
+
+    Args:
+        audio_file: 프론트엔드에서 전송한 오디오 파일 (WAV, MP3, WEBM 등)
+        language: 인식할 언어 코드 (기본값: 한국어 'ko-KR')
+
+    Returns:
+        JSON 형태의 텍스트 변환 결과
+    """
+    _check_upload_size(audio_file)
+    try:
+        logger.info(
+            f"받은 오디오 파일: {audio_file.filename}, 콘텐츠 타입: {audio_file.content_type}"
+        )
+
+        # 업로드 파일을 한 번에 읽지 않고 조각 단위로 디코딩하여 텍스트로 변환
+        # (WEBM 등도 WAV로 다시 인코딩하지 않고 PCM으로 바로 디코딩)
+        # 이벤트 루프를 막지 않도록 음성 인식 작업자 풀에서 실행
+        text = await stt_pool.run(
+            speech_to_text.audio_to_text,
+            audio_file.file,
+            format=_upload_format(audio_file),
+            language=language,
+        )
+        logger.info(f"변환된 텍스트: {text}")
+
+        return JSONResponse(content={"success": True, "text": text}, status_code=200)
+
+    except SttPoolFull as e:
+        logger.warning(str(e))
+        raise HTTPException(
+            status_code=503, detail=str(e), headers={"Retry-After": RETRY_AFTER}
+        )
+    except AudioTooLong as e:
+        # 최대 길이를 넘은 음성 (다른 형식/디코딩 오류는 500)
+        raise HTTPException(status_code=413, detail=str(e))
+    except Exception as e:
+        logger.error(f"음성 처리 중 오류 발생: {str(e)}")
+        raise HTTPException(
+            status_code=500, detail=f"음성 처리 중 오류가 발생했습니다: {str(e)}"
+        )
+
+
+# 추가: /speech-to-text 경로 (프론트엔드 요청에 맞춤)
+@router.post("/speech-to-text")
+async def root_speech_to_text(
+    audio: UploadFile = File(...),  # 'audio' 필드 이름으로 변경
+    language: Optional[str] = Form("ko-KR"),
+):
+    """
+    프론트엔드 요청에 맞춘 음성 인식 엔드포인트
+
+    Args:
+        audio: 프론트엔드에서 전송한 오디오 파일 (WAV, MP3, WEBM 등) - 'audio' 필드로 전송
+        language: 인식할 언어 코드 (기본값: 한국어 'ko-KR')
+
+    Returns:
+        JSON 형태의 텍스트 변환 결과
+    """
+    _check_upload_size(audio)
+    try:
+        logger.info(
+            f"받은 오디오 파일: {audio.filename}, 콘텐츠 타입: {audio.content_type}"
+        )
+
+        # 업로드 파일을 한 번에 읽지 않고 조각 단위로 디코딩하여 텍스트로 변환
+        # (WEBM 등도 WAV로 다시 인코딩하지 않고 PCM으로 바로 디코딩)
+        # 이벤트 루프를 막지 않도록 음성 인식 작업자 풀에서 실행
+        text = await stt_pool.run(
+            speech_to_text.audio_to_text,
+            audio.file,
+            format=_upload_format(audio),
+            language=language,
+        )
+        logger.info(f"변환된 텍스트: {text}")
+
+        return JSONResponse(
+            content={"text": text}, status_code=200  # 프론트엔드 예상 응답 형식에 맞춤
+        )
+
+    except SttPoolFull as e:
+        logger.warning(str(e))
+        raise HTTPException(
+            status_code=503, detail=str(e), headers={"Retry-After": RETRY_AFTER}
+        )
+    except AudioTooLong as e:
+        # 최대 길이를 넘은 음성 (다른 형식/디코딩 오류는 500)
+        raise HTTPException(status_code=413, detail=str(e))
+    except Exception as e:
+        logger.error(f"음성 처리 중 오류 발생: {str(e)}")
+        raise HTTPException(
+            status_code=500, detail=f"음성 처리 중 오류가 발생했습니다: {str(e)}"
+        )
+
+
+async def _close_with_error(websocket, detail, code):
+    # 오류를 알리고 연결을 닫음 (클라이언트가 이미 연결을 끊었으면 무시)
+    try:
+        await websocket.send_json({"type": "error", "detail": detail})
+        await websocket.close(code=code)
+    except Exception:
+        pass
+
+
+async def _transcribe_stream(websocket, session, language, format):
+    # 예약한 작업자 풀 자리(session)로 녹음 조각을 받아 인식
+    try:
+        transcriber = StreamingTranscriber(language, format)
+    except OSError as e:
+        logger.error(f"오디오 디코더 시작 실패: {e}")
+        await _close_with_error(websocket, "오디오 디코더 시작 실패", 1011)
+        return
+    logger.info(f"실시간 음성 인식 시작: {language}, {format}")
+
+    partial_task = None
+
+    async def send_partial():
+        try:
+            text = await session.run(transcriber.partial)
+        except Exception as e:
+            # 중간 결과는 실패해도 녹음을 계속 받음
+            logger.warning(f"중간 인식 실패: {e}")
+            return
+        if text:
+            await websocket.send_json({"type": "partial", "text": text})
+
+    async def stop_partial():
+        # 진행 중인 중간 인식을 취소하고 끝날 때까지 기다림
+        # (최종 결과나 연결 종료 뒤에 중간 결과를 보내지 않도록)
+        if partial_task is None:
+            return
+        partial_task.cancel()
+        try:
+            await partial_task
+        except (asyncio.CancelledError, Exception):
+            pass
+
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            if message.get("bytes"):
+                # 파이프 쓰기만 하므로 인식 작업 뒤에서 기다리지 않도록 별도 스레드에서 실행
+                # (세션 수가 제한되므로 동시에 실행되는 feed 수도 제한됨)
+                await asyncio.to_thread(transcriber.feed, message["bytes"])
+                # 이전 중간 인식이 끝나지 않았으면 건너뜀 (인식 요청이 쌓이지 않도록)
+                if (
+                    partial_task is None or partial_task.done()
+                ) and transcriber.partial_due():
+                    partial_task = asyncio.create_task(send_partial())
+            elif message.get("text") == "end":
+                break
+
+        await stop_partial()
+        text = await session.run(transcriber.finish)
+        logger.info(f"변환된 텍스트: {text}")
+        await websocket.send_json({"type": "final", "text": text})
+        await websocket.close()
+
+    except WebSocketDisconnect:
+        logger.info("실시간 음성 인식 연결이 끊어졌습니다.")
+        transcriber.abort()
+    except AudioTooLong as e:
+        # 1009: 최대 길이를 넘은 녹음
+        logger.warning(str(e))
+        transcriber.abort()
+        await _close_with_error(websocket, str(e), 1009)
+    except Exception as e:
+        logger.error(f"실시간 음성 처리 중 오류 발생: {str(e)}")
+        transcriber.abort()
+        await _close_with_error(websocket, str(e), 1011)
+    finally:
+        await stop_partial()
+
+
+@router.websocket("/speech-to-text/stream")
+async def stream_speech_to_text(
+    websocket: WebSocket, language: str = "ko-KR", format: str = "webm"
+):
+    """
+    녹음 중인 오디오를 조각 단위로 받아 실시간으로 인식하는 WebSocket 엔드포인트
+
+    프로토콜:
+        클라이언트 → 서버: 오디오 조각(바이너리 메시지, MediaRecorder timeslice 등),
+                          녹음이 끝나면 텍스트 메시지 "end"
+        서버 → 클라이언트: {"type": "partial", "text": ...} (녹음 중 중간 결과),
+                          {"type": "final", "text": ...} (최종 결과, 이후 연결 종료),
+                          {"type": "error", "detail": ...}
+
+    Args:
+        language: 인식할 언어 코드 (쿼리 문자열, 기본값: 한국어 'ko-KR')
+        format: 오디오 컨테이너 형식 (쿼리 문자열, 기본값: webm,
+                services.audio_decoder.INPUT_FORMATS에 있는 형식만 허용)
+    """
+    await websocket.accept()
+    if ffmpeg_input_format(format) is None:
+        # ffmpeg를 시작하기 전에 거절 (1003: 받을 수 없는 데이터 형식)
+        logger.warning(f"지원하지 않는 오디오 형식: {format}")
+        await _close_with_error(
+            websocket, f"지원하지 않는 오디오 형식입니다: {format}", 1003
+        )
+        return
+    try:
+        # 세션마다 ffmpeg 프로세스와 인식 작업이 필요하므로 연결하는 동안 작업자 풀 자리를
+        # 하나 차지함. 자리가 없으면 녹음을 받기 전에 거절 (1013: 나중에 다시 시도)
+        session = stt_pool.reserve()
+    except SttPoolFull as e:
+        logger.warning(str(e))
+        await _close_with_error(websocket, str(e), 1013)
+        return
+    try:
+        await _transcribe_stream(websocket, session, language, format)
+    finally:
+        session.release()
+
+
+@router.get("/stt/pool")
+async def stt_pool_stats():
+    """
+    음성 인식 작업자 풀의 대기/실행 중인 작업 수와 처리, 실패, 거부 건수를 반환합니다.
+    """
+    return stt_pool.stats()
@@ -1,64 +1,62 @@
-from fastapi import APIRouter, Request
-from services.webex_call import call_from_device
-from services.alert_sender import send_alert
+from fastapi import APIRouter, HTTPException, Request
+from services.admin_call import start_admin_call, get_admin_call
+from services.button_events import ButtonDispatcher, create_backend
+from config import (
+    BUTTON_BACKEND,
+    BUTTON_KEY,
+    BUTTON_DEVICE,
+    BUTTON_DEBOUNCE,
+    BUTTON_LONG_PRESS,
+)
+from typing import Optional
 import threading
-import time
-from pynput import keyboard
-import requests
 
 router = APIRouter()
 
-# 버튼 입력 처리를 위한 전역 변수
-last_press_time = 0
-MIN_TIME_BETWEEN_PRESSES = 1.0  # 1초 이내 중복 입력 무시
 
+# 버튼 이벤트 처리: 같은 프로세스에서 바로 관리자 호출 시작 (HTTP 요청을 거치지 않음)
+def on_button_event(event):
+    print(f"버튼 눌림 인식됨 ({event.key}, {event.kind})")
+    job_id, created = start_admin_call()
+    if not created:
+        print(f"이미 진행 중인 관리자 호출이 있습니다: {job_id}")
 
-# 키 입력 이벤트 처리
-def on_press(key):
-    global last_press_time
-
-    current_time = time.time()
-
-    # 중복 입력 방지 (1초 이내 입력은 무시)
-    if current_time - last_press_time < MIN_TIME_BETWEEN_PRESSES:
-        return
-
-    last_press_time = current_time
-
-    try:
-        # 숫자 키 '1'이 입력되면 /adminCall 엔드포인트로 POST 요청 전송
-        if hasattr(key, "char") and key.char == "1":
-            print("버튼 눌림 인식됨 (숫자 1)")
-            try:
-                requests.post("http://localhost:8000/adminCall")
-            except Exception as e:
-                print("adminCall 요청 실패:", e)
-    except AttributeError:
-        pass
-
-    return True
 
+dispatcher = ButtonDispatcher(on_button_event, BUTTON_DEBOUNCE, BUTTON_LONG_PRESS)
 
 # 버튼 리스너 시작
 listener = None
+_listener_lock = threading.Lock()
 
 
 def start_button_listener():
     global listener
-    try:
-        listener = keyboard.Listener(on_press=on_press)
-        listener.start()
-        print("버튼 리스너가 시작되었습니다.")
-    except Exception as e:
-        print(f"버튼 리스너 시작 오류: {e}")
+    if BUTTON_BACKEND == "none":
+        print("버튼 입력을 사용하지 않습니다.")
+        return
+    with _listener_lock:
+        # startup 이벤트가 여러 번 호출되어도 리스너는 하나만 실행
+        if listener is not None:
+            return
+        try:
+            dispatcher.start()
+            backend = create_backend(
+                BUTTON_BACKEND, dispatcher, BUTTON_KEY, BUTTON_DEVICE
+            )
+            backend.start()
+            listener = backend
+            print(f"버튼 리스너가 시작되었습니다. ({BUTTON_BACKEND}, 키 {BUTTON_KEY})")
+        except Exception as e:
+            print(f"버튼 리스너 시작 오류: {e}")
 
 
 def stop_button_listener():
     global listener
-    if listener:
-        listener.stop()
-        listener.join()  # 리소스 정리
-        print("버튼 리스너가 종료되었습니다.")
+    with _listener_lock:
+        if listener:
+            listener.stop()  # 리소스 정리
+            listener = None
+            print("버튼 리스너가 종료되었습니다.")
 
 
 @router.on_event("startup")
@@ -71,13 +69,30 @@ def shutdown_event():
     stop_button_listener()
 
 
-@router.post("/adminCall")
-async def admin_call(request: Request):
-
+@router.post("/adminCall", status_code=202)
+async def admin_call(request: Request, stop_id: Optional[int] = None):
+    """
+    관리자 시스템 비상 알림과 시스코 디바이스 화상통화 발신을 백그라운드에서 동시에 시작하고
+    바로 호출 ID를 반환합니다. 진행 상태는 GET /adminCall/{job_id}로 확인합니다.
+    stop_id를 지정하면 레지스트리의 다른 정류장을 호출합니다.
+    """
     print("POST 요청 수신: /adminCall")
 
-    # 관리자 시스템에 알림이 뜨도록 POST 요청 전송
-    send_alert()
-
-    # 시스코 디바이스에서 Webex 화상통화 발신
-    call_from_device()
+    try:
+        job_id, created = start_admin_call(stop_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="정류장을 찾을 수 없습니다.")
+    if not created:
+        print(f"이미 진행 중인 관리자 호출이 있습니다: {job_id}")
+    return {"job_id": job_id, "created": created, "status_url": f"/adminCall/{job_id}"}
+
+
+@router.get("/adminCall/{job_id}")
+async def admin_call_status(job_id: str):
+    """
+    관리자 호출의 진행 상태(running, completed, failed)와 단계별 결과를 반환합니다.
+    """
+    job = get_admin_call(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="관리자 호출을 찾을 수 없습니다.")
+    return job
@@ -0,0 +1,47 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from pydantic import BaseModel
+
+from services.fleet import get_fleet
+
+router = APIRouter()
+
+
+class StopSelection(BaseModel):
+    # None이면 등록된 모든 정류장
+    stop_ids: Optional[List[int]] = None
+
+
+def _check_stops(stop_ids):
+    try:
+        get_fleet().stops(stop_ids)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+
+
+@router.get("/fleet")
+async def fleet_stops():
+    """
+    레지스트리에 등록된 정류장 목록(디바이스 주소, 관리자 연락처, 카메라)을 반환합니다.
+    """
+    return {"stops": [stop.to_dict() for stop in get_fleet().stops()]}
+
+
+@router.get("/fleet/status")
+async def fleet_status(stop_ids: Optional[List[int]] = Query(None)):
+    """
+    정류장 디바이스의 감지 인원 수와 진행 중인 통화 수를 동시에 조회합니다.
+    """
+    _check_stops(stop_ids)
+    return await get_fleet().poll_status(stop_ids)
+
+
+@router.post("/fleet/adminCall")
+async def fleet_admin_call(selection: StopSelection):
+    """
+    여러 정류장에 비상 알림과 화상통화 발신을 동시에 실행하고 정류장별 결과를 반환합니다.
+    """
+    _check_stops(selection.stop_ids)
+    print(f"POST 요청 수신: /fleet/adminCall {selection.stop_ids or '전체'}")
+    return await get_fleet().admin_call(selection.stop_ids)
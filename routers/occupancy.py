@@ -0,0 +1,67 @@
+import asyncio
+from typing import List, Optional
+
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, Field
+
+from services.occupancy import occupancy_index
+
+router = APIRouter()
+
+# 한 번에 받을 수 있는 최대 이벤트 수
+MAX_BATCH_SIZE = 1000
+
+
+class OccupancyEvent(BaseModel):
+    device_id: str = Field(
+        ..., min_length=1, description="디바이스 식별자 (일련번호 등)"
+    )
+    timestamp: float = Field(..., description="인원 수를 감지한 시각 (유닉스 시간, 초)")
+    seq: Optional[int] = Field(None, description="디바이스가 매기는 이벤트 일련번호")
+    count: int = Field(..., description="감지된 인원 수 (-1이면 감지 안 됨)")
+
+
+class OccupancyBatch(BaseModel):
+    events: List[OccupancyEvent] = Field(..., max_length=MAX_BATCH_SIZE)
+
+
+@router.post("/occupancy/events")
+async def ingest_occupancy_events(batch: OccupancyBatch):
+    """
+    여러 시스코 디바이스의 인원 수 이벤트를 묶음으로 받아 디바이스별 최신 상태에 반영하고,
+    사람 유무가 바뀐 경우에만 챗봇 서버로 전달합니다.
+    """
+    events = [
+        (
+            event.device_id,
+            event.timestamp,
+            event.seq if event.seq is not None else -1,
+            event.count,
+        )
+        for event in batch.events
+        # 인원 수 감지가 꺼져 있으면 -1이 오므로 상태에 반영하지 않음
+        if event.count >= 0
+    ]
+    # 상태 전환 이벤트를 디스크에 동기화하며 저장하므로 이벤트 루프 밖에서 처리
+    result = await asyncio.to_thread(occupancy_index.ingest, events)
+    result["ignored"] = len(batch.events) - len(events)
+    return result
+
+
+@router.get("/occupancy")
+async def occupancy_snapshot():
+    """
+    인원 수를 보고한 모든 디바이스의 최신 상태를 반환합니다.
+    """
+    return {"devices": occupancy_index.snapshot()}
+
+
+@router.get("/occupancy/{device_id}")
+async def occupancy_device(device_id: str):
+    """
+    디바이스 하나의 최신 인원 수와 재실 상태를 반환합니다.
+    """
+    state = occupancy_index.get(device_id)
+    if state is None:
+        raise HTTPException(status_code=404, detail="디바이스를 찾을 수 없습니다.")
+    return state
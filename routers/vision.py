@@ -1,9 +1,9 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Query
 from fastapi.responses import StreamingResponse
-from services.yolo_tracker import track_people, get_detection_frame
-from utils.camera import initialize_camera, get_frame
-import cv2
-import io
+from services.yolo_tracker import track_people, warmup_detector, get_tracking_stats
+from services.detection_stream import broadcaster
+import asyncio
+import threading
 import time
 
 router = APIRouter()
@@ -11,48 +11,57 @@ router = APIRouter()
 
 @router.on_event("startup")
 def start_tracking():
+    # 모델 로드와 워밍업은 백그라운드에서 진행하여 서버가 바로 요청을 받을 수 있게 함
+    threading.Thread(target=warmup_detector, daemon=True).start()
     track_people()
 
 
+@router.get("/tracking/stats")
+async def tracking_stats():
+    """
+    인원 추적 상태와 모션 게이트 통계(추론 생략 비율 등)를 반환합니다.
+    """
+    return dict(get_tracking_stats(), stream_clients=broadcaster.client_count)
+
+
 @router.get("/stream/detection")
-async def video_feed():
+async def video_feed(
+    quality: int = Query(80, ge=10, le=95, description="JPEG 품질"),
+    width: int = Query(0, ge=0, le=1920, description="출력 너비 (0이면 원본 크기)"),
+    fps: int = Query(20, ge=1, le=30, description="최대 전송 프레임 수"),
+):
     """
     YOLO로 사람을 감지하고 바운딩 박스를 그린 비디오 스트림을 제공합니다.
     """
     return StreamingResponse(
-        generate_frames(), media_type="multipart/x-mixed-replace;boundary=frame"
+        generate_frames(quality, width, fps),
+        media_type="multipart/x-mixed-replace;boundary=frame",
     )
 
 
-def generate_frames():
+async def generate_frames(quality=80, width=0, fps=20):
     """
-    YOLO 감지 결과가 포함된 비디오 프레임을 생성하는 제너레이터 함수
+    YOLO 감지 결과가 포함된 비디오 프레임을 생성하는 비동기 제너레이터 함수.
+    인코딩은 방송기가 시청자 전체에 대해 한 번만 수행하고, 전송이 느린 시청자는
+    밀린 프레임을 쌓지 않고 가장 최신 프레임으로 건너뜁니다.
     """
-    cap = initialize_camera()  # 프로젝트의 카메라 초기화 함수 사용
+    client = broadcaster.connect(quality, width, fps)
+    min_interval = 1.0 / fps
+    last_seq = 0
     try:
         while True:
-            try:
-                # 프로젝트의 프레임 가져오기 함수 사용
-                frame = get_frame(cap)
-
-                # YOLO 감지 및 바운딩 박스 그리기 적용
-                frame_with_detection = get_detection_frame(frame)
-
-                # JPEG 형식으로 인코딩
-                _, encoded_frame = cv2.imencode(".jpg", frame_with_detection)
-                frame_bytes = encoded_frame.tobytes()
-
-                # multipart 응답 형식으로 전송
-                yield (
-                    b"--frame\r\n"
-                    b"Content-Type: image/jpeg\r\n\r\n" + frame_bytes + b"\r\n"
-                )
-
-                # 프레임 레이트 조절
-                time.sleep(0.05)  # 약 20fps
-            except Exception as e:
-                print(f"프레임 생성 중 오류 발생: {e}")
-                time.sleep(0.5)  # 오류 발생 시 잠시 대기
-                continue
+            started = time.monotonic()
+            last_seq, frame_bytes = await client.next_frame(last_seq)
+
+            # multipart 응답 형식으로 전송
+            yield (
+                b"--frame\r\n"
+                b"Content-Type: image/jpeg\r\n\r\n" + frame_bytes + b"\r\n"
+            )
+
+            # 시청자별 프레임 레이트 조절
+            remaining = min_interval - (time.monotonic() - started)
+            if remaining > 0:
+                await asyncio.sleep(remaining)
     finally:
-        cap.release()
+        client.close()
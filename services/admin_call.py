@@ -0,0 +1,138 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from config import ADMIN_TIMEOUT
+from services.alert_sender import send_alert
+from services.fleet import get_fleet
+from services.outbox import outbox
+from services.webex_call import call_from_device
+from utils.metrics import Histogram
+
+# 관리자 호출 기록을 보관할 최대 개수 (오래된 것부터 삭제)
+MAX_JOBS = 100
+
+# 비상 알림 전송 결과를 기다리는 시간(초). 넘으면 큐에 남아 백그라운드에서 재시도됨
+ALERT_WAIT_TIMEOUT = ADMIN_TIMEOUT * 2
+
+ADMIN_CALL_SECONDS = Histogram(
+    "admin_call_seconds",
+    "관리자 호출 단계별 소요 시간(초): alert(비상 알림), call(화상통화 발신), total(전체)",
+    labelnames=("step",),
+)
+
+# 비상 알림과 화상통화 발신을 동시에 실행할 스레드 풀 (이벤트 루프를 막지 않음)
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="admin-call")
+
+# job_id -> 호출 상태 딕셔너리 (오래된 순)
+_jobs = OrderedDict()
+_lock = threading.Lock()
+
+
+def _run_alert(stop):
+    event_id = send_alert(stop.stop_id)
+    if event_id is None:
+        raise RuntimeError("비상 알림을 전송 큐에 넣지 못했습니다.")
+    status = outbox.wait(event_id, timeout=ALERT_WAIT_TIMEOUT)
+    delivery = status["status"] if status is not None else "unknown"
+    if delivery == "failed":
+        raise RuntimeError(f"비상 알림 전송 실패: {status['last_error']}")
+    # pending이면 아직 재시도 중 (큐에 저장되어 있으므로 사라지지 않음)
+    return {
+        "event_id": event_id,
+        "delivery": "queued" if delivery == "pending" else delivery,
+    }
+
+
+def _run_call(stop):
+    if not call_from_device(stop):
+        raise RuntimeError("시스코 디바이스에서 화상통화 발신에 실패했습니다.")
+    return {}
+
+
+def _finish_step(job_id, step, started, future):
+    duration = time.perf_counter() - started
+    ADMIN_CALL_SECONDS.observe(duration, step=step)
+    try:
+        result = dict(future.result(), status="done")
+    except Exception as e:
+        print(f"관리자 호출 {job_id} {step} 단계 실패: {e}")
+        result = {"status": "failed", "error": str(e)}
+    result["duration"] = round(duration, 3)
+
+    with _lock:
+        job = _jobs.get(job_id)
+        if job is None:
+            return
+        job["steps"][step] = result
+        if any(info["status"] == "running" for info in job["steps"].values()):
+            return
+        failed = any(info["status"] == "failed" for info in job["steps"].values())
+        job["status"] = "failed" if failed else "completed"
+        job["duration"] = round(time.perf_counter() - job["_started"], 3)
+    ADMIN_CALL_SECONDS.observe(job["duration"], step="total")
+    print(f"관리자 호출 {job_id} 종료: {job['status']} ({job['duration']}초)")
+
+
+def start_admin_call(stop_id=None):
+    """
+    비상 알림 전송과 화상통화 발신을 백그라운드에서 동시에 시작합니다.
+    같은 정류장에 이미 진행 중인 호출이 있으면 새로 시작하지 않고 그 호출을 반환합니다.
+
+    Args:
+        stop_id: 호출할 정류장 ID (None이면 이 서버의 정류장)
+
+    Returns:
+        (job_id, 새로 시작했는지 여부)
+
+    Raises:
+        KeyError: 등록되지 않은 정류장인 경우
+    """
+    fleet = get_fleet()
+    stop = fleet.local_stop if stop_id is None else fleet.stops([stop_id])[0]
+    with _lock:
+        for job in reversed(_jobs.values()):
+            if job["status"] == "running" and job["stop_id"] == stop.stop_id:
+                return job["id"], False
+
+        job_id = uuid.uuid4().hex[:12]
+        _jobs[job_id] = {
+            "id": job_id,
+            "stop_id": stop.stop_id,
+            "status": "running",
+            "created_at": time.time(),
+            "duration": None,
+            "steps": {"call": {"status": "running"}, "alert": {"status": "running"}},
+            "_started": time.perf_counter(),
+        }
+        while len(_jobs) > MAX_JOBS:
+            _jobs.popitem(last=False)
+
+    # 연결까지 걸리는 시간이 가장 중요하므로 화상통화 발신을 먼저 제출
+    for step, target in (("call", _run_call), ("alert", _run_alert)):
+        started = time.perf_counter()
+        future = _executor.submit(target, stop)
+        future.add_done_callback(
+            lambda future, step=step, started=started: _finish_step(
+                job_id, step, started, future
+            )
+        )
+    return job_id, True
+
+
+def get_admin_call(job_id):
+    """
+    관리자 호출의 진행 상태를 반환합니다.
+
+    Returns:
+        상태(running, completed, failed)와 단계별 결과를 담은 딕셔너리 (없으면 None)
+    """
+    with _lock:
+        job = _jobs.get(job_id)
+        if job is None:
+            return None
+        result = {key: value for key, value in job.items() if not key.startswith("_")}
+        result["steps"] = {step: dict(info) for step, info in job["steps"].items()}
+    return result
@@ -1,19 +1,32 @@
-import httpx
 from config import ADMIN_SERVER, BUS_STOP_ID
+from services.outbox import outbox
 
-def send_alert():
-    url = f"{ADMIN_SERVER}/api/simulate-emergency/{BUS_STOP_ID}"
-    try:
-        print(f"Request URL: {url}")  # 요청 URL 출력
-        response = httpx.post(url)
+# 정류장마다 URL이 달라지므로 지표 라벨에는 경로 패턴만 사용
+ALERT_ROUTE = "/api/simulate-emergency"
+
+
+def alert_path(stop_id):
+    """정류장의 비상 알림 요청 경로"""
+    return f"{ALERT_ROUTE}/{stop_id}"
 
-        # 응답 상태 코드와 내용 출력
-        print(f"Response Status: {response.status_code}")
-        print(f"Response Content: {response.text}")
 
-        if response.status_code == 404:
-            print("404 Not Found: 요청한 URL이 서버에서 존재하지 않습니다.")
-        else:
-            print(f"관리자 시스템에 비상 알림 전송 완료: {response.status_code}")
+def send_alert(stop_id=BUS_STOP_ID):
+    """
+    관리자 시스템으로 비상 알림을 보냅니다.
+    알림은 영구 큐에 먼저 저장되므로 네트워크가 끊겨 있어도 사라지지 않고 재시도됩니다.
+
+    Args:
+        stop_id: 비상 상황이 발생한 정류장 ID (기본값: 이 서버의 BUS_STOP_ID)
+
+    Returns:
+        전송 큐의 이벤트 ID (저장 실패 시 None)
+    """
+    path = alert_path(stop_id)
+    try:
+        print(f"Request URL: {ADMIN_SERVER}{path}")  # 요청 URL 출력
+        event_id = outbox.enqueue("admin", path, route=ALERT_ROUTE)
+        print(f"관리자 시스템 비상 알림 전송 대기열에 추가: #{event_id}")
+        return event_id
     except Exception as e:
-        print("비상 알림 전송 실패:", e)
\ No newline at end of file
+        print("비상 알림 전송 실패:", e)
+        return None
@@ -0,0 +1,259 @@
+import io
+import subprocess
+import threading
+import wave
+
+import numpy as np
+
+from config import FFMPEG_PATH
+
+# 음성 인식에 사용하는 PCM 형식: 16 kHz, 모노, 16비트 정수
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2
+
+# ffmpeg 오류 메시지를 보관할 최대 길이 (바이트)
+STDERR_LIMIT = 4096
+
+# 업로드 파일을 ffmpeg에 넣을 때 한 번에 읽는 크기 (바이트)
+READ_CHUNK_SIZE = 65536
+
+# 허용하는 입력 형식 (파일 확장자/MIME 이름 → ffmpeg 입력 형식 이름)
+# 클라이언트가 보낸 이름을 그대로 -f에 넘기면 concat, hls처럼 다른 파일이나 URL을
+# 읽는 형식까지 지정할 수 있으므로 오디오 컨테이너만 허용
+INPUT_FORMATS = {
+    "webm": "matroska",
+    "mkv": "matroska",
+    "matroska": "matroska",
+    "ogg": "ogg",
+    "oga": "ogg",
+    "opus": "ogg",
+    "wav": "wav",
+    "wave": "wav",
+    "x-wav": "wav",
+    "mp3": "mp3",
+    "mpeg": "mp3",
+    "m4a": "mp4",
+    "mp4": "mp4",
+    "aac": "aac",
+    "flac": "flac",
+}
+
+
+class AudioTooLong(ValueError):
+    """오디오가 허용된 최대 길이를 넘은 경우"""
+
+    def __init__(self, max_seconds):
+        super().__init__(f"음성이 최대 길이({max_seconds:.0f}초)를 넘었습니다.")
+        self.max_seconds = max_seconds
+
+
+class FfmpegPcmDecoder:
+    """
+    ffmpeg 프로세스의 표준 입력으로 오디오 컨테이너(WebM, Ogg, WAV, MP3 등) 조각을
+    넣으면, 디코딩된 16 kHz 모노 PCM을 표준 출력에서 바로 읽어 모읍니다.
+    녹음 중인 오디오를 조각 단위로 받으면서 그때까지 디코딩된 PCM을 읽을 수 있습니다.
+    """
+
+    def __init__(self, input_format=None):
+        """
+        Args:
+            input_format: 입력 형식 이름 (예: webm, ogg, wav, INPUT_FORMATS 참고).
+                          None이면 ffmpeg가 데이터로 형식을 판단
+
+        Raises:
+            ValueError: 허용하지 않는 입력 형식인 경우
+        """
+        command = [FFMPEG_PATH, "-hide_banner", "-loglevel", "error"]
+        if input_format:
+            ffmpeg_format = ffmpeg_input_format(input_format)
+            if ffmpeg_format is None:
+                raise ValueError(f"지원하지 않는 오디오 형식입니다: {input_format}")
+            command += ["-f", ffmpeg_format]
+        command += [
+            "-i",
+            "pipe:0",
+            "-f",
+            "s16le",
+            "-acodec",
+            "pcm_s16le",
+            "-ac",
+            "1",
+            "-ar",
+            str(SAMPLE_RATE),
+            "pipe:1",
+        ]
+        self._process = subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        self._lock = threading.Lock()
+        self._pcm = bytearray()
+        self._stderr = bytearray()
+        self._closed = False
+        self._readers = [
+            threading.Thread(target=self._read_stdout, daemon=True),
+            threading.Thread(target=self._read_stderr, daemon=True),
+        ]
+        for reader in self._readers:
+            reader.start()
+
+    def _read_stdout(self):
+        while True:
+            data = self._process.stdout.read1(65536)
+            if not data:
+                break
+            with self._lock:
+                self._pcm += data
+
+    def _read_stderr(self):
+        for line in self._process.stderr:
+            self._stderr += line
+            del self._stderr[:-STDERR_LIMIT]
+
+    def write(self, chunk):
+        """
+        오디오 조각을 ffmpeg에 넣습니다.
+
+        Raises:
+            RuntimeError: ffmpeg가 이미 종료된 경우 (지원하지 않는 형식 등)
+        """
+        try:
+            self._process.stdin.write(chunk)
+            self._process.stdin.flush()
+        except (BrokenPipeError, ValueError):
+            raise RuntimeError(f"오디오 디코딩 실패: {self.error or 'ffmpeg 종료'}")
+
+    @property
+    def seconds(self):
+        """지금까지 디코딩된 오디오 길이(초)"""
+        with self._lock:
+            return len(self._pcm) / (SAMPLE_RATE * SAMPLE_WIDTH)
+
+    @property
+    def error(self):
+        return self._stderr.decode(errors="replace").strip()
+
+    def pcm(self):
+        """지금까지 디코딩된 PCM 바이트 (복사본)"""
+        with self._lock:
+            return bytes(self._pcm)
+
+    def close(self, timeout=10.0):
+        """
+        입력을 끝내고 남은 디코딩이 끝날 때까지 기다립니다.
+
+        Returns:
+            전체 PCM (bytearray, 복사하지 않음)
+
+        Raises:
+            RuntimeError: ffmpeg가 오류로 종료된 경우
+        """
+        if not self._closed:
+            self._closed = True
+            try:
+                self._process.stdin.close()
+            except BrokenPipeError:
+                pass
+            try:
+                self._process.wait(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+                self._process.wait()
+            for reader in self._readers:
+                reader.join(timeout=1.0)
+        if self._process.returncode != 0:
+            raise RuntimeError(f"오디오 디코딩 실패: {self.error or 'ffmpeg 오류'}")
+        # 프로세스가 끝났으므로 더 이상 PCM이 추가되지 않음
+        return self._pcm
+
+    def abort(self):
+        """디코딩을 중단하고 ffmpeg 프로세스를 정리합니다."""
+        self._closed = True
+        if self._process.poll() is None:
+            self._process.kill()
+        self._process.wait()
+        for stream in (self._process.stdin, self._process.stdout):
+            try:
+                stream.close()
+            except (BrokenPipeError, OSError):
+                pass
+
+
+def ffmpeg_input_format(name):
+    """
+    파일 확장자/MIME 이름을 ffmpeg 입력 형식 이름으로 바꿉니다.
+
+    Args:
+        name: 형식 이름 (예: webm, audio/webm;codecs=opus, wav)
+
+    Returns:
+        ffmpeg 입력 형식 이름, 허용하지 않는 형식이면 None
+    """
+    name = name.lower().split(";")[0].strip().split("/")[-1]
+    return INPUT_FORMATS.get(name)
+
+
+def _read_pcm_wav(source):
+    # 이미 16 kHz 모노 16비트인 WAV는 ffmpeg 없이 샘플만 읽음 (아니면 None)
+    start = source.tell()
+    try:
+        with wave.open(source, "rb") as wav:
+            if (
+                wav.getnchannels() == 1
+                and wav.getsampwidth() == SAMPLE_WIDTH
+                and wav.getframerate() == SAMPLE_RATE
+                and wav.getcomptype() == "NONE"
+            ):
+                return np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.int16)
+    except (wave.Error, EOFError):
+        pass
+    source.seek(start)
+    return None
+
+
+def decode_to_pcm(source, input_format=None, max_seconds=None):
+    """
+    오디오 컨테이너를 디스크에 쓰지 않고 16 kHz 모노 16비트 PCM으로 디코딩합니다.
+
+    Args:
+        source: 오디오 바이트 또는 읽기 가능한 파일 객체
+                (UploadFile.file 같은 SpooledTemporaryFile이면 조각 단위로 읽어 전달)
+        input_format: 파일 확장자/MIME 형식 이름 (None이면 ffmpeg가 판단)
+        max_seconds: 디코딩할 최대 오디오 길이(초, None이면 제한 없음)
+
+    Returns:
+        numpy.int16 샘플 배열
+
+    Raises:
+        AudioTooLong: 오디오가 max_seconds보다 긴 경우
+        RuntimeError: 디코딩에 실패한 경우
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(source)
+
+    if input_format and ffmpeg_input_format(input_format) == "wav":
+        samples = _read_pcm_wav(source)
+        if samples is not None:
+            if max_seconds is not None and len(samples) > max_seconds * SAMPLE_RATE:
+                raise AudioTooLong(max_seconds)
+            return samples
+
+    decoder = FfmpegPcmDecoder(input_format)
+    try:
+        while True:
+            chunk = source.read(READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            decoder.write(chunk)
+            if max_seconds is not None and decoder.seconds > max_seconds:
+                raise AudioTooLong(max_seconds)
+        pcm = decoder.close()
+    except BaseException:
+        decoder.abort()
+        raise
+    # 마지막 조각의 디코딩 결과는 close()가 끝나야 모두 읽히므로 한 번 더 확인
+    if max_seconds is not None and len(pcm) > max_seconds * SAMPLE_RATE * SAMPLE_WIDTH:
+        raise AudioTooLong(max_seconds)
+    return np.frombuffer(pcm, dtype=np.int16)
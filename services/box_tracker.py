@@ -0,0 +1,263 @@
+import cv2
+import numpy as np
+
+from services.detections import PERSON_CLASS_ID
+
+
+def iou_matrix(boxes_a, boxes_b):
+    """
+    두 바운딩 박스 집합 사이의 IoU 행렬을 한 번에 계산합니다.
+
+    Args:
+        boxes_a: (N, 4) xyxy 좌표
+        boxes_b: (M, 4) xyxy 좌표
+
+    Returns:
+        (N, M) IoU 행렬
+    """
+    a = np.asarray(boxes_a, dtype=np.float32).reshape(-1, 1, 4)
+    b = np.asarray(boxes_b, dtype=np.float32).reshape(1, -1, 4)
+    width = np.clip(
+        np.minimum(a[..., 2], b[..., 2]) - np.maximum(a[..., 0], b[..., 0]), 0, None
+    )
+    height = np.clip(
+        np.minimum(a[..., 3], b[..., 3]) - np.maximum(a[..., 1], b[..., 1]), 0, None
+    )
+    inter = width * height
+    area_a = (a[..., 2] - a[..., 0]) * (a[..., 3] - a[..., 1])
+    area_b = (b[..., 2] - b[..., 0]) * (b[..., 3] - b[..., 1])
+    return inter / np.maximum(area_a + area_b - inter, 1e-6)
+
+
+# 광학 흐름 계산용으로 프레임을 줄일 가로 크기 (작을수록 빠르지만 덜 정확)
+FLOW_WIDTH = 320
+# 추적 박스마다 광학 흐름으로 따라갈 격자 점 개수 (FLOW_GRID x FLOW_GRID)
+FLOW_GRID = 4
+# 박스를 옮기는 데 필요한 최소 추적 성공 점 수 (모자라면 등속 예측으로 대신함)
+FLOW_MIN_POINTS = 4
+
+
+class Track:
+    """사람 한 명의 추적 상태 (등속 운동을 가정하여 키프레임 사이의 위치를 예측)"""
+
+    def __init__(self, track_id, box, conf, timestamp):
+        self.track_id = track_id
+        self.box = np.asarray(box, dtype=np.float32)
+        self.velocity = np.zeros(4, dtype=np.float32)
+        self.conf = float(conf)
+        self.updated_at = timestamp
+        self.misses = 0
+
+    def predict(self, timestamp):
+        """timestamp 시점의 예상 바운딩 박스를 반환합니다."""
+        return self.box + self.velocity * (timestamp - self.updated_at)
+
+    def update(self, box, conf, timestamp):
+        box = np.asarray(box, dtype=np.float32)
+        elapsed = timestamp - self.updated_at
+        if elapsed > 0:
+            # 측정 노이즈로 속도가 튀지 않도록 이전 속도와 평균
+            measured = (box - self.box) / elapsed
+            self.velocity = 0.5 * self.velocity + 0.5 * measured
+        self.box = box
+        self.conf = float(conf)
+        self.updated_at = timestamp
+        self.misses = 0
+
+    def move(self, box, timestamp):
+        """키프레임 사이에 추정한 위치로 박스를 옮깁니다 (신뢰도와 놓친 횟수는 유지)."""
+        box = np.asarray(box, dtype=np.float32)
+        elapsed = timestamp - self.updated_at
+        if elapsed > 0:
+            measured = (box - self.box) / elapsed
+            self.velocity = 0.5 * self.velocity + 0.5 * measured
+        self.box = box
+        self.updated_at = timestamp
+
+
+def _to_gray(frame):
+    """광학 흐름 계산용으로 프레임을 흑백으로 바꾸고 FLOW_WIDTH로 줄입니다."""
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+    scale = min(1.0, FLOW_WIDTH / gray.shape[1])
+    if scale < 1.0:
+        gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    return gray, scale
+
+
+class KeyframeTracker:
+    """
+    N프레임마다 키프레임에서만 YOLO 감지를 실행하고, 그 사이의 프레임에서는 감지 없이
+    추적 박스를 옮기는 경량 추적기입니다. 키프레임 사이에는 박스 안 격자 점의 광학
+    흐름(Lucas-Kanade)으로 박스를 옮기고, 흐름을 구하지 못하면 등속 예측으로 대신합니다.
+    키프레임 감지 결과는 옮겨진 박스와 IoU 기반으로 연결하여 추적 ID를 유지합니다.
+
+    키프레임에서 놓친 추적이 있거나, 신뢰도가 떨어졌거나, 박스가 화면 밖으로 나가면
+    키프레임 간격을 기다리지 않고 바로 다음 프레임을 키프레임으로 삼아 다시 확인합니다.
+    따라서 사람이 떠난 뒤 인원 수가 0이 되는 시점(sessionReset)은 최대
+    keyframe_interval + max_misses 프레임 늦어집니다 (기본값이면 7프레임).
+    """
+
+    def __init__(
+        self, keyframe_interval=5, min_conf=0.4, iou_threshold=0.3, max_misses=2
+    ):
+        self.keyframe_interval = keyframe_interval
+        self.min_conf = min_conf
+        self.iou_threshold = iou_threshold
+        # 연속으로 이 횟수보다 많은 키프레임에서 감지되지 않으면 추적 종료
+        # (놓친 뒤에는 매 프레임 다시 감지하므로 키프레임 간격과 관계없이 몇 프레임 차이)
+        self.max_misses = max_misses
+        self.tracks = []
+        self._next_id = 1
+        self._frames_since_keyframe = None
+        # 키프레임 간격을 기다리지 않고 다음 프레임에서 다시 감지해야 하는지 여부
+        self._recheck = False
+        # 직전 프레임의 (흑백, 축소 비율). 광학 흐름 계산에 사용
+        self._prev_gray = None
+        self.frames = 0
+        self.keyframes = 0
+
+    def needs_detection(self):
+        """다음 프레임에서 YOLO 감지(키프레임)가 필요한지 판단합니다."""
+        if self._frames_since_keyframe is None:
+            return True
+        if self._frames_since_keyframe + 1 >= self.keyframe_interval:
+            return True
+        # 놓친 추적, 신뢰도가 떨어진 추적, 화면 밖으로 나간 추적이 있으면 키프레임을 앞당김
+        # (원래 신뢰도가 낮은 사람 때문에 매 프레임이 키프레임이 되지 않도록 떨어진 경우만)
+        return self._recheck
+
+    def update(self, detections, timestamp, frame=None):
+        """
+        키프레임의 감지 결과를 기존 추적과 연결합니다.
+
+        Args:
+            detections: DETECTION_DTYPE 구조화 배열
+            timestamp: 프레임 캡처 시각
+            frame: 키프레임 이미지 (다음 프레임의 광학 흐름 기준으로 사용)
+        """
+        self.frames += 1
+        self.keyframes += 1
+        self._frames_since_keyframe = 0
+
+        people = detections[detections["cls"] == PERSON_CLASS_ID]
+        boxes = people["xyxy"]
+        confs = people["conf"]
+
+        matched_tracks = set()
+        matched_detections = set()
+        if frame is not None:
+            # 직전 프레임에서 이 키프레임까지 박스를 옮긴 뒤 연결
+            self._propagate(frame, timestamp)
+            predicted = [track.box for track in self.tracks]
+        else:
+            self._prev_gray = None
+            predicted = [track.predict(timestamp) for track in self.tracks]
+        self._recheck = False
+        if self.tracks and len(people):
+            ious = iou_matrix(np.stack(predicted), boxes)
+            # IoU가 큰 쌍부터 탐욕적으로 연결
+            for flat_index in np.argsort(ious, axis=None)[::-1]:
+                track_index, detection_index = np.unravel_index(flat_index, ious.shape)
+                if ious[track_index, detection_index] < self.iou_threshold:
+                    break
+                if (
+                    track_index in matched_tracks
+                    or detection_index in matched_detections
+                ):
+                    continue
+                track = self.tracks[track_index]
+                if track.conf >= self.min_conf > confs[detection_index]:
+                    self._recheck = True
+                track.update(boxes[detection_index], confs[detection_index], timestamp)
+                matched_tracks.add(track_index)
+                matched_detections.add(detection_index)
+
+        alive = []
+        for index, track in enumerate(self.tracks):
+            if index not in matched_tracks:
+                track.misses += 1
+            if track.misses <= self.max_misses:
+                alive.append(track)
+                if track.misses:
+                    # 놓친 사람이 정말 떠났는지 다음 프레임에서 바로 다시 확인
+                    self._recheck = True
+
+        for index in range(len(people)):
+            if index not in matched_detections:
+                alive.append(
+                    Track(self._next_id, boxes[index], confs[index], timestamp)
+                )
+                self._next_id += 1
+        self.tracks = alive
+
+    def skip_frame(self, frame=None, timestamp=None):
+        """
+        키프레임이 아닌 프레임에서 감지 없이 추적 박스를 옮깁니다.
+
+        Args:
+            frame: 현재 프레임 이미지 (없으면 박스를 옮기지 않고 직전 결과를 유지)
+            timestamp: 프레임 캡처 시각
+        """
+        self.frames += 1
+        self._frames_since_keyframe += 1
+        if frame is not None and timestamp is not None:
+            self._propagate(frame, timestamp)
+
+    def _propagate(self, frame, timestamp):
+        """직전 프레임과의 광학 흐름(실패하면 등속 예측)으로 추적 박스를 옮깁니다."""
+        gray, scale = _to_gray(frame)
+        prev = self._prev_gray
+        self._prev_gray = (gray, scale)
+        if not self.tracks:
+            return
+
+        moved = None
+        if prev is not None and prev[0].shape == gray.shape:
+            # 박스 가장자리의 배경 대신 몸통을 따라가도록 안쪽 영역에 격자 점을 둠
+            grid = np.linspace(0.25, 0.75, FLOW_GRID)
+            points = []
+            for track in self.tracks:
+                x1, y1, x2, y2 = track.box * scale
+                xs, ys = np.meshgrid(x1 + (x2 - x1) * grid, y1 + (y2 - y1) * grid)
+                points.append(np.stack([xs.ravel(), ys.ravel()], axis=1))
+            points = np.concatenate(points).astype(np.float32).reshape(-1, 1, 2)
+            moved, status, _ = cv2.calcOpticalFlowPyrLK(
+                prev[0], gray, points, None, winSize=(15, 15), maxLevel=2
+            )
+            status = status.reshape(-1).astype(bool)
+            shifts = (moved - points).reshape(-1, 2)
+
+        height, width = gray.shape[:2]
+        per_track = FLOW_GRID * FLOW_GRID
+        for index, track in enumerate(self.tracks):
+            box = None
+            if moved is not None:
+                ok = status[index * per_track : (index + 1) * per_track]
+                if ok.sum() >= FLOW_MIN_POINTS:
+                    track_shifts = shifts[index * per_track : (index + 1) * per_track]
+                    # 점 몇 개가 배경에 걸려도 흔들리지 않도록 중앙값 이동량 사용
+                    dx, dy = np.median(track_shifts[ok], axis=0) / scale
+                    box = track.box + np.array([dx, dy, dx, dy], dtype=np.float32)
+            if box is None:
+                box = track.predict(timestamp)
+            track.move(box, timestamp)
+
+            center_x = (box[0] + box[2]) / 2 * scale
+            center_y = (box[1] + box[3]) / 2 * scale
+            if not (0 <= center_x < width and 0 <= center_y < height):
+                # 화면 밖으로 나간 것 같으면 다음 프레임에서 감지로 확인
+                self._recheck = True
+
+    @property
+    def count(self):
+        """현재 추적 중인 사람 수 (잠깐 감지되지 않은 사람도 포함되어 깜빡임이 줄어듦)"""
+        return len(self.tracks)
+
+    def stats(self):
+        return {
+            "frames": self.frames,
+            "keyframes": self.keyframes,
+            "tracks": self.count,
+            "track_ids": [track.track_id for track in self.tracks],
+            "unique_tracks_seen": self._next_id - 1,
+        }
@@ -0,0 +1,261 @@
+import queue
+import threading
+import time
+from collections import namedtuple
+
+from utils.metrics import Counter, Histogram
+
+# 버튼 이벤트 (kind: press 또는 long_press, pressed_at: 버튼을 누른 시각(time.monotonic))
+ButtonEvent = namedtuple("ButtonEvent", ["kind", "key", "pressed_at", "duration"])
+
+BUTTON_EVENTS = Counter(
+    "button_events_total",
+    "버튼 입력 처리 결과 (press, long_press, debounced, short)",
+    labelnames=("result",),
+)
+BUTTON_DISPATCH_SECONDS = Histogram(
+    "button_dispatch_seconds",
+    "버튼을 누른 뒤 이벤트 처리(관리자 호출 시작)가 끝날 때까지 걸린 시간(초)",
+)
+
+
+class ButtonDispatcher:
+    """
+    입력 장치 백엔드(pynput, evdev)가 보낸 키 눌림/뗌을 버튼 이벤트로 바꾸어
+    서버 프로세스 안의 큐에 넣고, 전용 스레드에서 handler를 호출합니다.
+    입력 콜백은 큐에 넣기만 하므로 처리 시간과 관계없이 바로 반환됩니다.
+
+    long_press가 0이면 누르는 즉시 press 이벤트를 보내고, 0보다 크면 그 시간(초)
+    이상 누르고 있을 때만 long_press 이벤트를 보냅니다 (실수로 스친 입력 무시).
+    """
+
+    def __init__(self, handler, debounce=1.0, long_press=0.0, maxsize=16):
+        self.handler = handler
+        self.debounce = debounce
+        self.long_press = long_press
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._lock = threading.Lock()
+        # key -> (누른 시각, 길게 누름 타이머)
+        self._held = {}
+        self._last_accepted = None
+        self._thread = None
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(
+                target=self._dispatch_loop, name="button-events", daemon=True
+            )
+            self._thread.start()
+
+    def key_down(self, key, pressed_at=None):
+        """
+        키가 눌렸을 때 백엔드가 호출합니다 (누르고 있는 동안 반복 입력은 무시).
+        """
+        pressed_at = time.monotonic() if pressed_at is None else pressed_at
+        with self._lock:
+            if key in self._held:
+                return
+            if (
+                self._last_accepted is not None
+                and pressed_at - self._last_accepted < self.debounce
+            ):
+                # 중복 입력 방지 (debounce초 이내 입력은 무시)
+                self._held[key] = (pressed_at, None)
+                BUTTON_EVENTS.inc(result="debounced")
+                return
+            timer = None
+            if self.long_press > 0:
+                # 떼기 전에 기준 시간이 지나면 바로 이벤트 발생 (뗄 때까지 기다리지 않음)
+                timer = threading.Timer(
+                    self.long_press, self._long_press_reached, (key, pressed_at)
+                )
+                timer.daemon = True
+            else:
+                self._last_accepted = pressed_at
+            self._held[key] = (pressed_at, timer)
+        if timer is not None:
+            timer.start()
+        else:
+            self._emit(ButtonEvent("press", key, pressed_at, 0.0))
+
+    def key_up(self, key, released_at=None):
+        """키를 뗐을 때 백엔드가 호출합니다."""
+        released_at = time.monotonic() if released_at is None else released_at
+        with self._lock:
+            pressed_at, timer = self._held.pop(key, (None, None))
+        if timer is not None and timer.is_alive():
+            timer.cancel()
+            print(
+                f"버튼을 {released_at - pressed_at:.2f}초만 눌러 무시합니다 "
+                f"({self.long_press}초 이상 눌러야 함)"
+            )
+            BUTTON_EVENTS.inc(result="short")
+
+    def _long_press_reached(self, key, pressed_at):
+        with self._lock:
+            held = self._held.get(key)
+            if held is None or held[0] != pressed_at:
+                return
+            self._last_accepted = pressed_at
+        self._emit(
+            ButtonEvent("long_press", key, pressed_at, time.monotonic() - pressed_at)
+        )
+
+    def _emit(self, event):
+        BUTTON_EVENTS.inc(result=event.kind)
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            # 처리 스레드가 멈춘 경우에도 입력 콜백이 막히지 않도록 버림
+            print(f"버튼 이벤트 큐가 가득 차 이벤트를 버립니다: {event.kind}")
+
+    def _dispatch_loop(self):
+        while True:
+            event = self._queue.get()
+            try:
+                self.handler(event)
+            except Exception as e:
+                print(f"버튼 이벤트 처리 오류: {e}")
+            BUTTON_DISPATCH_SECONDS.observe(time.monotonic() - event.pressed_at)
+
+
+class PynputBackend:
+    """
+    pynput 키보드 리스너 (X 세션 등 데스크톱 입력이 필요).
+    key 문자(예: "1")가 눌리면 dispatcher로 전달합니다.
+    """
+
+    name = "pynput"
+
+    def __init__(self, dispatcher, key):
+        self.dispatcher = dispatcher
+        self.key = key
+        self._listener = None
+
+    def _matches(self, key):
+        return getattr(key, "char", None) == self.key
+
+    def _on_press(self, key):
+        if self._matches(key):
+            self.dispatcher.key_down(self.key)
+
+    def _on_release(self, key):
+        if self._matches(key):
+            self.dispatcher.key_up(self.key)
+
+    def start(self):
+        # pynput은 X 세션 등 입력 장치 연결을 요구하므로 리스너를 시작할 때 import
+        from pynput import keyboard
+
+        self._listener = keyboard.Listener(
+            on_press=self._on_press, on_release=self._on_release
+        )
+        self._listener.start()
+
+    def stop(self):
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener.join()
+
+
+class EvdevBackend:
+    """
+    리눅스 입력 장치(/dev/input/event*)를 직접 읽는 백엔드.
+    X 세션이 없는 키오스크에서 USB 버튼이나 GPIO 키(gpio-keys) 입력을 받을 때 사용합니다.
+    evdev 패키지(pip install evdev)와 입력 장치를 읽을 input 그룹 권한이 필요합니다.
+    """
+
+    name = "evdev"
+
+    def __init__(self, dispatcher, key, device_path=""):
+        self.dispatcher = dispatcher
+        # evdev 키 이름 (예: KEY_1, KEY_ENTER, BTN_0)
+        self.key = evdev_key_name(key)
+        self.device_path = device_path
+        self._device = None
+        self._thread = None
+        self._stopped = threading.Event()
+
+    def _open_device(self):
+        import evdev
+
+        self._code = evdev.ecodes.ecodes.get(self.key)
+        if self._code is None:
+            raise ValueError(
+                f"evdev 키 이름이 아닙니다: {self.key} "
+                f"(BUTTON_KEY에 KEY_1, KEY_ENTER, BTN_0 같은 이름을 지정하세요)"
+            )
+        if self.device_path:
+            return evdev.InputDevice(self.device_path)
+        # 장치를 지정하지 않으면 해당 키를 가진 첫 번째 입력 장치 사용
+        for path in evdev.list_devices():
+            device = evdev.InputDevice(path)
+            keys = device.capabilities().get(evdev.ecodes.EV_KEY, [])
+            if self._code in keys:
+                return device
+            device.close()
+        raise RuntimeError(f"{self.key} 키를 가진 입력 장치를 찾을 수 없습니다.")
+
+    def _read_loop(self):
+        import evdev
+
+        try:
+            for event in self._device.read_loop():
+                if self._stopped.is_set():
+                    break
+                if event.type != evdev.ecodes.EV_KEY or event.code != self._code:
+                    continue
+                # value: 1 누름, 0 뗌, 2 누르고 있는 동안 반복
+                if event.value == 1:
+                    self.dispatcher.key_down(self.key)
+                elif event.value == 0:
+                    self.dispatcher.key_up(self.key)
+        except OSError as e:
+            if not self._stopped.is_set():
+                print(f"입력 장치 읽기 오류: {e}")
+
+    def start(self):
+        self._device = self._open_device()
+        print(f"입력 장치 사용: {self._device.path} ({self._device.name})")
+        self._thread = threading.Thread(
+            target=self._read_loop, name="button-evdev", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._device is not None:
+            self._device.close()
+
+
+def evdev_key_name(key):
+    """
+    버튼 키 설정을 evdev 키 이름으로 바꿉니다.
+    pynput 형식의 문자(예: "1", "a")나 접두사 없는 이름(예: "enter")은 KEY_<이름>으로 바꿉니다.
+    """
+    name = key.strip().upper()
+    if not name.startswith(("KEY_", "BTN_")):
+        name = f"KEY_{name}"
+    return name
+
+
+def create_backend(name, dispatcher, key, device_path=""):
+    """
+    설정 이름으로 입력 백엔드를 만듭니다.
+
+    Args:
+        name: pynput 또는 evdev
+        dispatcher: 키 입력을 받을 ButtonDispatcher
+        key: pynput이면 문자(예: "1"), evdev면 키 이름(예: "KEY_1", 문자는 KEY_<문자>로 변환)
+        device_path: evdev 입력 장치 경로 (비어 있으면 자동 선택)
+
+    Returns:
+        start()/stop()을 가진 백엔드 객체
+    """
+    if name == "evdev":
+        return EvdevBackend(dispatcher, key, device_path)
+    if name == "pynput":
+        return PynputBackend(dispatcher, key)
+    raise ValueError(f"지원하지 않는 버튼 백엔드입니다: {name}")
@@ -0,0 +1,212 @@
+import asyncio
+import threading
+import time
+
+import cv2
+
+from services.fleet import get_fleet
+from services.yolo_tracker import OVERLAY_MAX_AGE, get_detection_frame, get_detections
+from utils.frame_bus import get_frame_bus
+from utils.metrics import Histogram
+
+JPEG_ENCODE_SECONDS = Histogram(
+    "jpeg_encode_seconds",
+    "감지 스트림 프레임의 크기 조정과 JPEG 인코딩에 걸린 시간(초)",
+)
+
+
+def encode_jpeg(frame, quality=80, width=0):
+    """
+    프레임을 지정한 너비로 줄인 뒤 JPEG로 인코딩합니다.
+
+    Args:
+        frame: 인코딩할 프레임
+        quality: JPEG 품질 (1~100)
+        width: 출력 너비 (0이면 원본 크기)
+
+    Returns:
+        JPEG 바이트
+    """
+    started = time.perf_counter()
+    if width and width != frame.shape[1]:
+        height = max(1, int(frame.shape[0] * width / frame.shape[1]))
+        frame = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+    success, encoded = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    JPEG_ENCODE_SECONDS.observe(time.perf_counter() - started)
+    if not success:
+        raise RuntimeError("JPEG 인코딩 실패")
+    return encoded.tobytes()
+
+
+class StreamClient:
+    """
+    감지 스트림 시청자 한 명. 새 프레임이 인코딩되면 이벤트 루프로 알림을 받고,
+    항상 자신의 변형(품질/해상도)의 가장 최신 JPEG만 가져갑니다.
+    """
+
+    def __init__(self, broadcaster, variant, fps=0):
+        self._broadcaster = broadcaster
+        self.variant = variant
+        self.fps = fps
+        self._loop = asyncio.get_running_loop()
+        self._event = asyncio.Event()
+
+    def notify(self):
+        # 방송 스레드에서 호출되므로 이벤트 루프 스레드로 넘겨서 설정
+        try:
+            self._loop.call_soon_threadsafe(self._event.set)
+        except RuntimeError:
+            # 이벤트 루프가 이미 닫힌 경우
+            pass
+
+    async def next_frame(self, last_seq):
+        """
+        last_seq 이후에 인코딩된 가장 최신 JPEG를 기다립니다.
+        그 사이에 여러 프레임이 지나갔다면 중간 프레임은 건너뜁니다.
+
+        Returns:
+            (seq, JPEG 바이트)
+        """
+        while True:
+            self._event.clear()
+            seq, data = self._broadcaster.latest(self.variant)
+            if seq > last_seq:
+                return seq, data
+            await self._event.wait()
+
+    def close(self):
+        self._broadcaster.disconnect(self)
+
+
+class DetectionStreamBroadcaster:
+    """
+    감지 결과를 그린 프레임을 JPEG로 한 번만 인코딩하여 모든 시청자에게 공유합니다.
+    시청자가 요청한 변형(JPEG 품질, 너비)별로 프레임당 한 번씩만 인코딩하며,
+    변형마다 그 변형 시청자가 요청한 가장 높은 fps까지만 인코딩합니다.
+    시청자가 한 명도 없으면 방송 스레드가 종료되고 프레임 버스 구독을 해제합니다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clients = set()
+        # (품질, 너비) -> {"fps": 시청자별 요청 fps 목록, "seq", "data": JPEG 바이트,
+        #                  "next_due": 다음 인코딩 시각(time.monotonic)}
+        self._variants = {}
+        self._thread = None
+
+    def connect(self, quality, width, fps=0):
+        """
+        시청자를 등록하고, 필요하면 방송 스레드를 시작합니다.
+        이벤트 루프 안에서 호출해야 합니다.
+
+        Args:
+            quality: JPEG 품질 (1~100)
+            width: 출력 프레임 너비 (0이면 원본 크기)
+            fps: 시청자가 받을 최대 프레임 수 (0이면 카메라 프레임마다 인코딩)
+
+        Returns:
+            StreamClient 객체
+        """
+        client = StreamClient(self, (quality, width), fps)
+        with self._lock:
+            self._clients.add(client)
+            slot = self._variants.setdefault(
+                client.variant, {"fps": [], "seq": 0, "data": None, "next_due": 0.0}
+            )
+            slot["fps"].append(fps)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._broadcast_loop, name="detection-stream"
+                )
+                self._thread.daemon = True
+                self._thread.start()
+        return client
+
+    def disconnect(self, client):
+        with self._lock:
+            if client not in self._clients:
+                return
+            self._clients.discard(client)
+            slot = self._variants[client.variant]
+            slot["fps"].remove(client.fps)
+            if not slot["fps"]:
+                del self._variants[client.variant]
+
+    @property
+    def client_count(self):
+        with self._lock:
+            return len(self._clients)
+
+    def latest(self, variant):
+        with self._lock:
+            slot = self._variants.get(variant)
+            if slot is None:
+                return 0, None
+            return slot["seq"], slot["data"]
+
+    def _due_variants(self, now):
+        # 요청한 가장 높은 fps 간격이 지난 변형만 골라 다음 인코딩 시각을 정함
+        due = []
+        with self._lock:
+            for variant, slot in self._variants.items():
+                fps = 0 if 0 in slot["fps"] else max(slot["fps"])
+                if fps and now < slot["next_due"]:
+                    continue
+                if fps:
+                    # 간격을 누적해서 카메라 프레임 간격과 맞지 않아도 요청한 fps를 유지
+                    # (오래 쉬었으면 밀린 만큼 몰아서 인코딩하지 않음)
+                    interval = 1.0 / fps
+                    slot["next_due"] = max(slot["next_due"] + interval, now - interval)
+                due.append(variant)
+        return due
+
+    def _broadcast_loop(self):
+        # 인원 추적과 같은 카메라(이 서버 정류장의 camera_source)를 공유
+        bus = get_frame_bus(get_fleet().local_stop.camera_source)
+        subscription = bus.subscribe()
+        print("감지 스트림 방송 시작")
+        try:
+            while True:
+                with self._lock:
+                    if not self._clients:
+                        self._thread = None
+                        break
+                try:
+                    packet = subscription.read(timeout=1.0)
+                    if packet is None:
+                        if bus.ended:
+                            # 파일 재생이 끝났으면 시청자가 나갈 때까지 대기
+                            time.sleep(1.0)
+                        continue
+
+                    # 인코딩할 차례인 변형이 없으면 감지 결과도 그리지 않고 건너뜀
+                    variants = self._due_variants(time.monotonic())
+                    if not variants:
+                        continue
+
+                    # 인원 추적기의 최근 감지 결과를 재사용하고, 오래된 경우에만 새로 추론
+                    detections = get_detections(packet, max_age=OVERLAY_MAX_AGE)
+                    frame = get_detection_frame(packet.frame, detections)
+
+                    for quality, width in variants:
+                        data = encode_jpeg(frame, quality, width)
+                        with self._lock:
+                            slot = self._variants.get((quality, width))
+                            if slot is not None:
+                                slot["seq"] = packet.frame_id
+                                slot["data"] = data
+
+                    with self._lock:
+                        clients = [c for c in self._clients if c.variant in variants]
+                    for client in clients:
+                        client.notify()
+                except Exception as e:
+                    print(f"프레임 생성 중 오류 발생: {e}")
+                    time.sleep(0.5)  # 오류 발생 시 잠시 대기
+        finally:
+            subscription.close()
+            print("감지 스트림 방송 종료")
+
+
+# 모든 시청자가 공유하는 방송기
+broadcaster = DetectionStreamBroadcaster()
@@ -0,0 +1,99 @@
+import cv2
+import numpy as np
+
+# 사람 클래스 ID (YOLO에서 사람은 클래스 0번)
+PERSON_CLASS_ID = 0
+
+# 감지 결과 한 건: 바운딩 박스 좌표, 신뢰도, 클래스, 프레임 캡처 시각(time.monotonic 기준)
+DETECTION_DTYPE = np.dtype(
+    [
+        ("xyxy", np.float32, (4,)),
+        ("conf", np.float32),
+        ("cls", np.int16),
+        ("frame_ts", np.float64),
+    ]
+)
+
+
+def empty_detections():
+    """감지 결과가 없는 빈 배열을 반환합니다."""
+    return np.empty(0, dtype=DETECTION_DTYPE)
+
+
+def from_arrays(xyxy, conf, cls, frame_ts=0.0):
+    """
+    열 단위 배열로부터 감지 결과 배열을 한 번에 만듭니다.
+
+    Args:
+        xyxy: (N, 4) 바운딩 박스 좌표
+        conf: (N,) 신뢰도
+        cls: (N,) 클래스 ID
+        frame_ts: 프레임 캡처 시각
+
+    Returns:
+        DETECTION_DTYPE 구조화 배열
+    """
+    xyxy = np.asarray(xyxy, dtype=np.float32).reshape(-1, 4)
+    detections = np.empty(len(xyxy), dtype=DETECTION_DTYPE)
+    detections["xyxy"] = xyxy
+    detections["conf"] = np.asarray(conf, dtype=np.float32).reshape(-1)
+    detections["cls"] = np.asarray(cls).reshape(-1)
+    detections["frame_ts"] = frame_ts
+    return detections
+
+
+def from_ultralytics(result, frame_ts=0.0):
+    """
+    ultralytics 추론 결과(Results)를 박스별 루프 없이 감지 결과 배열로 변환합니다.
+    """
+    boxes = result.boxes.cpu().numpy()
+    return from_arrays(boxes.xyxy, boxes.conf, boxes.cls, frame_ts)
+
+
+def count(detections, cls=PERSON_CLASS_ID):
+    """지정한 클래스의 감지 수를 반환합니다 (cls가 None이면 전체)."""
+    if cls is None:
+        return len(detections)
+    return int(np.count_nonzero(detections["cls"] == cls))
+
+
+def draw_detections(frame, detections, color=(0, 0, 255)):
+    """
+    프레임 위에 바운딩 박스와 신뢰도 점수를 그립니다 (frame을 직접 수정).
+    """
+    boxes = detections["xyxy"].astype(np.int32)
+    for (x1, y1, x2, y2), conf in zip(boxes.tolist(), detections["conf"].tolist()):
+        # 바운딩 박스 그리기
+        cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
+
+        # 신뢰도 점수 표시
+        cv2.putText(
+            frame,
+            f"Person: {conf:.2f}",
+            (x1, y1 - 10),
+            cv2.FONT_HERSHEY_SIMPLEX,
+            0.5,
+            color,
+            2,
+        )
+    return frame
+
+
+def to_records(detections):
+    """
+    로그나 JSON 응답용으로 감지 결과를 딕셔너리 목록으로 변환합니다.
+    """
+    return [
+        {
+            "xyxy": [round(value, 1) for value in xyxy],
+            "conf": round(conf, 3),
+            "cls": cls,
+            "frame_ts": frame_ts,
+        }
+        for xyxy, conf, cls, frame_ts in zip(
+            detections["xyxy"].tolist(),
+            detections["conf"].tolist(),
+            detections["cls"].tolist(),
+            detections["frame_ts"].tolist(),
+        )
+    ]
@@ -0,0 +1,120 @@
+import os
+import shutil
+import numpy as np
+from services.detections import PERSON_CLASS_ID, from_ultralytics
+
+# 백엔드 이름 -> ultralytics export 형식
+EXPORT_FORMATS = {
+    "onnx": "onnx",
+    "openvino": "openvino",
+}
+
+
+def get_export_path(weights, backend, imgsz=None):
+    """
+    가중치 파일을 해당 백엔드 형식으로 내보냈을 때의 경로를 반환합니다.
+    (ultralytics는 원본 가중치와 같은 디렉토리에 결과물을 저장함)
+
+    Args:
+        imgsz: 입력 크기. 지정하면 크기별 캐시 경로(예: yolov8n_640.onnx)를 반환
+               (내보낸 모델은 입력 크기가 고정되므로 크기마다 따로 캐시)
+    """
+    stem, _ = os.path.splitext(weights)
+    if imgsz is not None:
+        stem = f"{stem}_{imgsz}"
+    if backend == "onnx":
+        return f"{stem}.onnx"
+    if backend == "openvino":
+        return f"{stem}_openvino_model"
+    raise ValueError(f"지원되지 않는 백엔드: {backend}")
+
+
+class DetectorBackend:
+    """
+    YOLO 사람 감지 백엔드. PyTorch 가중치 또는 내보낸 ONNX/OpenVINO 모델을
+    같은 인터페이스로 실행합니다.
+    """
+
+    def __init__(self, name, model_path, imgsz=640):
+        self.name = name
+        self.model_path = model_path
+        self.imgsz = imgsz
+        # torch/ultralytics는 import 비용이 커서 모델을 실제로 불러올 때 import
+        from ultralytics import YOLO
+
+        self.model = YOLO(model_path, task="detect")
+
+    def detect(self, frame, frame_ts=0.0):
+        """
+        프레임에서 사람을 감지합니다. 클래스 필터는 모델 호출에 넘겨
+        후처리 단계에서 사람 외 클래스를 바로 버리도록 합니다.
+
+        Args:
+            frame: 카메라에서 캡처한 이미지 프레임
+            frame_ts: 프레임 캡처 시각 (감지 결과에 함께 기록됨)
+
+        Returns:
+            DETECTION_DTYPE 구조화 배열
+        """
+        results = self.model(
+            frame, verbose=False, classes=[PERSON_CLASS_ID], imgsz=self.imgsz
+        )
+        return from_ultralytics(results[0], frame_ts)
+
+    def warmup(self):
+        """빈 프레임으로 한 번 추론하여 런타임 초기화 비용을 미리 치릅니다."""
+        self.detect(np.zeros((self.imgsz, self.imgsz, 3), dtype=np.uint8))
+
+
+def export_model(weights, backend, imgsz=640):
+    """
+    가중치를 ONNX/OpenVINO 형식으로 한 번 내보내고 입력 크기별로 디스크에 캐시합니다.
+    같은 입력 크기로 내보낸 결과물이 있으면 다시 내보내지 않습니다.
+
+    Returns:
+        내보낸 모델 경로
+    """
+    export_path = get_export_path(weights, backend, imgsz)
+    if os.path.exists(export_path):
+        print(f"캐시된 {backend} 모델 사용: {export_path}")
+        return export_path
+
+    from ultralytics import YOLO
+
+    print(f"{weights}를 {backend} 형식으로 내보내는 중... (최초 1회)")
+    exported = YOLO(weights).export(
+        format=EXPORT_FORMATS[backend], imgsz=imgsz, half=False, dynamic=False
+    )
+    # ultralytics가 저장한 위치에서 입력 크기별 캐시 경로로 옮김
+    shutil.move(str(exported), export_path)
+    print(f"{backend} 모델 내보내기 완료: {export_path}")
+    return export_path
+
+
+def load_detector_backend(backend="torch", weights="yolov8n.pt", imgsz=640):
+    """
+    설정된 추론 백엔드를 불러옵니다. ONNX/OpenVINO 준비에 실패하면
+    PyTorch 백엔드로 대체합니다.
+
+    Args:
+        backend: torch, onnx, openvino 중 하나
+        weights: YOLO PyTorch 가중치 파일
+        imgsz: 추론 입력 크기
+
+    Returns:
+        DetectorBackend 객체
+    """
+    if backend in EXPORT_FORMATS:
+        try:
+            detector = DetectorBackend(
+                backend, export_model(weights, backend, imgsz), imgsz
+            )
+            print(f"사람 감지 백엔드: {backend}")
+            return detector
+        except Exception as e:
+            print(f"{backend} 백엔드 준비 실패, PyTorch로 대체합니다: {e}")
+    elif backend != "torch":
+        print(f"알 수 없는 백엔드 '{backend}', PyTorch를 사용합니다.")
+
+    print("사람 감지 백엔드: torch")
+    return DetectorBackend("torch", weights, imgsz)
@@ -0,0 +1,352 @@
+"""여러 버스 정류장의 시스코 디바이스를 서버 하나에서 관리하는 정류장 레지스트리"""
+
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+
+from config import (
+    BUS_STOP_ID,
+    DEVICE_IP,
+    DEVICE_SCHEME,
+    DEVICE_TIMEOUT,
+    DEVICE_VERIFY_TLS,
+    FLEET_CONFIG,
+    PASSWORD,
+    TARGET_EMAIL,
+    USERNAME,
+)
+from services.alert_sender import ALERT_ROUTE, alert_path
+from services.http_client import http_client
+from services.outbox import RETRYABLE_CLIENT_ERRORS, outbox
+from services.xapi_client import XapiClient, get_device_client
+from utils.metrics import Histogram
+
+# 정류장 하나의 상태 조회 결과로 사용할 디바이스 상태 경로
+PEOPLE_COUNT_LOCATION = "/Status/RoomAnalytics/PeopleCount/Current"
+ACTIVE_CALLS_LOCATION = "/Status/SystemUnit/State/NumberOfActiveCalls"
+
+FLEET_FANOUT_SECONDS = Histogram(
+    "fleet_fanout_seconds",
+    "여러 정류장에 동시에 보낸 작업(status, dial, alert)이 모두 끝날 때까지 걸린 시간(초)",
+    labelnames=("operation",),
+)
+
+
+class Stop:
+    """정류장 하나의 설정과 시스코 디바이스 xAPI 클라이언트"""
+
+    def __init__(
+        self,
+        stop_id,
+        device_ip=None,
+        username=None,
+        password=None,
+        target_email=None,
+        camera_source=None,
+        name=None,
+        scheme=DEVICE_SCHEME,
+        verify_tls=DEVICE_VERIFY_TLS,
+        client=None,
+        device_id=None,
+    ):
+        self.stop_id = int(stop_id)
+        self.name = name or f"정류장 {self.stop_id}"
+        self.device_ip = device_ip
+        self.username = username
+        self.password = password
+        self.target_email = target_email
+        # None이면 FRAME_SOURCE 환경변수 (utils.frame_source.open_frame_source 참고)
+        self.camera_source = camera_source
+        self.scheme = scheme
+        self.verify_tls = verify_tls
+        # 디바이스 매크로가 인원 수 이벤트에 넣는 식별자 (기본값은 디바이스 일련번호)
+        self.device_id = str(device_id) if device_id is not None else None
+        self._client = client
+        self._lock = threading.Lock()
+
+    @property
+    def device(self):
+        """
+        정류장 디바이스의 XapiClient (처음 사용할 때 생성).
+        디바이스마다 공유 연결 풀에 별도 목적지(device:<stop_id>)로 등록되어
+        연결 수와 제한 시간이 따로 적용됩니다.
+        """
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    if not self.device_ip:
+                        raise ValueError(f"{self.name}에 device_ip가 없습니다.")
+                    self._client = XapiClient(
+                        self.device_ip,
+                        self.username,
+                        self.password,
+                        scheme=self.scheme,
+                        verify=self.verify_tls,
+                        timeout=DEVICE_TIMEOUT,
+                        destination=f"device:{self.stop_id}",
+                    )
+        return self._client
+
+    def to_dict(self):
+        # 계정 정보는 응답에 포함하지 않음
+        return {
+            "stop_id": self.stop_id,
+            "name": self.name,
+            "device_ip": self.device_ip,
+            "target_email": self.target_email,
+            "camera_source": self.camera_source,
+            "device_id": self.device_id,
+            "local": self.stop_id == BUS_STOP_ID,
+        }
+
+
+# 설정 파일에서 읽는 정류장 항목 (stop_id 제외)
+STOP_FIELDS = (
+    "device_ip",
+    "username",
+    "password",
+    "target_email",
+    "camera_source",
+    "name",
+    "scheme",
+    "verify_tls",
+    "device_id",
+)
+
+
+def session_key(stop_id):
+    """정류장의 챗봇 세션 이벤트(sessionStart/sessionReset)를 묶는 전송 큐 coalesce 이름"""
+    return f"session:{stop_id}"
+
+
+def _parse_verify(value):
+    if isinstance(value, str) and value.lower() in ("true", "false"):
+        return value.lower() == "true"
+    return value
+
+
+def _make_stop(entry, defaults):
+    values = dict(defaults)
+    values.update({key: value for key, value in entry.items() if value is not None})
+    if "stop_id" not in values:
+        raise ValueError(f"stop_id가 없는 정류장 설정입니다: {entry}")
+    # 비밀번호 등을 파일에 직접 쓰지 않도록 ${VAR} 형식의 환경변수 참조를 허용
+    values = {
+        key: os.path.expandvars(value) if isinstance(value, str) else value
+        for key, value in values.items()
+    }
+    if "verify_tls" in values:
+        values["verify_tls"] = _parse_verify(values["verify_tls"])
+    return Stop(
+        values.pop("stop_id"),
+        **{key: value for key, value in values.items() if key in STOP_FIELDS},
+    )
+
+
+def _load_yaml(path):
+    import yaml
+
+    with open(path, encoding="utf-8") as f:
+        data = yaml.safe_load(f) or {}
+    defaults = data.get("defaults") or {}
+    return [_make_stop(entry, defaults) for entry in data.get("stops") or []]
+
+
+def _load_sqlite(path):
+    db = sqlite3.connect(path)
+    db.row_factory = sqlite3.Row
+    try:
+        rows = db.execute("SELECT * FROM stops ORDER BY stop_id").fetchall()
+    finally:
+        db.close()
+    return [_make_stop(dict(row), {}) for row in rows]
+
+
+def load_stops(path):
+    """
+    레지스트리 파일에서 정류장 목록을 읽습니다.
+    YAML은 stops 목록(공통 값은 defaults)에, SQLite는 stops 테이블에 stop_id와
+    STOP_FIELDS 항목을 둡니다. 값에는 ${DEVICE_PASSWORD} 같은 환경변수 참조를 쓸 수 있고,
+    비어 있는 항목은 config의 값을 사용합니다.
+
+    Args:
+        path: .yaml/.yml 파일 또는 SQLite 파일 경로
+
+    Returns:
+        Stop 목록
+    """
+    if path.lower().endswith((".yaml", ".yml")):
+        return _load_yaml(path)
+    return _load_sqlite(path)
+
+
+class Fleet:
+    """
+    정류장 레지스트리. 여러 정류장의 상태 조회, 화상통화 발신, 비상 알림을
+    asyncio로 동시에 실행하므로 정류장 수가 늘어나도 가장 느린 디바이스 하나의
+    응답 시간만큼만 걸립니다.
+    """
+
+    def __init__(self, stops):
+        self._stops = {}
+        # 디바이스 식별자 -> 정류장
+        self._devices = {}
+        for stop in stops:
+            if stop.stop_id in self._stops:
+                raise ValueError(f"정류장 ID가 중복되었습니다: {stop.stop_id}")
+            self._stops[stop.stop_id] = stop
+            if stop.device_id is not None:
+                self._devices[stop.device_id] = stop
+
+    def get(self, stop_id):
+        """정류장 설정 (없으면 None)"""
+        return self._stops.get(stop_id)
+
+    def stop_for_device(self, device_id):
+        """인원 수 이벤트의 디바이스 식별자에 해당하는 정류장 (없으면 None)"""
+        return self._devices.get(device_id)
+
+    def stops(self, stop_ids=None):
+        """
+        정류장 목록을 반환합니다.
+
+        Args:
+            stop_ids: 가져올 정류장 ID 목록 (None이면 전체)
+
+        Raises:
+            KeyError: 등록되지 않은 정류장 ID가 있는 경우
+        """
+        if stop_ids is None:
+            return list(self._stops.values())
+        missing = [stop_id for stop_id in stop_ids if stop_id not in self._stops]
+        if missing:
+            raise KeyError(f"등록되지 않은 정류장입니다: {missing}")
+        return [self._stops[stop_id] for stop_id in stop_ids]
+
+    @property
+    def local_stop(self):
+        """이 서버가 카메라로 직접 인원을 추적하는 정류장 (BUS_STOP_ID)"""
+        return self._stops.get(BUS_STOP_ID)
+
+    async def _fan_out(self, operation, stops, action):
+        # 정류장마다 결과를 따로 모음 (한 디바이스의 실패가 다른 정류장에 영향을 주지 않음)
+        async def run(stop):
+            started = time.perf_counter()
+            try:
+                result = dict(await action(stop), ok=True)
+            except Exception as e:
+                result = {"ok": False, "error": str(e) or type(e).__name__}
+            result["duration"] = round(time.perf_counter() - started, 3)
+            return result
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(run(stop) for stop in stops))
+        FLEET_FANOUT_SECONDS.observe(time.perf_counter() - started, operation=operation)
+        return {stop.stop_id: result for stop, result in zip(stops, results)}
+
+    async def poll_status(self, stop_ids=None):
+        """
+        정류장 디바이스의 감지 인원 수와 진행 중인 통화 수를 동시에 조회합니다.
+
+        Returns:
+            정류장 ID -> 조회 결과 딕셔너리
+        """
+
+        async def status(stop):
+            people, calls = await asyncio.gather(
+                stop.device.getxml_async(PEOPLE_COUNT_LOCATION),
+                stop.device.getxml_async(ACTIVE_CALLS_LOCATION),
+            )
+            return {
+                "people_count": int(people.findtext(".//PeopleCount/Current", "-1")),
+                "active_calls": int(calls.findtext(".//NumberOfActiveCalls", "0")),
+            }
+
+        return await self._fan_out("status", self.stops(stop_ids), status)
+
+    async def dial(self, stop_ids=None):
+        """각 정류장 디바이스에서 정류장의 관리자에게 화상통화를 동시에 발신합니다."""
+
+        async def dial(stop):
+            if not stop.target_email:
+                raise ValueError(f"{stop.name}에 target_email이 없습니다.")
+            await stop.device.dial_async(stop.target_email)
+            return {"target": stop.target_email}
+
+        return await self._fan_out("dial", self.stops(stop_ids), dial)
+
+    async def alert(self, stop_ids=None):
+        """
+        정류장별 비상 알림을 관리자 시스템으로 동시에 직접 전송합니다.
+        전송에 실패한 알림만 전송 큐에 넣어 백그라운드에서 재시도합니다.
+        """
+
+        async def alert(stop):
+            path = alert_path(stop.stop_id)
+            try:
+                response = await http_client.post("admin", path, route=ALERT_ROUTE)
+                status_code = response.status_code
+                error = f"HTTP {status_code}" if status_code >= 400 else None
+            except Exception as e:
+                status_code, error = None, f"{type(e).__name__}: {e}"
+            if error is None:
+                return {"delivery": "delivered", "status_code": status_code}
+            if status_code is not None and status_code < 500:
+                if status_code not in RETRYABLE_CLIENT_ERRORS:
+                    # 재시도해도 결과가 달라지지 않는 응답
+                    raise RuntimeError(f"비상 알림 전송 실패: {error}")
+            # 네트워크 오류나 5xx 응답은 전송 큐에 저장하여 사라지지 않도록 재시도
+            print(f"{stop.name} 비상 알림 전송 실패, 전송 큐에서 재시도: {error}")
+            event_id = await outbox.enqueue_async("admin", path, route=ALERT_ROUTE)
+            return {"event_id": event_id, "delivery": "queued", "error": error}
+
+        return await self._fan_out("alert", self.stops(stop_ids), alert)
+
+    async def admin_call(self, stop_ids=None):
+        """
+        여러 정류장에 비상 알림과 화상통화 발신을 동시에 실행합니다.
+
+        Returns:
+            정류장 ID -> {"alert": 알림 결과, "call": 발신 결과}
+        """
+        alerts, calls = await asyncio.gather(self.alert(stop_ids), self.dial(stop_ids))
+        return {
+            stop_id: {"alert": alerts[stop_id], "call": calls[stop_id]}
+            for stop_id in alerts
+        }
+
+
+def _local_stop_from_env():
+    # 레지스트리가 없을 때 사용하던 단일 정류장 설정 (디바이스 연결은 기존 클라이언트 공유)
+    return Stop(
+        BUS_STOP_ID,
+        DEVICE_IP,
+        USERNAME,
+        PASSWORD,
+        TARGET_EMAIL,
+        client=get_device_client() if DEVICE_IP else None,
+    )
+
+
+_fleet = None
+_fleet_lock = threading.Lock()
+
+
+def get_fleet():
+    """
+    FLEET_CONFIG(없으면 환경변수)로 만든 정류장 레지스트리를 반환합니다.
+    BUS_STOP_ID 정류장이 레지스트리에 없으면 DEVICE_IP/TARGET_EMAIL로 만들어 추가합니다.
+    """
+    global _fleet
+    if _fleet is None:
+        with _fleet_lock:
+            if _fleet is None:
+                stops = load_stops(FLEET_CONFIG) if FLEET_CONFIG else []
+                if not any(stop.stop_id == BUS_STOP_ID for stop in stops):
+                    stops.append(_local_stop_from_env())
+                _fleet = Fleet(stops)
+                stop_ids = sorted(stop.stop_id for stop in stops)
+                print(f"정류장 {len(stops)}곳 관리: {stop_ids}")
+    return _fleet
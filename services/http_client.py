@@ -0,0 +1,259 @@
+import asyncio
+import atexit
+import threading
+import time
+
+import httpx
+
+from config import (
+    ADMIN_SERVER,
+    ADMIN_TIMEOUT,
+    CHATBOT_SERVER,
+    CHATBOT_TIMEOUT,
+    HTTP_MAX_CONNECTIONS,
+)
+from utils.metrics import Counter, Gauge, Histogram
+
+try:
+    import h2  # noqa: F401
+
+    # h2 패키지가 있으면 HTTPS 서버와 HTTP/2로 통신 (연결 하나로 요청 다중화)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# 사용하지 않는 keep-alive 연결을 유지하는 시간(초)
+KEEPALIVE_EXPIRY = 30.0
+
+OUTBOUND_REQUEST_SECONDS = Histogram(
+    "outbound_request_seconds",
+    "외부 서버로 보낸 HTTP 요청의 소요 시간(초)",
+    labelnames=("target", "path"),
+)
+OUTBOUND_REQUEST_FAILURES = Counter(
+    "outbound_request_failures_total",
+    "외부 서버 요청 실패 횟수 (연결 오류, 시간 초과 또는 4xx/5xx 응답)",
+    labelnames=("target", "path"),
+)
+OUTBOUND_REQUESTS_IN_FLIGHT = Gauge(
+    "outbound_requests_in_flight",
+    "응답을 기다리는 중인 외부 서버 요청 수",
+    labelnames=("target",),
+)
+
+
+class OutboundHttpClient:
+    """
+    모든 외부 HTTP 요청이 공유하는 연결 풀.
+    전용 스레드의 이벤트 루프에서 목적지별 httpx.AsyncClient를 하나씩 유지하여
+    TCP/TLS 연결을 재사용하고, 목적지마다 제한 시간과 최대 연결 수를 따로 적용합니다.
+    동기 코드(추적 스레드, 전송 큐)와 비동기 코드(라우터) 모두에서 사용할 수 있습니다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loop = None
+        self._thread = None
+        # 목적지 이름 -> 설정 딕셔너리
+        self._destinations = {}
+        # 목적지 이름 -> (httpx.AsyncClient, 전송 계층)
+        self._clients = {}
+        # 목적지 이름 -> 요청 통계
+        self._stats = {}
+
+    def register(self, name, base_url, timeout, max_connections=None, **client_args):
+        """
+        요청을 보낼 목적지를 등록합니다 (같은 이름이면 설정을 덮어씀).
+
+        Args:
+            name: 목적지 이름 (지표 라벨로도 사용)
+            base_url: 기본 URL (예: http://chatbot:8000)
+            timeout: 요청 하나의 전체 제한 시간(초)
+            max_connections: 최대 동시 연결 수 (None이면 HTTP_MAX_CONNECTIONS)
+            client_args: httpx.AsyncClient에 그대로 전달할 인자 (auth, verify, headers 등)
+        """
+        with self._lock:
+            self._destinations[name] = {
+                "base_url": base_url or "",
+                "timeout": timeout,
+                "max_connections": max_connections or HTTP_MAX_CONNECTIONS,
+                "client_args": client_args,
+            }
+            self._stats.setdefault(
+                name,
+                {"requests": 0, "failures": 0, "in_flight": 0, "last_latency": None},
+            )
+            stale = self._clients.pop(name, None)
+        if stale is not None and self._loop is not None:
+            asyncio.run_coroutine_threadsafe(stale[0].aclose(), self._loop)
+
+    def _ensure_loop(self):
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever, name="http-client", daemon=True
+                )
+                self._thread.start()
+            return self._loop
+
+    def _get_client(self, name):
+        # 이벤트 루프 스레드에서만 호출 (httpx 클라이언트는 만든 루프에 묶임)
+        entry = self._clients.get(name)
+        if entry is None:
+            with self._lock:
+                destination = self._destinations.get(name)
+            if destination is None:
+                raise KeyError(f"등록되지 않은 목적지입니다: {name}")
+            limits = httpx.Limits(
+                max_connections=destination["max_connections"],
+                max_keepalive_connections=destination["max_connections"],
+                keepalive_expiry=KEEPALIVE_EXPIRY,
+            )
+            client_args = dict(destination["client_args"])
+            transport = httpx.AsyncHTTPTransport(
+                limits=limits,
+                http2=HTTP2_AVAILABLE,
+                verify=client_args.pop("verify", True),
+            )
+            client = httpx.AsyncClient(
+                base_url=destination["base_url"],
+                timeout=destination["timeout"],
+                transport=transport,
+                **client_args,
+            )
+            entry = self._clients[name] = (client, transport)
+        return entry[0]
+
+    async def _request(self, name, method, path, route=None, **kwargs):
+        client = self._get_client(name)
+        timeout = self._destinations[name]["timeout"]
+        stats = self._stats[name]
+        labels = {"target": name, "path": route or path}
+
+        stats["requests"] += 1
+        stats["in_flight"] += 1
+        OUTBOUND_REQUESTS_IN_FLIGHT.inc(target=name)
+        started = time.perf_counter()
+        try:
+            # httpx의 제한 시간은 단계(연결/읽기 등)별로 적용되므로 전체 시간도 제한
+            response = await asyncio.wait_for(
+                client.request(method, path, **kwargs), timeout
+            )
+        except asyncio.TimeoutError:
+            stats["failures"] += 1
+            OUTBOUND_REQUEST_FAILURES.inc(**labels)
+            raise httpx.TimeoutException(
+                f"{name} 요청이 {timeout}초 안에 끝나지 않았습니다: {method} {path}"
+            )
+        except BaseException:
+            stats["failures"] += 1
+            OUTBOUND_REQUEST_FAILURES.inc(**labels)
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            stats["in_flight"] -= 1
+            stats["last_latency"] = round(elapsed, 4)
+            OUTBOUND_REQUESTS_IN_FLIGHT.dec(target=name)
+            OUTBOUND_REQUEST_SECONDS.observe(elapsed, **labels)
+
+        if response.status_code >= 400:
+            stats["failures"] += 1
+            OUTBOUND_REQUEST_FAILURES.inc(**labels)
+        return response
+
+    def submit(self, name, method, path, route=None, **kwargs):
+        """
+        요청을 연결 풀의 이벤트 루프에 넣고 concurrent.futures.Future를 반환합니다.
+        """
+        loop = self._ensure_loop()
+        return asyncio.run_coroutine_threadsafe(
+            self._request(name, method, path, route, **kwargs), loop
+        )
+
+    def request_sync(self, name, method, path, route=None, **kwargs):
+        """
+        동기 코드에서 요청을 보내고 응답을 기다립니다.
+
+        Args:
+            name: 목적지 이름
+            method: HTTP 메서드
+            path: 기본 URL 뒤에 붙일 경로
+            route: 지표 라벨에 쓸 경로 (경로에 ID가 들어가는 경우 패턴을 지정)
+            kwargs: httpx 요청 인자 (json, content, headers 등)
+
+        Returns:
+            httpx.Response
+
+        Raises:
+            httpx.HTTPError: 연결 실패, 목적지의 제한 시간 초과 등
+        """
+        return self.submit(name, method, path, route, **kwargs).result()
+
+    async def request(self, name, method, path, route=None, **kwargs):
+        """
+        비동기 코드(FastAPI 핸들러 등)에서 요청을 보내고 응답을 기다립니다.
+        요청은 연결 풀의 이벤트 루프에서 실행되므로 호출한 이벤트 루프를 막지 않습니다.
+        """
+        return await asyncio.wrap_future(
+            self.submit(name, method, path, route, **kwargs)
+        )
+
+    def post_sync(self, name, path, route=None, **kwargs):
+        return self.request_sync(name, "POST", path, route, **kwargs)
+
+    async def post(self, name, path, route=None, **kwargs):
+        return await self.request(name, "POST", path, route, **kwargs)
+
+    def stats(self):
+        """
+        목적지별 요청 수, 실패 수, 진행 중인 요청 수와 연결 풀 사용 현황을 반환합니다.
+        """
+        with self._lock:
+            destinations = dict(self._destinations)
+            clients = dict(self._clients)
+        result = {"http2": HTTP2_AVAILABLE, "destinations": {}}
+        for name, destination in destinations.items():
+            info = dict(self._stats.get(name, {}))
+            info.update(
+                base_url=destination["base_url"],
+                timeout=destination["timeout"],
+                max_connections=destination["max_connections"],
+            )
+            entry = clients.get(name)
+            # 연결 풀 내부 상태는 httpcore 구현에 의존하므로 읽을 수 있을 때만 보고
+            pool = getattr(entry[1], "_pool", None) if entry is not None else None
+            connections = list(getattr(pool, "connections", []))
+            info["connections"] = len(connections)
+            info["idle_connections"] = sum(
+                1 for connection in connections if connection.is_idle()
+            )
+            result["destinations"][name] = info
+        return result
+
+    def close(self):
+        """모든 연결을 닫고 이벤트 루프 스레드를 종료합니다."""
+        with self._lock:
+            loop = self._loop
+            clients = list(self._clients.values())
+            self._clients.clear()
+            self._loop = None
+        if loop is None:
+            return
+
+        async def close_clients():
+            for client, _ in clients:
+                await client.aclose()
+
+        try:
+            asyncio.run_coroutine_threadsafe(close_clients(), loop).result(timeout=5)
+        except Exception as e:
+            print(f"HTTP 연결 종료 중 오류: {e}")
+        loop.call_soon_threadsafe(loop.stop)
+
+
+# 모든 모듈이 공유하는 외부 요청 클라이언트
+http_client = OutboundHttpClient()
+http_client.register("chatbot", CHATBOT_SERVER, CHATBOT_TIMEOUT)
+http_client.register("admin", ADMIN_SERVER, ADMIN_TIMEOUT)
+atexit.register(http_client.close)
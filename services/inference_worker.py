@@ -0,0 +1,225 @@
+import atexit
+import os
+import queue
+import subprocess
+import sys
+import threading
+from multiprocessing import resource_tracker, shared_memory
+from multiprocessing.connection import Client, Listener
+
+import numpy as np
+
+from services.detections import DETECTION_DTYPE
+
+# 워커 응답을 기다릴 최대 시간(초). 첫 요청은 워커의 모델 로드 시간을 포함함
+INFERENCE_TIMEOUT = 60.0
+
+# 워커를 `python -m services.inference_worker`로 실행할 때 필요한 프로젝트 루트
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _worker_main(conn, backend, weights, imgsz):
+    """
+    추론 워커 프로세스 본체. 공유 메모리의 프레임을 복사 없이 읽어 추론하고,
+    감지 결과를 구조화 배열의 바이트로 돌려보냅니다.
+    """
+    from services.detector_backend import load_detector_backend
+
+    detector = load_detector_backend(backend, weights, imgsz)
+    shm = None
+    try:
+        while True:
+            try:
+                job = conn.recv()
+            except EOFError:
+                break
+            if job is None:
+                break
+
+            shm_name, shape, frame_ts = job
+            try:
+                if shm is None or shm.name != shm_name:
+                    # 프레임 크기가 커져서 부모가 공유 메모리를 새로 만든 경우 다시 연결
+                    if shm is not None:
+                        shm.close()
+                    # 공유 메모리의 수명(unlink)은 부모 프로세스가 관리하므로, 워커가 종료될 때
+                    # 워커 쪽 resource_tracker가 공유 메모리를 지우지 않도록 등록 해제
+                    shm = shared_memory.SharedMemory(name=shm_name)
+                    resource_tracker.unregister(shm._name, "shared_memory")
+
+                frame = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf)
+                detections = detector.detect(frame, frame_ts)
+                del frame
+                conn.send(("ok", detections.tobytes()))
+            except Exception as e:
+                conn.send(("error", str(e)))
+    finally:
+        if shm is not None:
+            shm.close()
+
+
+def _serve(backend, weights, imgsz):
+    """
+    워커 프로세스 진입점. 표준 입력으로 인증 키를 받아 연결 대기 주소를 표준 출력으로
+    알려주고, 부모 프로세스가 연결하면 추론 요청을 처리합니다.
+    """
+    authkey = bytes.fromhex(sys.stdin.readline().strip())
+    with Listener(authkey=authkey) as listener:
+        print(listener.address, flush=True)
+        # 이후 출력(모델 로드 로그 등)은 부모가 더 읽지 않으므로 표준 오류로 보냄
+        os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+        conn = listener.accept()
+    _worker_main(conn, backend, weights, int(imgsz))
+
+
+class _WorkerProcess:
+    """추론 워커 프로세스 하나와, 그 워커에게 프레임을 넘기는 공유 메모리 블록"""
+
+    def __init__(self, backend, weights, imgsz, frame_bytes):
+        self.shm = shared_memory.SharedMemory(create=True, size=frame_bytes)
+        # multiprocessing spawn은 자식에서 __main__(main.py)을 다시 import하여 앱과
+        # 라우터를 또 만들므로, main.py를 import하지 않는 별도 진입점으로 실행
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(
+            filter(None, [PROJECT_ROOT, env.get("PYTHONPATH")])
+        )
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "services.inference_worker"]
+            + [backend, weights, str(imgsz)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            env=env,
+        )
+        authkey = os.urandom(32)
+        try:
+            self.process.stdin.write(authkey.hex().encode() + b"\n")
+            self.process.stdin.close()
+            address = self.process.stdout.readline().decode().strip()
+            self.process.stdout.close()
+            if not address:
+                raise RuntimeError(
+                    f"추론 워커 시작 실패 (종료 코드 {self.process.wait()})"
+                )
+            self.conn = Client(address, authkey=authkey)
+        except BaseException:
+            self.process.kill()
+            self.process.wait()
+            self.shm.close()
+            self.shm.unlink()
+            raise
+
+    def _ensure_capacity(self, nbytes):
+        if nbytes <= self.shm.size:
+            return
+        old = self.shm
+        self.shm = shared_memory.SharedMemory(create=True, size=nbytes)
+        old.close()
+        old.unlink()
+
+    def detect(self, frame, frame_ts=0.0, timeout=INFERENCE_TIMEOUT):
+        frame = np.ascontiguousarray(frame, dtype=np.uint8)
+        self._ensure_capacity(frame.nbytes)
+
+        # 피클링 없이 공유 메모리에 한 번만 복사하고, 파이프로는 위치 정보만 전달
+        view = np.ndarray(frame.shape, dtype=np.uint8, buffer=self.shm.buf)
+        view[...] = frame
+        del view
+        self.conn.send((self.shm.name, frame.shape, frame_ts))
+
+        if not self.conn.poll(timeout):
+            raise TimeoutError(f"추론 워커가 {timeout}초 안에 응답하지 않았습니다.")
+        status, payload = self.conn.recv()
+        if status != "ok":
+            raise RuntimeError(f"추론 워커 오류: {payload}")
+        return np.frombuffer(payload, dtype=DETECTION_DTYPE)
+
+    def close(self):
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        try:
+            self.process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+        self.conn.close()
+        self.shm.close()
+        self.shm.unlink()
+
+
+class InferenceProcessPool:
+    """
+    사람 감지를 별도 프로세스 풀에서 실행합니다. 서버 프로세스의 GIL과 경쟁하지 않으며,
+    DetectorBackend와 같은 detect() 인터페이스를 제공합니다.
+    """
+
+    def __init__(self, workers, backend="torch", weights="yolov8n.pt", imgsz=640):
+        self.name = f"{backend} (프로세스 {workers}개)"
+        self.workers = workers
+        self.imgsz = imgsz
+        self._worker_args = (backend, weights, imgsz)
+        self._idle = queue.Queue()
+        self._all = []
+        self._lock = threading.Lock()
+        for _ in range(workers):
+            self._idle.put(self._start_worker())
+        atexit.register(self.close)
+
+    def _start_worker(self):
+        worker = _WorkerProcess(*self._worker_args, self.imgsz * self.imgsz * 3)
+        with self._lock:
+            self._all.append(worker)
+        return worker
+
+    def _discard_worker(self, worker):
+        with self._lock:
+            if worker in self._all:
+                self._all.remove(worker)
+        worker.close()
+
+    def detect(self, frame, frame_ts=0.0):
+        """
+        유휴 워커 하나에 프레임을 넘겨 사람을 감지합니다.
+
+        Returns:
+            DETECTION_DTYPE 구조화 배열
+        """
+        # 유휴 큐의 None은 워커를 다시 시작하지 못한 자리 (이번 요청에서 다시 시도)
+        worker = self._idle.get()
+        try:
+            if worker is None:
+                worker = self._start_worker()
+            return worker.detect(frame, frame_ts)
+        except (TimeoutError, EOFError, OSError) as e:
+            # 응답이 없거나 죽은 워커는 새 워커로 교체 (교체에 실패하면 빈 자리로 남김)
+            print(f"추론 워커 재시작: {e}")
+            if worker is not None:
+                self._discard_worker(worker)
+                worker = None
+            worker = self._start_worker()
+            raise
+        finally:
+            self._idle.put(worker)
+
+    def warmup(self):
+        """모든 워커가 모델을 로드하고 한 번씩 추론하도록 동시에 요청합니다."""
+        frame = np.zeros((self.imgsz, self.imgsz, 3), dtype=np.uint8)
+        threads = [
+            threading.Thread(target=self.detect, args=(frame,))
+            for _ in range(self.workers)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def close(self):
+        with self._lock:
+            workers, self._all = self._all, []
+        for worker in workers:
+            worker.close()
+
+
+if __name__ == "__main__":
+    _serve(*sys.argv[1:4])
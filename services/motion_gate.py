@@ -0,0 +1,90 @@
+import cv2
+import time
+
+# 차분 계산용으로 축소할 프레임 너비(픽셀)
+MOTION_FRAME_WIDTH = 160
+
+# 이 값보다 밝기 차이가 큰 픽셀을 변화한 픽셀로 간주
+PIXEL_DIFF_THRESHOLD = 25
+
+
+class MotionGate:
+    """
+    축소한 흑백 프레임 차분으로 장면 변화를 저렴하게 감지하여,
+    변화가 있거나 마지막 추론 후 max_staleness초가 지났을 때만 추론을 허용합니다.
+    """
+
+    def __init__(self, threshold=0.01, max_staleness=30.0):
+        self.threshold = threshold
+        self.max_staleness = max_staleness
+        # 마지막으로 추론한 프레임 (축소된 흑백 이미지)
+        self._reference = None
+        self._last_inference_time = None
+        self.frames = 0
+        self.inferences = 0
+        self.last_motion_ratio = 0.0
+
+    def _preprocess(self, frame):
+        height, width = frame.shape[:2]
+        scale = MOTION_FRAME_WIDTH / width
+        small = cv2.resize(
+            frame,
+            (MOTION_FRAME_WIDTH, max(1, int(height * scale))),
+            interpolation=cv2.INTER_AREA,
+        )
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        # 센서 노이즈로 인한 오탐을 줄이기 위해 블러 적용
+        return cv2.GaussianBlur(gray, (5, 5), 0)
+
+    def should_infer(self, frame, timestamp=None):
+        """
+        이 프레임에 대해 YOLO 추론을 실행해야 하는지 판단합니다.
+
+        Args:
+            frame: 카메라에서 캡처한 이미지 프레임
+            timestamp: 프레임 캡처 시각 (time.monotonic 기준, None이면 현재 시각)
+
+        Returns:
+            추론이 필요하면 True
+        """
+        if timestamp is None:
+            timestamp = time.monotonic()
+        self.frames += 1
+        current = self._preprocess(frame)
+
+        if self._reference is None or self._reference.shape != current.shape:
+            self.last_motion_ratio = 1.0
+        else:
+            # 마지막 추론 프레임과 비교하므로 느린 변화도 누적되어 감지됨
+            diff = cv2.absdiff(current, self._reference)
+            changed = cv2.countNonZero(
+                cv2.threshold(diff, PIXEL_DIFF_THRESHOLD, 255, cv2.THRESH_BINARY)[1]
+            )
+            self.last_motion_ratio = changed / diff.size
+
+        stale = (
+            self._last_inference_time is None
+            or timestamp - self._last_inference_time >= self.max_staleness
+        )
+        if self.last_motion_ratio < self.threshold and not stale:
+            return False
+
+        self._reference = current
+        self._last_inference_time = timestamp
+        self.inferences += 1
+        return True
+
+    @property
+    def gating_ratio(self):
+        """추론을 건너뛴 프레임의 비율 (0~1)"""
+        if self.frames == 0:
+            return 0.0
+        return 1 - self.inferences / self.frames
+
+    def stats(self):
+        return {
+            "frames": self.frames,
+            "inferences": self.inferences,
+            "gating_ratio": round(self.gating_ratio, 3),
+            "last_motion_ratio": round(self.last_motion_ratio, 4),
+        }
@@ -0,0 +1,126 @@
+import threading
+import time
+
+from services.fleet import get_fleet, session_key
+from services.outbox import outbox
+from utils.metrics import Counter, Gauge
+
+OCCUPANCY_EVENTS = Counter(
+    "occupancy_events_total",
+    "수신한 디바이스 인원 수 이벤트 (accepted, duplicate, stale)",
+    labelnames=("result",),
+)
+OCCUPANCY_TRANSITIONS = Counter(
+    "occupancy_transitions_total",
+    "챗봇 서버로 전달한 재실 상태 전환 수",
+    labelnames=("transition",),
+)
+OCCUPANCY_DEVICES = Gauge("occupancy_devices", "인원 수를 보고한 디바이스 수")
+
+
+class OccupancyIndex:
+    """
+    여러 시스코 디바이스가 보낸 인원 수 이벤트를 디바이스별로 중복 제거/정렬하여
+    최신 상태만 메모리에 유지하고, 사람 유무가 실제로 바뀐 경우에만
+    챗봇 서버로 sessionStart/sessionReset을 전달합니다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # device_id -> 최신 상태 딕셔너리
+        self._devices = {}
+
+    def ingest(self, events):
+        """
+        이벤트 묶음을 반영합니다.
+
+        Args:
+            events: (device_id, timestamp, seq, count) 튜플 목록.
+                    같은 timestamp의 이벤트는 seq(디바이스가 매기는 일련번호)로 순서를 판단
+
+        Returns:
+            accepted, duplicate, stale, transitions 개수를 담은 딕셔너리
+        """
+        # 묶음 안에서 도착 순서가 뒤섞여도 디바이스별 시간 순서대로 처리
+        ordered = sorted(events, key=lambda event: event[:3])
+        result = {"accepted": 0, "duplicate": 0, "stale": 0, "transitions": 0}
+        transitions = []
+        now = time.time()
+
+        with self._lock:
+            for device_id, timestamp, seq, count in ordered:
+                state = self._devices.get(device_id)
+                if state is not None:
+                    position = (timestamp, seq)
+                    last = (state["timestamp"], state["seq"])
+                    if position == last:
+                        result["duplicate"] += 1
+                        continue
+                    if position < last:
+                        # 이미 더 최신 이벤트를 반영했으므로 버림
+                        result["stale"] += 1
+                        continue
+                else:
+                    state = self._devices[device_id] = {
+                        "device_id": device_id,
+                        "present": False,
+                        "transitions": 0,
+                        "events": 0,
+                    }
+
+                present = count > 0
+                if present != state["present"]:
+                    state["transitions"] += 1
+                    transitions.append((device_id, present, count))
+                state.update(
+                    timestamp=timestamp,
+                    seq=seq,
+                    count=count,
+                    present=present,
+                    received_at=now,
+                )
+                state["events"] += 1
+                result["accepted"] += 1
+            OCCUPANCY_DEVICES.set(len(self._devices))
+
+        for name in ("accepted", "duplicate", "stale"):
+            if result[name]:
+                OCCUPANCY_EVENTS.inc(result[name], result=name)
+
+        for device_id, present, count in transitions:
+            path = "/sessionStart" if present else "/sessionReset"
+            print(f"디바이스 {device_id} 재실 상태 전환: {count}명 → POST {path}")
+            # 레지스트리에 등록된 디바이스는 정류장 카메라 추적과 같은 묶음을 사용하므로
+            # 정류장별로 전송 전 start/reset 쌍이 서로 상쇄되고 순서가 유지됨
+            stop = get_fleet().stop_for_device(device_id)
+            if stop is not None:
+                coalesce = session_key(stop.stop_id)
+            else:
+                coalesce = f"session:device:{device_id}"
+            # 챗봇 서버는 목적지 하나로 모든 정류장의 이벤트를 받으므로
+            # 어느 정류장(디바이스)의 이벤트인지 본문에 담음
+            body = {
+                "stop_id": stop.stop_id if stop is not None else None,
+                "device_id": device_id,
+            }
+            if present:
+                body["count"] = count
+            outbox.enqueue("chatbot", path, body=body, coalesce=coalesce)
+            OCCUPANCY_TRANSITIONS.inc(transition="start" if present else "reset")
+        result["transitions"] = len(transitions)
+        return result
+
+    def get(self, device_id):
+        """디바이스의 최신 상태 (없으면 None)"""
+        with self._lock:
+            state = self._devices.get(device_id)
+            return dict(state) if state is not None else None
+
+    def snapshot(self):
+        """모든 디바이스의 최신 상태 목록"""
+        with self._lock:
+            return [dict(state) for state in self._devices.values()]
+
+
+# 서버 전체가 공유하는 재실 상태 색인
+occupancy_index = OccupancyIndex()
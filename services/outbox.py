@@ -0,0 +1,409 @@
+import asyncio
+import json
+import random
+import sqlite3
+import threading
+import time
+
+from config import OUTBOX_PATH, OUTBOX_MAX_ATTEMPTS
+from services.http_client import http_client
+from utils.metrics import Counter, Gauge, Histogram
+
+# 재시도 간격: 1초부터 두 배씩 늘려 최대 5분
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 300.0
+
+# 전송이 끝난(성공/실패/상쇄) 이벤트를 보관하는 시간(초)
+RETENTION = 86400.0
+# 보관 기간이 지난 이벤트를 정리하는 주기(초)
+PURGE_INTERVAL = 3600.0
+
+# 재시도해도 결과가 달라지지 않는 4xx 응답은 영구 실패로 처리 (408, 429 제외)
+RETRYABLE_CLIENT_ERRORS = (408, 429)
+
+# /outbox에 표시할 목적지별 최근 전송 실패(failed) 이벤트 수
+RECENT_FAILURES = 5
+
+OUTBOX_PENDING = Gauge(
+    "outbox_pending_events", "전송 대기 중인 이벤트 수", labelnames=("destination",)
+)
+OUTBOX_DELIVERIES = Counter(
+    "outbox_delivery_attempts_total",
+    "이벤트 전송 시도 결과 (delivered, retry, failed)",
+    labelnames=("destination", "result"),
+)
+OUTBOX_COALESCED = Counter(
+    "outbox_coalesced_total",
+    "전송 전에 합쳐지거나 상쇄되어 보내지 않은 이벤트 수",
+    labelnames=("destination",),
+)
+OUTBOX_DELIVERY_DELAY = Histogram(
+    "outbox_delivery_delay_seconds",
+    "이벤트를 큐에 넣은 뒤 전송 완료까지 걸린 시간(초)",
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 5, 15, 60, 300, 900, 3600),
+    labelnames=("destination",),
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    destination TEXT NOT NULL,
+    method TEXT NOT NULL,
+    path TEXT NOT NULL,
+    route TEXT,
+    body TEXT,
+    coalesce_key TEXT,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    next_attempt_at REAL NOT NULL,
+    finished_at REAL,
+    last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS outbox_pending
+    ON outbox (destination, status, id);
+CREATE INDEX IF NOT EXISTS outbox_ordering
+    ON outbox (destination, coalesce_key, status, id);
+"""
+
+
+class Outbox:
+    """
+    외부 서버로 보낼 이벤트를 SQLite에 먼저 저장하고, 목적지별 백그라운드 스레드가
+    전송하는 영구 큐입니다.
+    네트워크 오류나 5xx 응답은 지수 백오프로 max_attempts회까지 재시도한 뒤 failed
+    상태로 남깁니다. 순서는 같은 coalesce 묶음 안에서만 지키며(앞의 이벤트가 끝날 때까지
+    대기), 재시도를 기다리는 이벤트가 다른 묶음의 이벤트 전송을 막지 않습니다.
+    서버가 재시작되어도 전송하지 못한 이벤트는 start()에서 다시 전송됩니다.
+    """
+
+    def __init__(self, path, max_attempts=OUTBOX_MAX_ATTEMPTS):
+        self.path = path
+        self.max_attempts = max_attempts
+        self._cond = threading.Condition()
+        self._db = None
+        self._senders = {}
+        # 목적지 -> 현재 전송 중인 이벤트 ID
+        self._in_flight = {}
+        self._last_purge = 0.0
+
+    def _connect(self):
+        # self._cond를 잡은 상태에서 호출
+        if self._db is None:
+            db = sqlite3.connect(self.path, check_same_thread=False)
+            db.row_factory = sqlite3.Row
+            db.execute("PRAGMA journal_mode=WAL")
+            # 비상 알림이 전원 차단으로 사라지지 않도록 커밋마다 디스크에 기록
+            # (enqueue가 디스크 동기화를 기다리므로 비동기 코드에서는 enqueue_async 사용)
+            db.execute("PRAGMA synchronous=FULL")
+            db.executescript(SCHEMA)
+            self._db = db
+        return self._db
+
+    def start(self):
+        """이전 실행에서 전송하지 못한 이벤트가 있으면 전송 스레드를 시작합니다."""
+        with self._cond:
+            db = self._connect()
+            rows = db.execute(
+                "SELECT DISTINCT destination FROM outbox WHERE status = 'pending'"
+            ).fetchall()
+            self._purge(db)
+            self._update_pending(db)
+        for row in rows:
+            print(f"전송하지 못한 이벤트 재전송 시작: {row['destination']}")
+            self._ensure_sender(row["destination"])
+
+    def enqueue(
+        self, destination, path, method="POST", route=None, body=None, coalesce=None
+    ):
+        """
+        이벤트를 큐에 저장합니다. 전송은 기다리지 않지만 저장할 때 디스크 동기화를
+        기다리므로, 이벤트 루프에서는 enqueue_async를 사용합니다.
+
+        Args:
+            destination: http_client에 등록된 목적지 이름
+            path: 요청 경로
+            method: HTTP 메서드
+            route: 지표 라벨에 쓸 경로 패턴
+            body: JSON으로 보낼 본문 (None이면 본문 없음)
+            coalesce: 합칠 수 있는 이벤트 묶음 이름 (예: "session:1").
+                      같은 묶음의 이벤트는 저장한 순서대로 전송함.
+                      같은 묶음에서 아직 보내지 않은 이벤트가 같은 요청(메서드와 경로,
+                      본문은 비교하지 않음)이면 새 이벤트를 버리고, 다른 요청(예: sessionStart 뒤의 sessionReset)이면
+                      서로 상쇄하여 둘 다 보내지 않음
+
+        Returns:
+            이벤트 ID (상쇄되어 저장하지 않은 경우 None)
+        """
+        now = time.time()
+        encoded = json.dumps(body) if body is not None else None
+        with self._cond:
+            db = self._connect()
+            if coalesce is not None:
+                last = db.execute(
+                    "SELECT id, method, path FROM outbox "
+                    "WHERE destination = ? AND coalesce_key = ? AND status = 'pending' "
+                    "ORDER BY id DESC LIMIT 1",
+                    (destination, coalesce),
+                ).fetchone()
+                # 이미 전송 중인 이벤트는 합치지 않음
+                if last is not None and last["id"] != self._in_flight.get(destination):
+                    if (last["method"], last["path"]) == (method, path):
+                        # 같은 이벤트가 이미 대기 중이면 새 이벤트는 버림
+                        OUTBOX_COALESCED.inc(destination=destination)
+                        return last["id"]
+                    with db:
+                        db.execute(
+                            "UPDATE outbox SET status = 'coalesced', finished_at = ? "
+                            "WHERE id = ?",
+                            (now, last["id"]),
+                        )
+                    # 대기 중이던 이벤트와 새 이벤트 모두 보내지 않음
+                    OUTBOX_COALESCED.inc(2, destination=destination)
+                    self._update_pending(db)
+                    print(
+                        f"전송 전 이벤트 상쇄: {last['path']} + {path} ({destination})"
+                    )
+                    self._cond.notify_all()
+                    return None
+
+            with db:
+                cursor = db.execute(
+                    "INSERT INTO outbox (destination, method, path, route, body, "
+                    "coalesce_key, created_at, next_attempt_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (destination, method, path, route, encoded, coalesce, now, now),
+                )
+            self._update_pending(db)
+            self._cond.notify_all()
+            event_id = cursor.lastrowid
+        self._ensure_sender(destination)
+        return event_id
+
+    async def enqueue_async(self, destination, path, **kwargs):
+        """비동기 코드에서 이벤트를 저장합니다 (디스크 동기화 동안 이벤트 루프를 막지 않음)."""
+        return await asyncio.to_thread(self.enqueue, destination, path, **kwargs)
+
+    def status(self, event_id):
+        """
+        이벤트의 전송 상태를 반환합니다.
+
+        Returns:
+            상태(pending, delivered, failed, coalesced), 시도 횟수, 마지막 오류를 담은
+            딕셔너리 (없는 ID면 None)
+        """
+        with self._cond:
+            row = (
+                self._connect()
+                .execute(
+                    "SELECT status, attempts, last_error, created_at, finished_at "
+                    "FROM outbox WHERE id = ?",
+                    (event_id,),
+                )
+                .fetchone()
+            )
+        return dict(row) if row is not None else None
+
+    def wait(self, event_id, timeout=None):
+        """
+        이벤트가 pending 상태를 벗어날 때까지 기다립니다.
+
+        Returns:
+            마지막으로 확인한 status() 결과
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            status = self.status(event_id)
+            if status is None or status["status"] != "pending":
+                return status
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return status
+            with self._cond:
+                # 상태 확인과 대기 사이에 알림을 놓칠 수 있으므로 주기적으로 다시 확인
+                self._cond.wait(timeout=min(remaining or 1.0, 1.0))
+
+    def stats(self):
+        """
+        목적지별 대기 중인 이벤트 수와 가장 오래 기다린 이벤트의 대기 시간,
+        전송을 포기한(failed) 이벤트 수와 최근 실패 이벤트를 반환합니다.
+        """
+        now = time.time()
+        with self._cond:
+            db = self._connect()
+            rows = db.execute(
+                "SELECT destination, SUM(status = 'pending') AS pending, "
+                "SUM(status = 'failed') AS failed, "
+                "MIN(CASE WHEN status = 'pending' THEN created_at END) AS oldest, "
+                "MAX(CASE WHEN status = 'pending' THEN attempts END) AS attempts "
+                "FROM outbox WHERE status IN ('pending', 'failed') GROUP BY destination"
+            ).fetchall()
+            failures = {}
+            for row in rows:
+                if row["failed"]:
+                    failures[row["destination"]] = db.execute(
+                        "SELECT id, method, path, attempts, last_error, finished_at "
+                        "FROM outbox WHERE destination = ? AND status = 'failed' "
+                        "ORDER BY id DESC LIMIT ?",
+                        (row["destination"], RECENT_FAILURES),
+                    ).fetchall()
+            in_flight = dict(self._in_flight)
+        return {
+            row["destination"]: {
+                "pending": row["pending"],
+                "oldest_age": (
+                    round(now - row["oldest"], 3) if row["oldest"] is not None else None
+                ),
+                "max_attempts": row["attempts"],
+                "in_flight": in_flight.get(row["destination"]),
+                "failed": row["failed"],
+                "recent_failures": [
+                    dict(failure) for failure in failures.get(row["destination"], [])
+                ],
+            }
+            for row in rows
+        }
+
+    def _update_pending(self, db):
+        counts = dict(
+            db.execute(
+                "SELECT destination, COUNT(*) FROM outbox WHERE status = 'pending' "
+                "GROUP BY destination"
+            ).fetchall()
+        )
+        for destination in set(counts) | set(self._senders):
+            OUTBOX_PENDING.set(counts.get(destination, 0), destination=destination)
+
+    def _purge(self, db):
+        now = time.time()
+        if now - self._last_purge < PURGE_INTERVAL:
+            return
+        self._last_purge = now
+        with db:
+            db.execute(
+                "DELETE FROM outbox WHERE status != 'pending' AND finished_at < ?",
+                (now - RETENTION,),
+            )
+
+    def _ensure_sender(self, destination):
+        with self._cond:
+            thread = self._senders.get(destination)
+            if thread is not None and thread.is_alive():
+                return
+            thread = threading.Thread(
+                target=self._sender_loop,
+                args=(destination,),
+                name=f"outbox-{destination}",
+                daemon=True,
+            )
+            self._senders[destination] = thread
+            thread.start()
+
+    def _next_event(self, destination):
+        # 목적지에서 가장 먼저 보낼 수 있는 대기 이벤트 (self._cond를 잡은 상태에서 호출).
+        # 같은 coalesce 묶음에 더 오래된 대기 이벤트가 있으면 그 이벤트가 끝날 때까지
+        # 보내지 않고, 나머지 중에서 재시도 시각이 가장 이른 이벤트를 고름
+        return (
+            self._connect()
+            .execute(
+                "SELECT * FROM outbox AS event "
+                "WHERE destination = ? AND status = 'pending' "
+                "AND (coalesce_key IS NULL OR NOT EXISTS ("
+                "SELECT 1 FROM outbox AS earlier "
+                "WHERE earlier.destination = event.destination "
+                "AND earlier.coalesce_key = event.coalesce_key "
+                "AND earlier.status = 'pending' AND earlier.id < event.id)) "
+                "ORDER BY next_attempt_at, id LIMIT 1",
+                (destination,),
+            )
+            .fetchone()
+        )
+
+    def _sender_loop(self, destination):
+        while True:
+            with self._cond:
+                event = self._next_event(destination)
+                if event is None:
+                    self._purge(self._connect())
+                    self._cond.wait(timeout=60.0)
+                    continue
+                delay = event["next_attempt_at"] - time.time()
+                if delay > 0:
+                    self._cond.wait(timeout=delay)
+                    continue
+                self._in_flight[destination] = event["id"]
+
+            try:
+                self._deliver(destination, event)
+            finally:
+                with self._cond:
+                    self._in_flight.pop(destination, None)
+                    self._update_pending(self._connect())
+                    self._cond.notify_all()
+
+    def _deliver(self, destination, event):
+        kwargs = {}
+        if event["body"] is not None:
+            kwargs["json"] = json.loads(event["body"])
+        attempts = event["attempts"] + 1
+        try:
+            response = http_client.request_sync(
+                destination, event["method"], event["path"], event["route"], **kwargs
+            )
+            if response.status_code < 400:
+                result, error = "delivered", None
+            elif (
+                response.status_code < 500
+                and response.status_code not in RETRYABLE_CLIENT_ERRORS
+            ):
+                result, error = "failed", f"HTTP {response.status_code}"
+            else:
+                result, error = "retry", f"HTTP {response.status_code}"
+        except KeyError as e:
+            # 등록되지 않은 목적지는 재시도해도 보낼 수 없음
+            result, error = "failed", str(e)
+        except Exception as e:
+            result, error = "retry", f"{type(e).__name__}: {e}"
+        if result == "retry" and attempts >= self.max_attempts:
+            # 계속 실패하는 이벤트는 전송을 포기하고 failed 상태로 남김
+            result = "failed"
+            error = f"{error} (최대 시도 횟수 {self.max_attempts}회 초과)"
+
+        now = time.time()
+        OUTBOX_DELIVERIES.inc(destination=destination, result=result)
+        with self._cond:
+            db = self._connect()
+            with db:
+                if result == "retry":
+                    delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** (attempts - 1))
+                    # 여러 키오스크가 동시에 재시도하지 않도록 약간의 지터 추가
+                    delay *= random.uniform(0.8, 1.2)
+                    db.execute(
+                        "UPDATE outbox SET attempts = ?, next_attempt_at = ?, "
+                        "last_error = ? WHERE id = ?",
+                        (attempts, now + delay, error, event["id"]),
+                    )
+                else:
+                    db.execute(
+                        "UPDATE outbox SET status = ?, attempts = ?, finished_at = ?, "
+                        "last_error = ? WHERE id = ?",
+                        (result, attempts, now, error, event["id"]),
+                    )
+
+        path = f"{event['method']} {event['path']}"
+        if result == "delivered":
+            OUTBOX_DELIVERY_DELAY.observe(
+                now - event["created_at"], destination=destination
+            )
+            print(f"{destination} 전송 완료: {path} ({response.status_code})")
+        elif result == "failed":
+            print(f"{destination} 전송 실패 (재시도하지 않음): {path} - {error}")
+        else:
+            print(
+                f"{destination} 전송 실패, {delay:.1f}초 후 재시도 ({attempts}회): "
+                f"{path} - {error}"
+            )
+
+
+# 서버 전체가 공유하는 전송 큐
+outbox = Outbox(OUTBOX_PATH)
@@ -0,0 +1,186 @@
+import threading
+import time
+
+from services.xapi_client import get_device_client
+
+# 디바이스 RoomAnalytics 인원 수 경로
+PEOPLE_COUNT_LOCATION = "/Status/RoomAnalytics/PeopleCount/Current"
+
+
+class DevicePeopleCount:
+    """
+    시스코 디바이스가 계산한 RoomAnalytics 인원 수를 백그라운드에서 주기적으로 조회하여
+    캐시합니다. 추적 스레드는 네트워크를 기다리지 않고 캐시된 값만 읽습니다.
+    """
+
+    def __init__(self, poll_interval=1.0, client=None):
+        self.poll_interval = poll_interval
+        # 조회할 디바이스의 XapiClient (None이면 config의 디바이스)
+        self.client = client
+        # 이 시간보다 오래된 값은 사용하지 않음 (디바이스 연결 끊김 등)
+        self.max_age = poll_interval * 3
+        self._lock = threading.Lock()
+        self._count = None
+        self._updated_at = None
+        self._available = None
+        self._thread = None
+        self.polls = 0
+        self.errors = 0
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(
+                target=self._poll_loop, name="device-people-count", daemon=True
+            )
+            self._thread.start()
+
+    def _poll_loop(self):
+        client = self.client or get_device_client()
+        while True:
+            started = time.monotonic()
+            try:
+                root = client.getxml(PEOPLE_COUNT_LOCATION)
+                count = int(root.findtext(".//PeopleCount/Current", "-1"))
+                # 인원 수 감지가 꺼져 있거나 지원하지 않으면 디바이스가 -1을 반환
+                available = count >= 0
+                error = None if available else "RoomAnalytics 인원 수 감지가 꺼져 있음"
+            except Exception as e:
+                count, available, error = None, False, str(e)
+
+            with self._lock:
+                self.polls += 1
+                if available:
+                    self._count = count
+                    self._updated_at = time.monotonic()
+                else:
+                    self.errors += 1
+                changed = available != self._available
+                self._available = available
+            if changed:
+                if available:
+                    print("디바이스 인원 수 사용 가능")
+                else:
+                    print(f"디바이스 인원 수를 사용할 수 없습니다: {error}")
+
+            elapsed = time.monotonic() - started
+            time.sleep(max(0.0, self.poll_interval - elapsed))
+
+    def current(self):
+        """최근에 조회한 디바이스 인원 수 (없거나 오래된 경우 None)"""
+        with self._lock:
+            if self._updated_at is None:
+                return None
+            if time.monotonic() - self._updated_at > self.max_age:
+                return None
+            return self._count
+
+    def stats(self):
+        with self._lock:
+            return {
+                "count": self._count,
+                "age": (
+                    round(time.monotonic() - self._updated_at, 3)
+                    if self._updated_at is not None
+                    else None
+                ),
+                "available": bool(self._available),
+                "polls": self.polls,
+                "errors": self.errors,
+            }
+
+
+class CountSourceSelector:
+    """
+    디바이스 인원 수를 기본으로 사용하고, 디바이스 값이 없거나 YOLO와 어긋날 때만
+    YOLO로 대체합니다. cross_check_interval마다 YOLO로 재실행하여 사람 유무가
+    disagree_limit번 연속으로 다르면 fallback_hold초 동안 YOLO를 사용합니다.
+    """
+
+    def __init__(
+        self,
+        device_count,
+        cross_check_interval=30.0,
+        disagree_limit=2,
+        fallback_hold=300.0,
+    ):
+        self.device_count = device_count
+        self.cross_check_interval = cross_check_interval
+        self.disagree_limit = disagree_limit
+        self.fallback_hold = fallback_hold
+        self.active_source = None
+        self._last_check = None
+        self._consecutive_disagreements = 0
+        self._fallback_until = 0.0
+        self.cross_checks = 0
+        self.disagreements = 0
+        self.yolo_frames = 0
+        self.device_frames = 0
+
+    def _use(self, source):
+        if source != self.active_source:
+            print(f"인원 수 공급원 전환: {self.active_source} → {source}")
+            self.active_source = source
+        if source == "device":
+            self.device_frames += 1
+        else:
+            self.yolo_frames += 1
+
+    def count(self, yolo_count):
+        """
+        현재 사용할 인원 수를 반환합니다.
+
+        Args:
+            yolo_count: YOLO로 인원 수를 계산하는 함수 (필요할 때만 호출)
+
+        Returns:
+            인원 수
+        """
+        now = time.monotonic()
+        device = self.device_count.current()
+        if device is None:
+            self._use("yolo")
+            return yolo_count()
+        if now < self._fallback_until:
+            self._use("yolo")
+            return yolo_count()
+
+        if (
+            self._last_check is None
+            or now - self._last_check >= self.cross_check_interval
+        ):
+            # 디바이스 값이 맞는지 주기적으로 YOLO와 비교 (인원 수가 아니라 사람 유무 기준)
+            self._last_check = now
+            self.cross_checks += 1
+            yolo = yolo_count()
+            if (yolo > 0) != (device > 0):
+                self.disagreements += 1
+                self._consecutive_disagreements += 1
+                print(f"디바이스 인원 수({device})와 YOLO({yolo})가 다릅니다.")
+                if self._consecutive_disagreements >= self.disagree_limit:
+                    self._fallback_until = now + self.fallback_hold
+                    # 대체 기간이 끝나면 바로 다시 비교하고, 한 번만 더 어긋나도 YOLO 유지
+                    self._last_check = None
+                    self._consecutive_disagreements = self.disagree_limit - 1
+                    print(f"{self.fallback_hold:.0f}초 동안 YOLO 인원 수를 사용합니다.")
+                    self._use("yolo")
+                    return yolo
+            else:
+                self._consecutive_disagreements = 0
+
+        self._use("device")
+        return device
+
+    def stats(self):
+        return {
+            "active_source": self.active_source,
+            "device": self.device_count.stats(),
+            "cross_checks": self.cross_checks,
+            "disagreements": self.disagreements,
+            "fallback_remaining": round(
+                max(0.0, self._fallback_until - time.monotonic()), 1
+            ),
+            "device_frames": self.device_frames,
+            "yolo_frames": self.yolo_frames,
+        }
@@ -0,0 +1,78 @@
+from config import STT_PARTIAL_INTERVAL, STT_MAX_AUDIO_SECONDS
+from services.audio_decoder import AudioTooLong, FfmpegPcmDecoder
+from services.speech_to_text import pcm_to_text
+
+
+class StreamingTranscriber:
+    """
+    녹음 중인 오디오 조각을 받는 즉시 디코딩하고, 새 오디오가 partial_interval초
+    쌓일 때마다 그때까지의 음성으로 중간 결과를, 녹음이 끝나면 최종 결과를 만듭니다.
+    업로드가 끝난 뒤에 디코딩을 시작하지 않으므로 최종 결과는 마지막 조각의
+    디코딩과 인식 한 번만 기다리면 됩니다.
+
+    메서드는 모두 블로킹 호출이므로 비동기 코드에서는 스레드에서 실행합니다.
+    """
+
+    def __init__(
+        self,
+        language="ko-KR",
+        input_format="webm",
+        partial_interval=STT_PARTIAL_INTERVAL,
+        max_seconds=STT_MAX_AUDIO_SECONDS,
+    ):
+        self.language = language
+        self.partial_interval = partial_interval
+        self.max_seconds = max_seconds
+        self.decoder = FfmpegPcmDecoder(input_format)
+        # 마지막 중간 결과를 만들 때까지 디코딩된 오디오 길이(초)
+        self._partial_seconds = 0.0
+        self.last_partial = ""
+
+    def feed(self, chunk):
+        """
+        오디오 조각을 디코더에 넣습니다.
+
+        Raises:
+            AudioTooLong: 최대 길이(max_seconds)를 넘은 경우
+            RuntimeError: 디코딩에 실패한 경우
+        """
+        self.decoder.write(chunk)
+        if self.decoder.seconds > self.max_seconds:
+            raise AudioTooLong(self.max_seconds)
+
+    def partial_due(self):
+        """중간 결과를 만들 만큼 새 오디오가 쌓였는지 여부"""
+        return self.decoder.seconds - self._partial_seconds >= self.partial_interval
+
+    def partial(self):
+        """
+        지금까지 받은 음성의 중간 인식 결과를 반환합니다.
+
+        Returns:
+            str: 중간 결과 (이전 결과와 같으면 None)
+        """
+        pcm = self.decoder.pcm()
+        self._partial_seconds = self.decoder.seconds
+        text = pcm_to_text(pcm, self.language)
+        if not text or text == self.last_partial:
+            return None
+        self.last_partial = text
+        return text
+
+    def finish(self):
+        """
+        입력을 끝내고 전체 음성의 최종 인식 결과를 반환합니다.
+
+        Returns:
+            str: 최종 결과
+
+        Raises:
+            AudioTooLong: 최대 길이(max_seconds)를 넘은 경우
+        """
+        pcm = self.decoder.close()
+        if self.decoder.seconds > self.max_seconds:
+            raise AudioTooLong(self.max_seconds)
+        return pcm_to_text(pcm, self.language)
+
+    def abort(self):
+        self.decoder.abort()
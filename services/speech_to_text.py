@@ -1,9 +1,10 @@
 import speech_recognition as sr
-import tempfile
-import os
-from pydub import AudioSegment
+import numpy as np
 import io
+import wave
 import logging
+from config import STT_MAX_AUDIO_SECONDS
+from services.audio_decoder import SAMPLE_RATE, SAMPLE_WIDTH, decode_to_pcm
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
@@ -12,67 +13,65 @@ logger = logging.getLogger(__name__)
 
 def audio_to_text(audio_data, format="wav", language="ko-KR"):
     """
-    바이너리 오디오 데이터를 받아 텍스트로 변환합니다.
+    오디오 데이터를 받아 텍스트로 변환합니다.
+    임시 파일을 만들지 않고 메모리에서 16 kHz 모노 PCM으로 디코딩한 뒤 인식기에 전달합니다.
 
     Args:
-        audio_data (bytes): 오디오 바이너리 데이터
-        format (str): 오디오 파일 형식 (wav, mp3 등)
+        audio_data: 오디오 바이너리 데이터 또는 읽기 가능한 파일 객체
+                    (업로드 파일의 SpooledTemporaryFile을 그대로 넘기면 조각 단위로 읽음)
+        format (str): 오디오 파일 형식 (wav, webm, mp3 등)
         language (str): 인식할 언어 코드 (기본값: 한국어 'ko-KR')
 
     Returns:
         str: 텍스트로 변환된 음성 내용
     """
     try:
-        # 임시 파일로 변환
-        with tempfile.NamedTemporaryFile(
-            suffix=f".{format}", delete=False
-        ) as temp_audio:
-            temp_audio.write(audio_data)
-            temp_audio_path = temp_audio.name
-
-        # 음성 인식기 초기화
-        recognizer = sr.Recognizer()
-
-        # 오디오 파일 로드
-        logger.info("오디오 파일 로드 중...")
-        with sr.AudioFile(temp_audio_path) as source:
-            audio = recognizer.record(source)  # 전체 오디오 파일 읽기
-
-        # 음성을 텍스트로 변환 (Google Speech Recognition 사용)
+        logger.info("오디오 디코딩 중...")
+        samples = decode_to_pcm(audio_data, format, max_seconds=STT_MAX_AUDIO_SECONDS)
+
         logger.info("음성을 텍스트로 변환 중...")
-        text = recognizer.recognize_google(audio, language=language)
-        logger.info(f"변환된 텍스트: {text}")
+        text = pcm_to_text(samples, language)
+        if text:
+            logger.info(f"변환된 텍스트: {text}")
+        else:
+            logger.warning("음성을 인식할 수 없습니다.")
+        return text
 
-        # 임시 파일 삭제
-        os.unlink(temp_audio_path)
+    except Exception as e:
+        logger.error(f"STT 처리 중 오류 발생: {str(e)}")
+        raise e
 
-        return text.strip()
 
+def pcm_to_text(pcm, language="ko-KR"):
+    """
+    16 kHz 모노 16비트 PCM을 텍스트로 변환합니다 (임시 파일 없이 바로 인식기에 전달).
+
+    Args:
+        pcm: PCM 바이너리 데이터 또는 numpy.int16 샘플 배열 (services.audio_decoder 형식)
+        language (str): 인식할 언어 코드 (기본값: 한국어 'ko-KR')
+
+    Returns:
+        str: 텍스트로 변환된 음성 내용 (인식된 내용이 없으면 빈 문자열)
+    """
+    if len(pcm) == 0:
+        return ""
+    frame_data = pcm.tobytes() if isinstance(pcm, np.ndarray) else bytes(pcm)
+    audio = sr.AudioData(frame_data, SAMPLE_RATE, SAMPLE_WIDTH)
+    recognizer = sr.Recognizer()
+    try:
+        text = recognizer.recognize_google(audio, language=language)
     except sr.UnknownValueError:
-        logger.warning("음성을 인식할 수 없습니다.")
-        # 임시 파일이 아직 남아있다면 삭제
-        if "temp_audio_path" in locals() and os.path.exists(temp_audio_path):
-            os.unlink(temp_audio_path)
         return ""
-
     except sr.RequestError as e:
         logger.error(f"Google Speech Recognition 서비스에 접근할 수 없습니다; {e}")
-        # 임시 파일이 아직 남아있다면 삭제
-        if "temp_audio_path" in locals() and os.path.exists(temp_audio_path):
-            os.unlink(temp_audio_path)
         raise Exception(f"Speech Recognition 서비스 오류: {e}")
-
-    except Exception as e:
-        logger.error(f"STT 처리 중 오류 발생: {str(e)}")
-        # 임시 파일이 아직 남아있다면 삭제
-        if "temp_audio_path" in locals() and os.path.exists(temp_audio_path):
-            os.unlink(temp_audio_path)
-        raise e
+    return text.strip()
 
 
 def webm_to_wav(webm_data):
     """
-    WebM 형식의 오디오 데이터를 WAV 형식으로 변환합니다.
+    WebM 형식의 오디오 데이터를 16 kHz 모노 WAV 형식으로 변환합니다.
+    음성 인식에는 audio_to_text(..., format="webm")가 WAV를 거치지 않으므로 그쪽을 사용하세요.
 
     Args:
         webm_data (bytes): WebM 오디오 바이너리 데이터
@@ -81,12 +80,13 @@ def webm_to_wav(webm_data):
         bytes: WAV 형식의 오디오 바이너리 데이터
     """
     try:
-        # 바이너리 데이터를 AudioSegment로 변환
-        audio = AudioSegment.from_file(io.BytesIO(webm_data), format="webm")
-
-        # WAV 형식으로 변환
+        samples = decode_to_pcm(webm_data, "webm")
         wav_io = io.BytesIO()
-        audio.export(wav_io, format="wav")
+        with wave.open(wav_io, "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(SAMPLE_WIDTH)
+            wav.setframerate(SAMPLE_RATE)
+            wav.writeframes(samples.tobytes())
         return wav_io.getvalue()
 
     except Exception as e:
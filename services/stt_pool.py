@@ -0,0 +1,201 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from config import STT_WORKERS, STT_QUEUE_LIMIT
+from utils.metrics import Counter, Gauge, Histogram
+
+STT_QUEUE_DEPTH = Gauge("stt_queue_depth", "작업자를 기다리는 음성 인식 작업 수")
+STT_ACTIVE_JOBS = Gauge("stt_active_jobs", "실행 중인 음성 인식 작업 수")
+STT_STREAM_SESSIONS = Gauge(
+    "stt_stream_sessions", "작업자 풀 자리를 예약한 실시간 음성 인식 세션 수"
+)
+STT_REJECTED = Counter(
+    "stt_rejected_total", "대기열이 가득 차 거부한 음성 인식 작업 수"
+)
+STT_JOB_SECONDS = Histogram(
+    "stt_job_seconds",
+    "음성 인식 작업의 대기(wait) 및 실행(run) 시간(초)",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 30, 60),
+    labelnames=("stage",),
+)
+
+
+class SttPoolFull(Exception):
+    """음성 인식 작업자와 대기열이 모두 차서 작업을 받을 수 없는 경우"""
+
+
+class SttWorkerPool:
+    """
+    음성 디코딩/인식 작업을 정해진 수의 작업자 스레드에서 실행합니다.
+    작업자 수와 대기열 한도를 넘는 작업은 기다리게 하지 않고 바로 SttPoolFull로 거부하므로
+    음성 요청이 몰려도 이벤트 루프와 다른 요청(관리자 호출 등)은 영향을 받지 않습니다.
+    인식은 대부분 외부 서비스 응답 대기와 ffmpeg 프로세스에서 일어나므로 스레드를 사용합니다.
+
+    실시간 인식 세션은 연결하는 동안 reserve()로 자리 하나를 차지하고(ffmpeg 프로세스 하나),
+    세션의 작업은 그 자리로 실행되므로 세션 수도 같은 한도 안으로 제한됩니다.
+    """
+
+    def __init__(self, workers=2, queue_limit=4):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="stt"
+        )
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        # 자리를 차지한 일반 작업 수 (대기 + 실행, 세션 작업 제외)와 예약된 세션 수
+        self._admitted = 0
+        self._sessions = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    @property
+    def saturated(self):
+        """새 작업을 받을 수 없는 상태인지 여부"""
+        with self._lock:
+            return self._full()
+
+    def _full(self):
+        # self._lock을 잡은 상태에서 호출
+        return self._admitted + self._sessions >= self.workers + self.queue_limit
+
+    def _admit(self):
+        # 자리가 없으면 거부 (self._lock을 잡은 상태에서 호출)
+        if self._full():
+            self.rejected += 1
+            STT_REJECTED.inc()
+            raise SttPoolFull(
+                f"음성 인식 요청이 많아 처리할 수 없습니다 "
+                f"(작업자 {self.workers}, 대기열 {self.queue_limit})"
+            )
+
+    def _update_gauges(self):
+        STT_QUEUE_DEPTH.set(self._queued)
+        STT_ACTIVE_JOBS.set(self._running)
+        STT_STREAM_SESSIONS.set(self._sessions)
+
+    def submit(self, fn, *args, **kwargs):
+        """
+        작업을 대기열에 넣고 concurrent.futures.Future를 반환합니다.
+
+        Raises:
+            SttPoolFull: 작업자와 대기열이 모두 찬 경우
+        """
+        return self._submit(fn, args, kwargs, reserved=False)
+
+    def _submit(self, fn, args, kwargs, reserved):
+        # reserved: 예약된 세션의 작업이면 True (세션이 이미 자리를 차지하고 있음)
+        with self._lock:
+            if not reserved:
+                self._admit()
+                self._admitted += 1
+            self._queued += 1
+            self._update_gauges()
+        enqueued = time.perf_counter()
+
+        def job():
+            started = time.perf_counter()
+            STT_JOB_SECONDS.observe(started - enqueued, stage="wait")
+            with self._lock:
+                self._queued -= 1
+                self._running += 1
+                self._update_gauges()
+            failed = True
+            try:
+                result = fn(*args, **kwargs)
+                failed = False
+                return result
+            finally:
+                STT_JOB_SECONDS.observe(time.perf_counter() - started, stage="run")
+                with self._lock:
+                    self._running -= 1
+                    if not reserved:
+                        self._admitted -= 1
+                    if failed:
+                        self.failed += 1
+                    else:
+                        self.completed += 1
+                    self._update_gauges()
+
+        def release_cancelled(future):
+            # 대기 중에 취소된 작업(예: 연결이 끊겨 wrap_future가 취소됨)은 job()이
+            # 실행되지 않으므로 여기서 자리를 돌려줌 (실행을 시작한 작업은 취소되지 않음)
+            if not future.cancelled():
+                return
+            with self._lock:
+                self._queued -= 1
+                if not reserved:
+                    self._admitted -= 1
+                self._update_gauges()
+
+        future = self._executor.submit(job)
+        future.add_done_callback(release_cancelled)
+        return future
+
+    async def run(self, fn, *args, **kwargs):
+        """
+        비동기 코드에서 작업을 실행하고 결과를 기다립니다 (이벤트 루프는 막지 않음).
+
+        Raises:
+            SttPoolFull: 작업자와 대기열이 모두 찬 경우
+        """
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def reserve(self):
+        """
+        실시간 인식 세션을 위해 자리 하나를 예약합니다.
+        세션이 끝나면 반환된 SttReservation의 release()를 호출해야 합니다.
+
+        Raises:
+            SttPoolFull: 작업자와 대기열이 모두 찬 경우
+        """
+        with self._lock:
+            self._admit()
+            self._sessions += 1
+            self._update_gauges()
+        return SttReservation(self)
+
+    def _release(self):
+        with self._lock:
+            self._sessions -= 1
+            self._update_gauges()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queue_limit": self.queue_limit,
+                "queued": self._queued,
+                "running": self._running,
+                "sessions": self._sessions,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+            }
+
+
+class SttReservation:
+    """reserve()로 예약한 작업자 풀 자리. 세션의 작업은 다시 거부되지 않고 실행됩니다."""
+
+    def __init__(self, pool):
+        self._pool = pool
+        self._released = False
+
+    async def run(self, fn, *args, **kwargs):
+        """예약한 자리로 작업을 실행하고 결과를 기다립니다."""
+        return await asyncio.wrap_future(
+            self._pool._submit(fn, args, kwargs, reserved=True)
+        )
+
+    def release(self):
+        if not self._released:
+            self._released = True
+            self._pool._release()
+
+
+# 음성 인식 요청이 공유하는 작업자 풀
+stt_pool = SttWorkerPool(STT_WORKERS, STT_QUEUE_LIMIT)
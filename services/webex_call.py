@@ -1,11 +1,6 @@
-import subprocess
 import socket
-import os
-import time
-from config import DEVICE_IP, USERNAME, PASSWORD, TARGET_EMAIL
-
-# 스크립트 경로를 고정값으로 설정 (홈 디렉토리)
-SCRIPT_PATH = os.path.expanduser("~/webex_call_script.sh")
+from config import TARGET_EMAIL
+from services.xapi_client import get_device_client
 
 
 def check_host_connection(host, port=443, timeout=2):
@@ -21,49 +16,17 @@ def check_host_connection(host, port=443, timeout=2):
         return False
 
 
-# 시스코 디바이스에서 Webex 화상통화 발신
-def call_from_device():
-    url = f"https://{DEVICE_IP}/putxml"
-
-    # XML 페이로드 생성
-    payload = f'<?xml version="1.0" encoding="UTF-8"?><Command><Dial><Number>{TARGET_EMAIL}</Number></Dial></Command>'
-
-    # 임시 스크립트 파일 생성 (고정 경로)
-    with open(SCRIPT_PATH, "w") as f:
-        f.write(
-            f"""#!/bin/bash
-curl -k -s -u {USERNAME}:{PASSWORD} -X POST {url} -H "Content-Type: text/xml" -d '{payload}'
-# -s 옵션 추가로 curl 출력을 조용하게 만듦
-"""
-        )
-
+# 시스코 디바이스에서 Webex 화상통화 발신 (성공하면 True 반환)
+# stop을 지정하면 그 정류장의 디바이스에서 정류장 관리자에게 발신
+def call_from_device(stop=None):
     try:
-        # 권한 설정
-        os.chmod(SCRIPT_PATH, 0o755)
-
-        # 터미널에서 스크립트 실행 (백그라운드로 실행하고 즉시 종료)
-        terminal_cmd = f"""
-        osascript -e 'tell application "Terminal"
-            set currentTab to do script "bash {SCRIPT_PATH}; exit"
-            delay 0.5
-            set visible of window 1 to false
-        end tell'
-        """
-
-        print("백그라운드에서 명령 실행 중...")
-        result = subprocess.run(
-            terminal_cmd, shell=True, capture_output=True, text=True
-        )
-
-        # 결과 확인
-        if result.returncode == 0:
-            print("시스코 디바이스에서 Webex 화상통화 발신 요청 성공")
-        else:
-            print(f"시스코 디바이스에서 Webex 화상통화 발신 실패: {result.stderr}")
-            if result.stdout:
-                print(f"출력: {result.stdout}")
-
-        # 파일은 삭제하지 않고 유지 (직접 실행 가능하도록)
+        device = stop.device if stop is not None else get_device_client()
+        target = stop.target_email if stop is not None else TARGET_EMAIL
+        # xAPI /putxml로 Dial 명령 전송 (디바이스와의 HTTPS 연결과 세션은 재사용)
+        device.dial(target)
+        print("시스코 디바이스에서 Webex 화상통화 발신 요청 성공")
+        return True
 
     except Exception as e:
         print(f"시스코 디바이스에서 Webex 화상통화 발신 오류: {e}")
+        return False
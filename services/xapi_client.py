@@ -0,0 +1,210 @@
+import asyncio
+import threading
+import xml.etree.ElementTree as ET
+from xml.sax.saxutils import escape
+
+import httpx
+
+from config import (
+    DEVICE_IP,
+    USERNAME,
+    PASSWORD,
+    DEVICE_SCHEME,
+    DEVICE_TIMEOUT,
+    DEVICE_VERIFY_TLS,
+)
+from services.http_client import http_client
+
+
+class XapiError(Exception):
+    """시스코 디바이스가 xAPI 요청을 거부했거나 오류를 반환한 경우"""
+
+
+class XapiClient:
+    """
+    시스코 디바이스의 xAPI(/putxml, /getxml) 클라이언트.
+    공유 연결 풀(http_client)의 목적지로 등록되어 TLS 연결을 재사용하고,
+    처음 한 번 xAPI 세션을 열어 이후 요청은 세션 쿠키로 인증합니다.
+    세션을 지원하지 않는 디바이스(또는 스텁 서버)에서는 요청마다 기본 인증을 사용합니다.
+    """
+
+    def __init__(
+        self,
+        host,
+        username,
+        password,
+        scheme="https",
+        verify=False,
+        timeout=5.0,
+        destination="device",
+    ):
+        self.host = host
+        self.destination = destination
+        self._auth = httpx.BasicAuth(username or "", password or "")
+        self._lock = threading.Lock()
+        # None: 아직 세션을 열지 않음, True: 세션 쿠키 사용, False: 요청마다 기본 인증
+        self._session = None
+        http_client.register(
+            destination,
+            f"{scheme}://{host}",
+            timeout,
+            max_connections=2,
+            verify=verify,
+            headers={"Content-Type": "text/xml"},
+        )
+
+    def _begin_session(self):
+        response = http_client.post_sync(
+            self.destination, "/xmlapi/session/begin", auth=self._auth
+        )
+        if response.status_code in (200, 204):
+            print(f"시스코 디바이스 xAPI 세션 시작: {self.host}")
+            return True
+        if response.status_code == 401:
+            raise XapiError("시스코 디바이스 인증 실패 (사용자 이름/비밀번호 확인)")
+        # 세션 API가 없는 디바이스
+        return False
+
+    def _ensure_session(self, renew=False):
+        with self._lock:
+            if self._session is None or renew:
+                self._session = self._begin_session()
+            return self._session
+
+    def _request(self, method, path, route, **kwargs):
+        session = self._ensure_session()
+        if not session:
+            kwargs["auth"] = self._auth
+
+        response = http_client.request_sync(
+            self.destination, method, path, route, **kwargs
+        )
+        if response.status_code == 401 and session:
+            # 디바이스 재부팅 등으로 세션이 만료되면 한 번만 다시 열고 재시도
+            if not self._ensure_session(renew=True):
+                kwargs["auth"] = self._auth
+            response = http_client.request_sync(
+                self.destination, method, path, route, **kwargs
+            )
+
+        if response.status_code >= 400:
+            raise XapiError(f"xAPI 요청 실패: HTTP {response.status_code} {path}")
+        return _parse(response.text)
+
+    async def _request_async(self, method, path, route, **kwargs):
+        session = self._session
+        if session is None:
+            # 세션은 처음 한 번만 열면 되므로 동기 경로를 스레드에서 재사용
+            session = await asyncio.to_thread(self._ensure_session)
+        if not session:
+            kwargs["auth"] = self._auth
+
+        response = await http_client.request(
+            self.destination, method, path, route, **kwargs
+        )
+        if response.status_code == 401 and session:
+            if not await asyncio.to_thread(self._ensure_session, True):
+                kwargs["auth"] = self._auth
+            response = await http_client.request(
+                self.destination, method, path, route, **kwargs
+            )
+
+        if response.status_code >= 400:
+            raise XapiError(f"xAPI 요청 실패: HTTP {response.status_code} {path}")
+        return _parse(response.text)
+
+    def putxml(self, xml):
+        """
+        XML 명령/설정을 디바이스에 보냅니다.
+
+        Args:
+            xml: <Command>...</Command> 또는 <Configuration>...</Configuration> 문서
+
+        Returns:
+            응답 XML의 루트 요소
+
+        Raises:
+            XapiError: HTTP 오류 또는 디바이스가 status="Error"를 반환한 경우
+        """
+        return self._request("POST", "/putxml", "/putxml", content=xml)
+
+    def getxml(self, location):
+        """
+        디바이스 상태/설정을 조회합니다.
+
+        Args:
+            location: 조회할 경로 (예: "/Status/Call")
+
+        Returns:
+            응답 XML의 루트 요소
+        """
+        return self._request("GET", "/getxml", "/getxml", params={"location": location})
+
+    def command(self, *path, **arguments):
+        """
+        xAPI 명령을 실행합니다. 예: command("Dial", Number="user@example.com")
+
+        Returns:
+            응답 XML의 루트 요소
+        """
+        return self.putxml(_command_xml(path, arguments))
+
+    def dial(self, number):
+        """지정한 번호(이메일/SIP URI)로 화상통화를 발신합니다."""
+        return self.command("Dial", Number=number)
+
+    # 비동기 코드(여러 디바이스에 동시에 요청하는 경우 등)에서 사용하는 메서드
+    async def putxml_async(self, xml):
+        return await self._request_async("POST", "/putxml", "/putxml", content=xml)
+
+    async def getxml_async(self, location):
+        return await self._request_async(
+            "GET", "/getxml", "/getxml", params={"location": location}
+        )
+
+    async def command_async(self, *path, **arguments):
+        return await self.putxml_async(_command_xml(path, arguments))
+
+    async def dial_async(self, number):
+        return await self.command_async("Dial", Number=number)
+
+
+def _command_xml(path, arguments):
+    body = "".join(
+        f"<{name}>{escape(str(value))}</{name}>" for name, value in arguments.items()
+    )
+    for name in reversed(path):
+        body = f"<{name}>{body}</{name}>"
+    return f'<?xml version="1.0" encoding="UTF-8"?><Command>{body}</Command>'
+
+
+def _parse(text):
+    root = ET.fromstring(text) if text.strip() else ET.Element("Empty")
+    # 명령이 실패하면 결과 요소에 status="Error"와 Reason이 담겨 옴
+    for element in root.iter():
+        if element.get("status", "").lower() == "error":
+            reason = element.findtext(".//Reason") or element.findtext(".//Description")
+            raise XapiError(f"xAPI 오류: {reason or ET.tostring(element, 'unicode')}")
+    return root
+
+
+# 설정의 시스코 디바이스 클라이언트 (처음 사용할 때 생성)
+_device_client = None
+_device_lock = threading.Lock()
+
+
+def get_device_client():
+    """config의 DEVICE_IP/계정으로 만든 XapiClient를 반환합니다."""
+    global _device_client
+    if _device_client is None:
+        with _device_lock:
+            if _device_client is None:
+                _device_client = XapiClient(
+                    DEVICE_IP,
+                    USERNAME,
+                    PASSWORD,
+                    scheme=DEVICE_SCHEME,
+                    verify=DEVICE_VERIFY_TLS,
+                    timeout=DEVICE_TIMEOUT,
+                )
+    return _device_client
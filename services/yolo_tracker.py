@@ -1,32 +1,219 @@
 import cv2
-import requests
-from ultralytics import YOLO
-from utils.camera import initialize_camera, get_frame
-from config import CHATBOT_SERVER
+from utils.frame_bus import get_frame_bus
+from config import (
+    MOTION_GATING,
+    MOTION_THRESHOLD,
+    MOTION_MAX_STALENESS,
+    DETECTOR_BACKEND,
+    YOLO_MODEL,
+    YOLO_IMGSZ,
+    INFERENCE_WORKERS,
+    TRACKING_MODE,
+    KEYFRAME_INTERVAL,
+    TRACKING_INTERVAL,
+    COUNT_SOURCE,
+    DEVICE_COUNT_POLL_INTERVAL,
+    COUNT_CROSS_CHECK_INTERVAL,
+    COUNT_DISAGREE_LIMIT,
+    COUNT_FALLBACK_HOLD,
+)
+from services.motion_gate import MotionGate
+from services.box_tracker import KeyframeTracker
+from services.people_count_source import DevicePeopleCount, CountSourceSelector
+from services.fleet import get_fleet, session_key
+from services.detector_backend import load_detector_backend
+from services.inference_worker import InferenceProcessPool
+from services.detections import (
+    count as count_detections,
+    draw_detections,
+    to_records,
+)
+from utils.startup_timer import startup_phase
+from services.outbox import outbox
+from utils.metrics import Histogram
 import time
 import numpy as np
 import threading
+from collections import OrderedDict, namedtuple
 
-model = YOLO("yolov8n.pt")  # 최소 YOLO 모델 사용
+# 최소 YOLO 모델 사용 (DETECTOR_BACKEND로 ONNX/OpenVINO 가속 가능)
+# import 시점이 아니라 처음 필요할 때(또는 워밍업 시) 로드
+detector = None
+_detector_lock = threading.Lock()
 
-# 사람 클래스 ID (YOLO에서 사람은 클래스 0번)
-PERSON_CLASS_ID = 0
+# 프레임 버스에서 새 프레임을 기다릴 최대 시간(초)
+FRAME_TIMEOUT = 5.0
+
+
+# 프레임별 감지 결과 (detections는 사람만 담은 DETECTION_DTYPE 구조화 배열)
+DetectionResult = namedtuple(
+    "DetectionResult", ["frame_id", "timestamp", "detections"]
+)
+
+# 감지 결과 캐시에 보관할 최근 프레임 수
+DETECTION_CACHE_SIZE = 8
+
+# 스트림 오버레이가 새로 추론하지 않고 재사용할 수 있는 감지 결과의 최대 나이(초)
+OVERLAY_MAX_AGE = 1.0
+
+# 추론/추적 지표
+INFERENCE_SECONDS = Histogram(
+    "inference_seconds", "사람 감지 추론 한 번에 걸린 시간(초)"
+)
+DETECTIONS_PER_FRAME = Histogram(
+    "detections_per_frame",
+    "추론한 프레임당 감지된 사람 수",
+    buckets=(0, 1, 2, 3, 5, 8, 13, 20),
+)
+FRAME_AGE_SECONDS = Histogram(
+    "tracking_frame_age_seconds",
+    "프레임 캡처부터 인원 추적 처리 시작까지 걸린 시간(초)",
+)
+
+# frame_id -> DetectionResult (오래된 순)
+_detection_cache = OrderedDict()
+# frame_id -> threading.Event (다른 스레드가 같은 프레임을 추론 중일 때 대기용)
+_pending_detections = {}
+_cache_lock = threading.Lock()
+
+
+def get_detector():
+    """
+    사람 감지 백엔드를 반환합니다. 처음 호출될 때 한 번만 모델을 로드합니다.
+    """
+    global detector
+    if detector is None:
+        with _detector_lock:
+            if detector is None:
+                with startup_phase("vision:model_load"):
+                    if INFERENCE_WORKERS > 0:
+                        # 추론을 별도 프로세스로 분리하여 API 요청 처리와 GIL 경쟁을 피함
+                        detector = InferenceProcessPool(
+                            INFERENCE_WORKERS, DETECTOR_BACKEND, YOLO_MODEL, YOLO_IMGSZ
+                        )
+                    else:
+                        detector = load_detector_backend(
+                            DETECTOR_BACKEND, YOLO_MODEL, YOLO_IMGSZ
+                        )
+    return detector
+
+
+def warmup_detector():
+    """
+    모델을 로드하고 빈 프레임으로 한 번 추론하여, 첫 실제 프레임의
+    추론 지연(가중치 초기화, 런타임 그래프 준비 등)을 미리 치러 둡니다.
+    """
+    try:
+        backend = get_detector()
+        with startup_phase("vision:warmup"):
+            backend.warmup()
+    except Exception as e:
+        print(f"모델 워밍업 실패: {e}")
+
+
+def _run_detection(frame, frame_ts=0.0):
+    # YOLO 추론 후 사람 바운딩 박스만 추출
+    backend = get_detector()
+    started = time.perf_counter()
+    detections = backend.detect(frame, frame_ts)
+    INFERENCE_SECONDS.observe(time.perf_counter() - started)
+    DETECTIONS_PER_FRAME.observe(len(detections))
+    return detections
+
+
+def _post_chatbot(path, count=None):
+    # 챗봇 서버로 세션 이벤트 전송 (영구 큐에 저장만 하고 바로 반환, 전송/재시도는 백그라운드에서)
+    # 전송되기 전의 sessionStart/sessionReset 쌍은 서로 상쇄됨 (같은 정류장의 디바이스
+    # 인원 수 이벤트와 같은 묶음). 본문에는 챗봇 서버가 정류장을 구분할 수 있도록 stop_id를 담음
+    stop = get_fleet().local_stop
+    body = {"stop_id": stop.stop_id, "device_id": stop.device_id}
+    if count is not None:
+        body["count"] = count
+    try:
+        outbox.enqueue("chatbot", path, body=body, coalesce=session_key(stop.stop_id))
+    except Exception as e:
+        print(f"{path} 전송 실패:", e)
+
+
+def detect_people(packet):
+    """
+    프레임 버스의 프레임에서 사람을 감지합니다.
+    같은 frame_id는 한 번만 추론하고, 이후 호출은 캐시된 결과를 반환합니다.
+
+    Args:
+        packet: 프레임 버스의 FramePacket
+
+    Returns:
+        DetectionResult
+    """
+    while True:
+        with _cache_lock:
+            result = _detection_cache.get(packet.frame_id)
+            if result is not None:
+                return result
+            pending = _pending_detections.get(packet.frame_id)
+            if pending is None:
+                pending = threading.Event()
+                _pending_detections[packet.frame_id] = pending
+                break
+        # 다른 스레드가 같은 프레임을 추론 중이면 끝날 때까지 기다렸다가 캐시 확인
+        pending.wait()
+
+    try:
+        result = DetectionResult(
+            packet.frame_id,
+            packet.timestamp,
+            _run_detection(packet.frame, packet.timestamp),
+        )
+        with _cache_lock:
+            _detection_cache[packet.frame_id] = result
+            while len(_detection_cache) > DETECTION_CACHE_SIZE:
+                _detection_cache.popitem(last=False)
+        return result
+    finally:
+        with _cache_lock:
+            _pending_detections.pop(packet.frame_id, None)
+        pending.set()
+
+
+def get_latest_detections():
+    """가장 최근 프레임의 감지 결과를 반환합니다 (없으면 None)."""
+    with _cache_lock:
+        if not _detection_cache:
+            return None
+        return max(_detection_cache.values(), key=lambda result: result.timestamp)
+
+
+def get_detections(packet, max_age=0.0):
+    """
+    프레임의 감지 결과를 가져옵니다. 다른 소비자(인원 추적기, 스트림)가 이미
+    추론한 최신 결과가 충분히 최근이면 추론하지 않고 그 결과를 재사용합니다.
+
+    Args:
+        packet: 프레임 버스의 FramePacket
+        max_age: packet보다 이 시간(초) 이내에 캡처된 프레임의 결과까지 재사용
+
+    Returns:
+        DetectionResult
+    """
+    latest = get_latest_detections()
+    if latest is not None and latest.timestamp >= packet.timestamp - max_age:
+        return latest
+    return detect_people(packet)
 
 
 def count_people(frame):
     # YOLO를 통해 프레임에서 사람 수 계산
-    results = model(frame, verbose=False)
-    boxes = results[0].boxes
-    count = sum(1 for box in boxes if int(box.cls) == PERSON_CLASS_ID)
-    return count
+    return count_detections(_run_detection(frame))
 
 
-def get_detection_frame(frame):
+def get_detection_frame(frame, detections=None):
     """
     프레임에서 사람을 감지하고 바운딩 박스를 그립니다.
 
     Args:
         frame: 카메라에서 캡처한 이미지 프레임
+        detections: 이미 계산된 DetectionResult (None이면 새로 추론)
 
     Returns:
         바운딩 박스가 그려진 프레임
@@ -34,51 +221,66 @@ def get_detection_frame(frame):
     # 원본 프레임 복사
     detection_frame = frame.copy()
 
-    # YOLO 모델로 객체 감지
-    results = model(frame, verbose=False)
+    # 감지 결과가 없으면 YOLO 모델로 객체 감지
+    if detections is None:
+        people = _run_detection(frame)
+    else:
+        people = detections.detections
 
-    # 결과에서 바운딩 박스 추출
-    boxes = results[0].boxes
+    # 사람 바운딩 박스 그리기 (빨간색)
+    return draw_detections(detection_frame, people)
 
-    # 사람만 필터링하여 바운딩 박스 그리기
-    for box in boxes:
-        # 클래스 확인 (사람 = 0)
-        cls = int(box.cls)
-        if cls == PERSON_CLASS_ID:
-            # 바운딩 박스 좌표
-            x1, y1, x2, y2 = map(int, box.xyxy[0])
 
-            # 신뢰도 점수
-            conf = float(box.conf[0])
+# 추적 스레드 관리를 위한 변수
+tracking_thread = None
+is_tracking = False
 
-            # 바운딩 박스 그리기 (빨간색)
-            cv2.rectangle(detection_frame, (x1, y1), (x2, y2), (0, 0, 255), 2)
+# 모션 게이트 (MOTION_GATING이 꺼져 있으면 None)
+motion_gate = None
 
-            # 신뢰도 점수 표시
-            label = f"Person: {conf:.2f}"
-            cv2.putText(
-                detection_frame,
-                label,
-                (x1, y1 - 10),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                0.5,
-                (0, 0, 255),
-                2,
-            )
+# 키프레임 추적기 (TRACKING_MODE가 keyframe이 아니면 None)
+keyframe_tracker = None
 
-    return detection_frame
+# 인원 수 공급원 선택기 (COUNT_SOURCE가 device가 아니면 None, YOLO만 사용)
+count_source = None
 
+# 마지막으로 처리한 프레임이 캡처된 뒤 처리 시작까지 걸린 시간(초)
+last_frame_age = None
 
-# 추적 스레드 관리를 위한 변수
-tracking_thread = None
-is_tracking = False
+# 모션 게이트 통계를 로그로 남기는 주기(프레임 수)
+GATING_REPORT_INTERVAL = 60
+
+
+def get_tracking_stats():
+    """
+    인원 추적 상태와 모션 게이트 통계를 반환합니다.
+
+    Returns:
+        추적 여부, 최근 감지 결과, 마지막 프레임의 나이(초), 게이트 통계(프레임 수, 추론 수, 추론 생략 비율),
+        키프레임 추적 통계(추적 ID, 누적 인원 등), 인원 수 공급원 통계를 담은 딕셔너리
+    """
+    latest = get_latest_detections()
+    return {
+        "is_tracking": is_tracking,
+        "latest_detections": (
+            to_records(latest.detections) if latest is not None else []
+        ),
+        "last_frame_age": (
+            round(last_frame_age, 3) if last_frame_age is not None else None
+        ),
+        "motion_gating": motion_gate.stats() if motion_gate is not None else None,
+        "keyframe_tracking": (
+            keyframe_tracker.stats() if keyframe_tracker is not None else None
+        ),
+        "count_source": count_source.stats() if count_source is not None else None,
+    }
 
 
 def track_people():
     """
     카메라로 실시간 인원 추적 후 상태 변화에 따라 서버에 POST 요청 전송
     """
-    global tracking_thread, is_tracking
+    global tracking_thread, is_tracking, motion_gate, keyframe_tracker, count_source
 
     # 이미 추적 중이면 중복 실행 방지
     if is_tracking:
@@ -86,37 +288,79 @@ def track_people():
         return
 
     def tracking_worker():
-        global is_tracking
+        global is_tracking, last_frame_age
         is_tracking = True
 
-        cap = initialize_camera()
+        # 카메라는 프레임 버스를 통해 스트림 시청자와 공유
+        # (파일을 빠르게 재생할 때는 프레임을 건너뛰지 않고 모두 받아 결과가 재현되도록 함)
+        bus = get_frame_bus(get_fleet().local_stop.camera_source)
+        subscription = bus.subscribe(lossless=True)
         print("YOLO 인원 추적 시작")
 
+        gate = motion_gate
+        tracker = keyframe_tracker
+        selector = count_source
         prev_count = 0
 
+        def yolo_count(packet):
+            if gate is not None and not gate.should_infer(
+                packet.frame, packet.timestamp
+            ):
+                # 장면 변화가 없으면 추론을 생략하고 이전 인원 수 유지
+                return prev_count
+            if tracker is not None:
+                # 키프레임에서만 감지하고, 그 사이의 프레임은 광학 흐름으로 추적 박스를 옮김
+                if tracker.needs_detection():
+                    tracker.update(
+                        get_detections(packet).detections,
+                        packet.timestamp,
+                        packet.frame,
+                    )
+                else:
+                    tracker.skip_frame(packet.frame, packet.timestamp)
+                return tracker.count
+            # 스트림이 같은 프레임(또는 더 최신 프레임)을 이미 추론했다면 그 결과를 재사용
+            return count_detections(get_detections(packet).detections)
+
         try:
             while is_tracking:
-                frame = get_frame(cap)
-                current_count = count_people(frame)
+                packet = subscription.read(timeout=FRAME_TIMEOUT)
+                if packet is None:
+                    if bus.ended:
+                        print("프레임 공급원 재생이 끝나 인원 추적을 종료합니다.")
+                        break
+                    print("카메라 프레임을 받지 못했습니다. 다시 대기합니다.")
+                    continue
+                last_frame_age = time.monotonic() - packet.timestamp
+                FRAME_AGE_SECONDS.observe(last_frame_age)
+
+                if selector is not None:
+                    # 디바이스 RoomAnalytics 인원 수를 우선 사용하고 필요할 때만 YOLO 실행
+                    current_count = selector.count(lambda: yolo_count(packet))
+                else:
+                    current_count = yolo_count(packet)
+
+                if gate is not None and gate.frames % GATING_REPORT_INTERVAL == 0:
+                    stats = gate.stats()
+                    print(
+                        f"모션 게이트: {stats['frames']}프레임 중 {stats['inferences']}회 추론 "
+                        f"(생략 비율 {stats['gating_ratio']:.1%})"
+                    )
 
                 if prev_count == 0 and current_count > 0:
                     print(f"인원 감지 시작: {current_count}명 → POST /sessionStart")
-                    try:
-                        requests.post(f"{CHATBOT_SERVER}/sessionStart")
-                    except Exception as e:
-                        print("/sessionStart 전송 실패:", e)
+                    _post_chatbot("/sessionStart", current_count)
 
                 elif prev_count > 0 and current_count == 0:
                     print("아무도 없음 → POST /sessionReset")
-                    try:
-                        requests.post(f"{CHATBOT_SERVER}/sessionReset")
-                    except Exception as e:
-                        print("/sessionReset 전송 실패:", e)
+                    _post_chatbot("/sessionReset")
 
                 prev_count = current_count
 
                 # 너무 자주 요청하지 않도록 약간의 delay
-                time.sleep(1)
+                # (파일 재생은 버스가 프레임마다 기다려 주므로 대기 없이 바로 다음 프레임 처리)
+                if not bus.replay:
+                    time.sleep(TRACKING_INTERVAL)
 
         except KeyboardInterrupt:
             print("인원 추적 중단됨")
@@ -124,9 +368,35 @@ def track_people():
             print(f"인원 추적 중 오류 발생: {e}")
         finally:
             is_tracking = False
-            cap.release()
+            subscription.close()
             cv2.destroyAllWindows()
 
+    if MOTION_GATING:
+        motion_gate = MotionGate(MOTION_THRESHOLD, MOTION_MAX_STALENESS)
+        print(
+            f"모션 게이트 사용: 임계값 {MOTION_THRESHOLD}, 최대 {MOTION_MAX_STALENESS}초마다 추론"
+        )
+
+    if TRACKING_MODE == "keyframe":
+        keyframe_tracker = KeyframeTracker(KEYFRAME_INTERVAL)
+        print(f"키프레임 추적 사용: {KEYFRAME_INTERVAL}프레임마다 감지")
+
+    if COUNT_SOURCE == "device":
+        device_count = DevicePeopleCount(
+            DEVICE_COUNT_POLL_INTERVAL, get_fleet().local_stop.device
+        )
+        device_count.start()
+        count_source = CountSourceSelector(
+            device_count,
+            COUNT_CROSS_CHECK_INTERVAL,
+            COUNT_DISAGREE_LIMIT,
+            COUNT_FALLBACK_HOLD,
+        )
+        print(
+            f"디바이스 인원 수 사용: {DEVICE_COUNT_POLL_INTERVAL}초마다 조회, "
+            f"{COUNT_CROSS_CHECK_INTERVAL}초마다 YOLO와 비교"
+        )
+
     # 스레드로 실행
     tracking_thread = threading.Thread(target=tracking_worker)
     tracking_thread.daemon = True
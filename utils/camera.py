@@ -2,30 +2,39 @@ import cv2
 import time
 import platform
 import os
-import subprocess
-import re
 import json
+from utils.camera_discovery import build_inventory, inventory_is_fresh, find_device
+from utils.metrics import Counter, Histogram
 
 # 설정 값을 저장할 딕셔너리
 CAMERA_CONFIG = {
     "windows": {"index": None, "use_dshow": True},
     "darwin": {"index": None, "use_dshow": False},  # macOS는 'darwin'으로 표시됨
+    "linux": {"index": None, "use_dshow": False},
 }
 
+# 캐시된 카메라 장치 목록 (camera_config.json의 "inventory" 항목)
+CAMERA_INVENTORY = None
+
 # 설정 파일 경로
 CAMERA_CONFIG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "camera_config.json")
 
 # 설정 파일에서 카메라 설정 로드
 def load_camera_config():
+    global CAMERA_INVENTORY
     if os.path.exists(CAMERA_CONFIG_FILE):
         try:
             with open(CAMERA_CONFIG_FILE, 'r') as f:
                 config = json.load(f)
                 # 올바른 키가 있는지 확인
-                for system in ["windows", "darwin"]:
+                for system in CAMERA_CONFIG:
                     if system in config and "index" in config[system]:
                         CAMERA_CONFIG[system]["index"] = config[system]["index"]
                         print(f"{system.capitalize()} 카메라 인덱스 설정 로드됨: {CAMERA_CONFIG[system]['index']}")
+                    # 인덱스가 바뀌어도 같은 카메라를 찾을 수 있도록 안정 ID도 로드
+                    if system in config and config[system].get("camera_id"):
+                        CAMERA_CONFIG[system]["camera_id"] = config[system]["camera_id"]
+                CAMERA_INVENTORY = config.get("inventory")
         except Exception as e:
             print(f"카메라 설정 로드 중 오류 발생: {e}")
 
@@ -33,7 +42,7 @@ def load_camera_config():
 def save_camera_config():
     try:
         with open(CAMERA_CONFIG_FILE, 'w') as f:
-            json.dump(CAMERA_CONFIG, f)
+            json.dump(dict(CAMERA_CONFIG, inventory=CAMERA_INVENTORY), f)
             print(f"카메라 설정이 저장되었습니다: {CAMERA_CONFIG_FILE}")
     except Exception as e:
         print(f"카메라 설정 저장 중 오류 발생: {e}")
@@ -50,10 +59,11 @@ def set_camera_index(index, system=None):
     Returns:
         설정된 카메라 인덱스
     """
+    ensure_camera_config()
     if system is None:
         system = platform.system().lower()
     
-    if system not in ["windows", "darwin"]:
+    if system not in CAMERA_CONFIG:
         print(f"지원되지 않는 운영체제: {system}")
         return None
     
@@ -67,8 +77,19 @@ def set_camera_index(index, system=None):
         print(f"유효하지 않은 카메라 인덱스: {index}")
         return None
 
-# 초기 설정 로드
-load_camera_config()
+# 설정 파일은 import 시점이 아니라 카메라 설정이 처음 필요할 때 로드
+_camera_config_loaded = False
+
+
+def ensure_camera_config():
+    global _camera_config_loaded
+    if _camera_config_loaded:
+        return
+    _camera_config_loaded = True
+    load_camera_config()
+    # 맥OS에서 카메라 반전 상태 출력
+    if platform.system().lower() == "darwin":
+        print(f"맥OS 카메라 인덱스 반전 설정: {REVERSE_CAMERA_INDEX_ON_MAC}")
 
 # 맥OS에서는 기본적으로 카메라 인덱스를 반전시킴 (0번이 USB, 1번이 내장)
 # 환경변수가 명시적으로 false로 설정되었을 때만 반전 안함
@@ -76,6 +97,19 @@ REVERSE_CAMERA_INDEX_ON_MAC = (
     os.environ.get("REVERSE_CAMERA_INDEX_ON_MAC", "true").lower() != "false"
 )
 
+# 저지연 캡처 모드: 포맷/해상도/FPS를 지정하고 드라이버 버퍼를 최소화하여 항상 최신 프레임을 읽음
+# 환경변수가 명시적으로 false로 설정되었을 때만 끔
+CAMERA_LOW_LATENCY = os.environ.get("CAMERA_LOW_LATENCY", "true").lower() != "false"
+CAMERA_FOURCC = os.environ.get("CAMERA_FOURCC", "MJPG")
+CAMERA_WIDTH = int(os.environ.get("CAMERA_WIDTH", "1280"))
+CAMERA_HEIGHT = int(os.environ.get("CAMERA_HEIGHT", "720"))
+CAMERA_FPS = int(os.environ.get("CAMERA_FPS", "30"))
+
+# 버퍼 비우기: grab()이 이 시간보다 오래 걸리면 버퍼가 비어 새 프레임을 기다린 것으로 판단
+DRAIN_WAIT_THRESHOLD = 0.5 / CAMERA_FPS
+# 버퍼 비우기 시 최대 grab() 횟수 (드라이버가 버퍼 크기 설정을 무시하는 경우 대비)
+MAX_DRAIN_GRABS = 5
+
 # 내장 웹캠 감지를 위한 키워드
 BUILTIN_CAMERA_KEYWORDS = [
     "integrated",
@@ -108,92 +142,35 @@ USB_CAMERA_KEYWORDS = [
     "hd pro",
 ]
 
-# 맥OS에서 카메라 반전 상태 출력
-if platform.system().lower() == "darwin":
-    print(f"맥OS 카메라 인덱스 반전 설정: {REVERSE_CAMERA_INDEX_ON_MAC}")
-
 
-def get_camera_details_windows():
+def get_camera_inventory(refresh=False):
     """
-    윈도우에서 연결된 모든 카메라 정보를 가져옵니다.
-    """
-    # 윈도우 환경이 아니면 빈 결과 반환
-    if platform.system().lower() != "windows":
-        return {}
-
-    cameras = {}
+    캐시된 카메라 장치 목록을 반환합니다.
+    캐시가 없거나, TTL이 지났거나, 장치가 연결/해제된 경우에만 다시 검색합니다.
 
-    try:
-        # WMI 모듈 사용 없이 Windows에서 카메라 감지
-        # DirectShow를 통해 카메라 목록 얻기
-        print("Windows에서 카메라 장치 정보 수집 시도...")
+    Args:
+        refresh: True이면 캐시를 무시하고 다시 검색
 
-        # 기본 장치 정보 (인덱스별로)
-        for i in range(10):  # 0-9 인덱스 검사
-            try:
-                camera_name = ""
-                camera_desc = ""
-
-                # DirectShow 사용하여 열기
-                cap = cv2.VideoCapture(i, cv2.CAP_DSHOW)
-                if cap.isOpened():
-                    # 장치 속성 가져오기 시도
-                    try:
-                        if hasattr(cap, "get"):
-                            # DirectShow에서만 특정 속성을 지원할 수 있음
-                            # 여기서는 가능한 정보만 수집
-                            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-                            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-                            camera_desc = f"{width}x{height}"
-                    except:
-                        pass
-
-                    # 텍스트 기반으로 장치 유형 추정
-                    device_info = f"{camera_name} {camera_desc}"
-                    is_builtin = any(
-                        keyword.lower() in device_info.lower()
-                        for keyword in BUILTIN_CAMERA_KEYWORDS
-                    )
-                    is_usb = any(
-                        keyword.lower() in device_info.lower()
-                        for keyword in USB_CAMERA_KEYWORDS
-                    )
-
-                    # 기본적으로 인덱스 0은 내장 웹캠으로 간주
-                    if not is_builtin and not is_usb:
-                        is_builtin = i == 0
-
-                    # 장치 정보 저장
-                    cameras[f"camera_{i}"] = {
-                        "name": f"카메라 {i}",
-                        "description": camera_desc,
-                        "is_builtin": is_builtin,
-                        "is_usb": is_usb or not is_builtin,  # 내장이 아니면 USB로 가정
-                    }
-
-                    print(
-                        f"카메라 장치 감지: 인덱스 {i} - {'내장 웹캠' if is_builtin else 'USB 외장 웹캠' if is_usb else '알 수 없는 카메라'}"
-                    )
-                    cap.release()
-            except Exception as e:
-                print(f"카메라 인덱스 {i} 장치 정보 수집 오류: {e}")
-
-        # 추가: Windows PowerShell 명령어로 장치 정보를 얻을 수도 있음
-        # 이 부분은 Windows에서만 작동함
-
-        return cameras
+    Returns:
+        장치 목록 딕셔너리 ("devices" 키에 장치 정보 목록)
+    """
+    global CAMERA_INVENTORY
+    ensure_camera_config()
 
-    except Exception as e:
-        print(f"Windows 카메라 정보 수집 중 오류: {e}")
-        return {}
+    if refresh or not inventory_is_fresh(CAMERA_INVENTORY):
+        CAMERA_INVENTORY = build_inventory()
+        save_camera_config()
+    else:
+        print("캐시된 카메라 장치 목록 사용")
+    return CAMERA_INVENTORY
 
 
-def detect_webcam():
+def rank_webcams(refresh=False):
     """
-    사용 가능한 웹캠을 감지하고 가장 적합한 인덱스를 반환합니다.
+    사용 가능한 웹캠을 우선순위 순으로 정렬하여 반환합니다.
 
     Returns:
-        웹캠으로 인식된 카메라 인덱스 목록 (외장 웹캠 우선, 내장 웹캠 후순위)
+        카메라 정보 딕셔너리 목록 (외장 웹캠 우선, 내장 웹캠 후순위)
     """
     system = platform.system().lower()
     print(f"운영체제 {system}에서 사용 가능한 웹캠을 검색합니다...")
@@ -201,135 +178,62 @@ def detect_webcam():
     # 사용 가능한 카메라 인덱스와 정보를 저장할 리스트
     available_cameras = []
 
-    # Windows에서 디바이스 정보 먼저 수집
-    system_cameras = {}
-    if system == "windows":
-        system_cameras = get_camera_details_windows()
-        # 발견된 카메라 장치 정보 출력
-        if system_cameras:
-            print(f"{len(system_cameras)}개의 카메라 장치가 시스템에서 감지되었습니다.")
-
-    # macOS에서 외부 명령어로 카메라 정보 얻기
-    elif system == "darwin":
-        try:
-            # 맥에서 시스템 정보 명령어 실행
-            result = subprocess.run(
-                ["system_profiler", "SPCameraDataType"], capture_output=True, text=True
-            )
-            camera_info = result.stdout
-            print("시스템 카메라 정보:", camera_info)
-        except Exception as e:
-            print(f"시스템 카메라 정보 얻기 실패: {e}")
-
-    # 테스트할 최대 카메라 인덱스
-    max_index = 10
-
-    print("카메라 인덱스 감지를 시작합니다...")
-    for i in range(max_index):
-        try:
-            if system == "windows":
-                # Windows에서는 확실히 DirectShow 사용
-                cap = cv2.VideoCapture(i, cv2.CAP_DSHOW)
-            else:
-                cap = cv2.VideoCapture(i)
-
-            if cap.isOpened():
-                # 카메라 이름과 정보 얻기 시도
-                camera_name = ""
-                camera_desc = ""
-
-                if system == "windows":
-                    try:
-                        # Windows에서는 추가 속성 얻기 시도
-                        camera_name = (
-                            cap.getBackendName()
-                            if hasattr(cap, "getBackendName")
-                            else ""
-                        )
-                        # DirectShow에서만 작동하는 속성
-                        fourcc = cv2.CAP_PROP_FOURCC
-                        width = cap.get(cv2.CAP_PROP_FRAME_WIDTH)
-                        height = cap.get(cv2.CAP_PROP_FRAME_HEIGHT)
-                    except:
-                        pass
-
-                # 테스트 프레임 캡처
-                ret, frame = cap.read()
-
-                # 내장/외장 웹캠 여부 판단
-                is_builtin = False
-                is_usb = False
-
-                # 윈도우에서 시스템 정보 기반으로 내장/외장 판단
-                if system == "windows" and system_cameras:
-                    # 해당 인덱스와 매칭되는 시스템 카메라 찾기
-                    # (정확한 매핑은 어렵지만, 발견된 순서와 OpenCV 인덱스 간에 어느 정도 연관성이 있음)
-                    for camera_id, details in system_cameras.items():
-                        is_builtin = details.get("is_builtin", False)
-                        is_usb = details.get("is_usb", False)
-                        camera_desc = details.get("description", "")
-                        camera_name = details.get("name", "")
-                        # 이미 발견된 카메라에 대한 정보가 있다면 사용
-                        if len(available_cameras) == i:
-                            break
-
-                # 이름이나 설명에서 내장/외장 여부 추정
-                if not is_builtin and not is_usb:
-                    camera_info = (camera_name + " " + camera_desc).lower()
-                    is_builtin = any(
-                        keyword in camera_info for keyword in BUILTIN_CAMERA_KEYWORDS
-                    )
-                    is_usb = any(
-                        keyword in camera_info for keyword in USB_CAMERA_KEYWORDS
-                    )
-
-                    # 기본적으로, 이름에 내장/외장 키워드가 없다면 인덱스로 추정
-                    if not is_builtin and not is_usb:
-                        if system == "darwin" and REVERSE_CAMERA_INDEX_ON_MAC:
-                            # 맥OS에서 인덱스 반전: 0번이 USB, 1번이 내장
-                            is_builtin = i == 1
-                            is_usb = i == 0
-                        else:
-                            # 일반적으로 0번 인덱스는 내장 웹캠인 경우가 많음
-                            is_builtin = i == 0
-                            is_usb = i > 0
-
-                camera_info = {
-                    "index": i,
-                    "name": camera_name,
-                    "description": camera_desc,
-                    "resolution": f"{int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))}x{int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))}",
-                    "capture_success": ret,
-                    "is_builtin": is_builtin,
-                    "is_usb": is_usb,
-                }
-
-                # 이미지 캡처에 성공한 경우에만 추가
-                if ret:
-                    device_type = (
-                        "내장 웹캠"
-                        if is_builtin
-                        else "USB 외장 웹캠" if is_usb else "기타 카메라"
-                    )
-                    print(
-                        f"카메라 인덱스 {i}: 사용 가능 ({camera_info['resolution']}) - {device_type} {camera_name} {camera_desc}"
-                    )
-                    available_cameras.append(camera_info)
-                else:
-                    print(f"카메라 인덱스 {i}: 응답하지만 이미지를 가져올 수 없음")
-
-                cap.release()
+    for device in get_camera_inventory(refresh)["devices"]:
+        i = device["index"]
+        camera_name = device.get("name", "")
+        camera_desc = device.get("device", "")
+
+        # 이름에서 내장/외장 여부 추정
+        camera_info = (camera_name + " " + camera_desc).lower()
+        is_builtin = any(keyword in camera_info for keyword in BUILTIN_CAMERA_KEYWORDS)
+        is_usb = any(keyword in camera_info for keyword in USB_CAMERA_KEYWORDS)
+
+        if not is_builtin and not is_usb:
+            if device.get("bus") == "usb":
+                # 리눅스 sysfs에서 USB 버스에 연결된 장치
+                is_usb = True
+            elif device.get("bus") == "platform":
+                # 리눅스 sysfs에서 보드에 직접 연결된 장치 (CSI 카메라 등)
+                is_builtin = True
+            elif system == "darwin" and REVERSE_CAMERA_INDEX_ON_MAC:
+                # 맥OS에서 인덱스 반전: 0번이 USB, 1번이 내장
+                is_builtin = i == 1
+                is_usb = i == 0
             else:
-                print(f"카메라 인덱스 {i}: 사용 불가")
-
-        except Exception as e:
-            print(f"카메라 인덱스 {i} 테스트 중 오류: {e}")
+                # 일반적으로 0번 인덱스는 내장 웹캠인 경우가 많음
+                is_builtin = i == 0
+                is_usb = i > 0
+
+        camera = {
+            "id": device["id"],
+            "index": i,
+            "name": camera_name,
+            "description": camera_desc,
+            "resolution": device["resolution"],
+            "capture_success": device["capture_success"],
+            "is_builtin": is_builtin,
+            "is_usb": is_usb,
+        }
+
+        # 이미지 캡처에 성공한 경우에만 추가
+        if camera["capture_success"]:
+            device_type = (
+                "내장 웹캠"
+                if is_builtin
+                else "USB 외장 웹캠" if is_usb else "기타 카메라"
+            )
+            print(
+                f"카메라 인덱스 {i}: 사용 가능 ({camera['resolution']}) - {device_type} {camera_name} {camera_desc}"
+            )
+            available_cameras.append(camera)
+        else:
+            print(f"카메라 인덱스 {i}: 응답하지만 이미지를 가져올 수 없음")
 
     print(f"사용 가능한 카메라: {len(available_cameras)}개")
 
     if not available_cameras:
         print("사용 가능한 카메라가 없습니다.")
-        return None
+        return []
 
     # 우선순위: 1. USB 외장 웹캠, 2. 기타 카메라, 3. 내장 웹캠
     # 각 카테고리 내에서는 고해상도 우선
@@ -373,15 +277,31 @@ def detect_webcam():
         )
         print(f"{i+1}. 인덱스 {cam['index']} - {device_type} ({cam['resolution']})")
 
+    return available_cameras
+
+
+def detect_webcam(refresh=False):
+    """
+    사용 가능한 웹캠을 감지하고 가장 적합한 인덱스를 반환합니다.
+
+    Returns:
+        웹캠으로 인식된 카메라 인덱스 목록 (외장 웹캠 우선, 내장 웹캠 후순위)
+    """
+    cameras = rank_webcams(refresh)
+    if not cameras:
+        return None
     # 인덱스만 추출
-    return [camera["index"] for camera in available_cameras]
+    return [camera["index"] for camera in cameras]
 
 
 # 환경 변수에서 카메라 인덱스 설정을 가져옵니다 (없으면 기본값 사용)
 def get_camera_index_from_env():
+    ensure_camera_config()
     system = platform.system().lower()
     if system == "darwin":  # macOS
         return os.environ.get("MAC_CAMERA_INDEX", CAMERA_CONFIG["darwin"]["index"])
+    elif system == "linux":
+        return os.environ.get("LINUX_CAMERA_INDEX", CAMERA_CONFIG["linux"]["index"])
     else:  # Windows 등 기타 OS
         return os.environ.get("WIN_CAMERA_INDEX", CAMERA_CONFIG["windows"]["index"])
 
@@ -396,8 +316,18 @@ def initialize_camera(index=None):
     Returns:
         초기화된 OpenCV VideoCapture 객체
     """
+    ensure_camera_config()
     system = platform.system().lower()
 
+    # 안정 ID로 저장된 카메라가 있으면 현재 인덱스를 다시 찾음 (재연결로 번호가 바뀔 수 있음)
+    camera_id = CAMERA_CONFIG[system].get("camera_id")
+    if index is None and camera_id:
+        device = find_device(get_camera_inventory(), camera_id)
+        if device is not None and device["index"] != CAMERA_CONFIG[system]["index"]:
+            print(f"카메라 {camera_id}의 인덱스가 {device['index']}로 변경됨")
+            CAMERA_CONFIG[system]["index"] = device["index"]
+            save_camera_config()
+
     # 카메라 구성 초기화 (첫 실행 시 한 번만)
     if CAMERA_CONFIG[system]["index"] is None:
         # 환경 변수에서 인덱스 설정 가져오기
@@ -409,11 +339,12 @@ def initialize_camera(index=None):
             save_camera_config()
         else:
             # 자동으로 사용 가능한 웹캠 감지
-            detected_cameras = detect_webcam()
+            detected_cameras = rank_webcams()
             if detected_cameras:
-                CAMERA_CONFIG[system]["index"] = detected_cameras[0]
+                CAMERA_CONFIG[system]["index"] = detected_cameras[0]["index"]
+                CAMERA_CONFIG[system]["camera_id"] = detected_cameras[0]["id"]
                 print(
-                    f"자동으로 카메라 인덱스 설정: {detected_cameras[0]} (외장 웹캠 우선)"
+                    f"자동으로 카메라 인덱스 설정: {detected_cameras[0]['index']} (외장 웹캠 우선)"
                 )
                 # 설정을 파일에 저장
                 save_camera_config()
@@ -438,12 +369,14 @@ def initialize_camera(index=None):
         # 첫 번째 시도가 실패하면 다른 인덱스도 시도
         print(f"카메라 인덱스 {use_index} 열기 실패, 다른 인덱스 시도...")
 
-        # 먼저 자동 감지된 카메라 목록에서 시도
-        detected_cameras = detect_webcam()
+        # 먼저 자동 감지된 카메라 목록에서 시도 (캐시된 장치 목록 사용)
+        ranked_cameras = rank_webcams()
+        detected_cameras = [camera["index"] for camera in ranked_cameras]
 
         # 감지된 다른 카메라 시도
         if detected_cameras:
-            for cam_idx in detected_cameras:
+            for camera in ranked_cameras:
+                cam_idx = camera["index"]
                 if cam_idx != use_index:
                     print(f"카메라 인덱스 {cam_idx} 시도 중...")
                     if system == "windows":
@@ -455,6 +388,7 @@ def initialize_camera(index=None):
                         print(f"카메라 인덱스 {cam_idx}로 성공적으로 연결")
                         # 성공한 인덱스를 기록
                         CAMERA_CONFIG[system]["index"] = cam_idx
+                        CAMERA_CONFIG[system]["camera_id"] = camera["id"]
                         break
 
         # 감지된 카메라도 실패하면 기본 인덱스 순서대로 시도
@@ -472,8 +406,9 @@ def initialize_camera(index=None):
 
                     if cap.isOpened():
                         print(f"카메라 인덱스 {backup_idx}로 성공적으로 연결")
-                        # 성공한 인덱스를 기록
+                        # 성공한 인덱스를 기록 (장치 목록에 없으므로 안정 ID는 해제)
                         CAMERA_CONFIG[system]["index"] = backup_idx
+                        CAMERA_CONFIG[system].pop("camera_id", None)
                         break
 
     if not cap.isOpened():
@@ -482,13 +417,59 @@ def initialize_camera(index=None):
         )
 
     # 카메라 설정
-    # cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
-    # cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
+    if CAMERA_LOW_LATENCY:
+        configure_capture(cap)
 
     print(f"카메라(index={CAMERA_CONFIG[system]['index']}) 초기화 완료")
     return cap
 
 
+def configure_capture(cap):
+    """
+    저지연 캡처를 위해 포맷(FOURCC), 해상도, FPS를 지정하고 내부 버퍼를 최소화합니다.
+    드라이버가 지원하지 않는 값은 무시될 수 있으므로 실제 적용된 값을 출력합니다.
+
+    Args:
+        cap: OpenCV VideoCapture 객체
+    """
+    # MJPG는 USB 대역폭을 적게 써서 높은 해상도에서도 FPS를 유지할 수 있음
+    cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*CAMERA_FOURCC))
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, CAMERA_WIDTH)
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, CAMERA_HEIGHT)
+    cap.set(cv2.CAP_PROP_FPS, CAMERA_FPS)
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
+    fourcc = int(cap.get(cv2.CAP_PROP_FOURCC))
+    fourcc_str = "".join(chr((fourcc >> (8 * i)) & 0xFF) for i in range(4))
+    print(
+        f"저지연 캡처 설정: {fourcc_str} "
+        f"{int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))}x{int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))} "
+        f"@ {cap.get(cv2.CAP_PROP_FPS):.0f}fps, 버퍼 {int(cap.get(cv2.CAP_PROP_BUFFERSIZE))}"
+    )
+
+
+def grab_latest(cap):
+    """
+    버퍼에 쌓여 있던 오래된 프레임을 grab()으로 버리고 가장 최신 프레임을 잡습니다.
+    버퍼에 남은 프레임은 grab()이 즉시 반환되므로, 새 프레임을 기다려야 할 때까지 반복합니다.
+
+    Args:
+        cap: OpenCV VideoCapture 객체
+
+    Returns:
+        (성공 여부, 최신 프레임을 잡은 시각(time.monotonic 기준))
+    """
+    captured_at = None
+    for _ in range(MAX_DRAIN_GRABS):
+        start = time.monotonic()
+        if not cap.grab():
+            return False, None
+        captured_at = time.monotonic()
+        if captured_at - start >= DRAIN_WAIT_THRESHOLD:
+            break
+    return True, captured_at
+
+
 def get_frame(cap, max_retries=3, retry_delay=0.5):
     """
     카메라로부터 프레임 한 장을 읽어옵니다.
@@ -501,6 +482,35 @@ def get_frame(cap, max_retries=3, retry_delay=0.5):
     Returns:
         읽어온 프레임
 
+    Raises:
+        RuntimeError: 프레임을 읽을 수 없는 경우
+    """
+    frame, _ = read_frame(cap, max_retries, retry_delay)
+    return frame
+
+
+# 카메라 읽기 지표
+CAMERA_READ_SECONDS = Histogram(
+    "camera_read_seconds",
+    "카메라에서 프레임 한 장을 읽는 데 걸린 시간(초, 버퍼 비우기 포함)",
+)
+CAMERA_READ_RETRIES = Counter("camera_read_retries_total", "프레임 읽기 실패로 재시도한 횟수")
+CAMERA_RECONNECTS = Counter("camera_reconnects_total", "카메라 연결이 끊어져 다시 연 횟수")
+
+
+def read_frame(cap, max_retries=3, retry_delay=0.5):
+    """
+    카메라로부터 프레임 한 장과 캡처 시각을 읽어옵니다.
+    저지연 모드에서는 버퍼를 비우고 가장 최신 프레임을 반환합니다.
+
+    Args:
+        cap: OpenCV VideoCapture 객체
+        max_retries: 읽기 실패 시 최대 재시도 횟수
+        retry_delay: 재시도 사이의 대기 시간(초)
+
+    Returns:
+        (프레임, 캡처 시각(time.monotonic 기준))
+
     Raises:
         RuntimeError: 프레임을 읽을 수 없는 경우
     """
@@ -511,6 +521,7 @@ def get_frame(cap, max_retries=3, retry_delay=0.5):
         if not cap.isOpened():
             # 카메라가 닫혀 있으면 다시 열기 시도
             print("카메라 연결이 끊어졌습니다. 재연결 시도 중...")
+            CAMERA_RECONNECTS.inc()
             cap.release()
 
             # 현재 운영체제에 맞는 인덱스로 다시 열기
@@ -529,14 +540,26 @@ def get_frame(cap, max_retries=3, retry_delay=0.5):
             else:
                 cap.open(index)
 
+            # 다시 연 카메라는 드라이버 기본값으로 돌아가므로 재설정
+            if CAMERA_LOW_LATENCY and cap.isOpened():
+                configure_capture(cap)
+
             time.sleep(retry_delay)
 
-        success, frame = cap.read()
+        read_started = time.perf_counter()
+        if CAMERA_LOW_LATENCY:
+            success, captured_at = grab_latest(cap)
+            frame = cap.retrieve()[1] if success else None
+        else:
+            success, frame = cap.read()
+            captured_at = time.monotonic()
+        CAMERA_READ_SECONDS.observe(time.perf_counter() - read_started)
 
         if success and frame is not None:
-            return frame
+            return frame, captured_at
 
         retry_count += 1
+        CAMERA_READ_RETRIES.inc()
         print(f"프레임 읽기 실패. 재시도 중... ({retry_count}/{max_retries})")
         time.sleep(retry_delay)
 
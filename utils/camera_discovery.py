@@ -0,0 +1,225 @@
+import cv2
+import glob
+import os
+import platform
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# 리눅스 V4L2 장치 정보 경로
+V4L2_SYSFS_DIR = "/sys/class/video4linux"
+V4L2_BY_ID_DIR = "/dev/v4l/by-id"
+V4L2_BY_PATH_DIR = "/dev/v4l/by-path"
+
+# V4L2가 없는 운영체제에서 검사할 최대 카메라 인덱스
+MAX_PROBE_INDEX = 10
+
+# 카메라 하나를 여는 데 걸리는 시간이 길 수 있으므로 동시에 여러 개를 검사
+PROBE_WORKERS = 4
+
+# 장치 목록 캐시 유효 시간(초)
+INVENTORY_TTL = float(os.environ.get("CAMERA_INVENTORY_TTL", "86400"))
+
+
+def _read_sysfs(path):
+    try:
+        with open(path, "r") as f:
+            return f.read().strip()
+    except OSError:
+        return ""
+
+
+def _symlinks_by_target(directory):
+    # /dev/v4l/by-id 등의 심볼릭 링크를 실제 장치 경로 기준으로 정리
+    links = {}
+    for link in sorted(glob.glob(os.path.join(directory, "*"))):
+        links.setdefault(os.path.realpath(link), os.path.basename(link))
+    return links
+
+
+def enumerate_v4l2_devices():
+    """
+    리눅스 sysfs에서 V4L2 캡처 장치 목록을 읽어옵니다. 장치를 열지 않으므로 빠릅니다.
+
+    Returns:
+        장치 정보 딕셔너리 목록 (id, index, name, device, bus)
+    """
+    by_id = _symlinks_by_target(V4L2_BY_ID_DIR)
+    by_path = _symlinks_by_target(V4L2_BY_PATH_DIR)
+
+    devices = []
+    for node in sorted(glob.glob(os.path.join(V4L2_SYSFS_DIR, "video*"))):
+        match = re.match(r"video(\d+)$", os.path.basename(node))
+        if not match:
+            continue
+
+        # UVC 카메라는 장치당 노드를 여러 개 만드는데, index 0만 영상 캡처 노드
+        if _read_sysfs(os.path.join(node, "index")) not in ("", "0"):
+            continue
+
+        device_path = f"/dev/{os.path.basename(node)}"
+        hardware_path = os.path.realpath(os.path.join(node, "device"))
+        name = _read_sysfs(os.path.join(node, "name"))
+
+        # 재부팅이나 재연결로 인덱스가 바뀌어도 유지되는 ID
+        if device_path in by_id:
+            stable_id = f"v4l2-id:{by_id[device_path]}"
+        elif device_path in by_path:
+            stable_id = f"v4l2-path:{by_path[device_path]}"
+        else:
+            stable_id = f"v4l2-sysfs:{hardware_path}"
+
+        devices.append(
+            {
+                "id": stable_id,
+                "index": int(match.group(1)),
+                "name": name,
+                "device": device_path,
+                "bus": "usb" if "/usb" in hardware_path else "platform",
+            }
+        )
+    return devices
+
+
+def hotplug_signature():
+    """
+    현재 연결된 카메라 구성을 나타내는 문자열. 값이 바뀌면 장치가 연결/해제된 것입니다.
+    sysfs가 없는 운영체제에서는 None을 반환합니다.
+    """
+    if not os.path.isdir(V4L2_SYSFS_DIR):
+        return None
+    nodes = sorted(os.listdir(V4L2_SYSFS_DIR))
+    links = []
+    if os.path.isdir(V4L2_BY_ID_DIR):
+        links = sorted(os.listdir(V4L2_BY_ID_DIR))
+    return ",".join(nodes) + "|" + ",".join(links)
+
+
+def probe_camera(index, use_dshow=False):
+    """
+    카메라 인덱스 하나를 열어 프레임을 읽어보고 해상도를 확인합니다.
+
+    Returns:
+        검사 결과 딕셔너리 (열 수 없으면 None)
+    """
+    try:
+        if use_dshow:
+            cap = cv2.VideoCapture(index, cv2.CAP_DSHOW)
+        else:
+            cap = cv2.VideoCapture(index)
+        if not cap.isOpened():
+            return None
+        try:
+            ret, _ = cap.read()
+            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+            return {
+                "index": index,
+                "resolution": f"{width}x{height}",
+                "capture_success": bool(ret),
+                "backend": (
+                    cap.getBackendName() if hasattr(cap, "getBackendName") else ""
+                ),
+            }
+        finally:
+            cap.release()
+    except Exception as e:
+        print(f"카메라 인덱스 {index} 테스트 중 오류: {e}")
+        return None
+
+
+def probe_cameras(indexes, use_dshow=False):
+    """
+    여러 카메라 인덱스를 병렬로 검사합니다.
+
+    Returns:
+        index -> 검사 결과 딕셔너리 (열 수 없는 인덱스는 제외)
+    """
+    if not indexes:
+        return {}
+    workers = min(PROBE_WORKERS, len(indexes))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(lambda index: probe_camera(index, use_dshow), indexes)
+    return {result["index"]: result for result in results if result is not None}
+
+
+def discover_cameras(system=None):
+    """
+    사용 가능한 카메라를 찾아 장치 목록을 만듭니다.
+    리눅스에서는 sysfs로 후보를 추린 뒤 후보만 병렬로 열어보고,
+    그 외 운영체제에서는 0~9번 인덱스를 병렬로 열어봅니다.
+
+    Returns:
+        장치 정보 딕셔너리 목록
+    """
+    if system is None:
+        system = platform.system().lower()
+
+    if system == "linux" and os.path.isdir(V4L2_SYSFS_DIR):
+        candidates = enumerate_v4l2_devices()
+    else:
+        candidates = [
+            {
+                "id": f"{system}-index:{index}",
+                "index": index,
+                "name": "",
+                "device": str(index),
+                "bus": None,
+            }
+            for index in range(MAX_PROBE_INDEX)
+        ]
+
+    probed = probe_cameras(
+        [candidate["index"] for candidate in candidates],
+        use_dshow=system == "windows",
+    )
+
+    devices = []
+    for candidate in candidates:
+        result = probed.get(candidate["index"])
+        if result is None:
+            continue
+        device = dict(candidate)
+        device.update(
+            resolution=result["resolution"],
+            capture_success=result["capture_success"],
+        )
+        if not device["name"]:
+            device["name"] = result["backend"]
+        devices.append(device)
+    return devices
+
+
+def build_inventory(system=None):
+    """카메라 장치 목록을 새로 만들고 캐시에 저장할 형태로 반환합니다."""
+    start = time.monotonic()
+    devices = discover_cameras(system)
+    print(
+        f"카메라 장치 검색 완료: {len(devices)}개 ({time.monotonic() - start:.2f}초)"
+    )
+    return {
+        "updated_at": time.time(),
+        "signature": hotplug_signature(),
+        "devices": devices,
+    }
+
+
+def inventory_is_fresh(inventory, ttl=INVENTORY_TTL):
+    """
+    캐시된 장치 목록을 그대로 써도 되는지 확인합니다.
+    TTL이 지났거나 장치가 연결/해제되었으면 False입니다.
+    """
+    if not inventory or "devices" not in inventory:
+        return False
+    if time.time() - inventory.get("updated_at", 0) > ttl:
+        return False
+    return inventory.get("signature") == hotplug_signature()
+
+
+def find_device(inventory, camera_id):
+    """안정 ID로 장치 목록에서 카메라를 찾습니다 (없으면 None)."""
+    for device in (inventory or {}).get("devices", []):
+        if device["id"] == camera_id:
+            return device
+    return None
+
@@ -0,0 +1,230 @@
+import threading
+import time
+from collections import deque, namedtuple
+
+from utils.frame_source import FRAME_SOURCE, EndOfStream, open_frame_source
+
+# 캡처된 프레임 한 장 (frame_id는 버스마다 1부터 단조 증가, timestamp는 time.monotonic 기준 캡처 시각)
+FramePacket = namedtuple("FramePacket", ["frame_id", "timestamp", "frame"])
+
+# 카메라 열기/읽기 실패 시 재시도 전 대기 시간(초)
+CAPTURE_RETRY_DELAY = 1.0
+# 파일 재생 시 무손실 구독자마다 쌓아 둘 최대 프레임 수 (가득 차면 캡처 스레드가 대기)
+REPLAY_QUEUE_SIZE = 8
+
+
+class FrameSubscription:
+    """
+    프레임 버스 구독 핸들. 구독자마다 마지막으로 받은 frame_id를 따로 기억합니다.
+    무손실 구독자는 파일 재생 중에 받지 않은 프레임을 대기열에 따로 보관합니다.
+    """
+
+    def __init__(self, bus, lossless=False):
+        self._bus = bus
+        self._last_id = 0
+        self.lossless = lossless
+        # 파일 재생 중 아직 읽지 않은 프레임 (무손실 구독자만, self._bus._cond로 보호)
+        self._pending = deque()
+        self.closed = False
+
+    def read(self, timeout=None):
+        """
+        아직 받지 않은 가장 최신 프레임을 반환합니다.
+        느린 구독자는 중간 프레임을 건너뛰고 항상 최신 프레임만 받습니다.
+        단, 파일 재생 중인 무손실 구독자는 모든 프레임을 순서대로 받습니다.
+
+        Args:
+            timeout: 새 프레임을 기다릴 최대 시간(초), None이면 무한 대기
+
+        Returns:
+            FramePacket, 시간 내에 새 프레임이 없으면 None
+        """
+        packet = self._bus.wait_for_frame(
+            self._last_id, timeout, self._pending if self.lossless else None
+        )
+        if packet is not None:
+            self._last_id = packet.frame_id
+        return packet
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self._bus._unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class FrameBus:
+    """
+    프레임 공급원(물리 카메라, 동영상 파일 등) 하나당 캡처 스레드 하나를 두고,
+    타임스탬프가 찍힌 프레임을 여러 구독자(인원 추적기, 스트림 시청자 등)에게 배포합니다.
+    구독자가 하나도 없으면 캡처 스레드가 종료되고 카메라를 해제합니다.
+
+    카메라는 최신 프레임만 배포하지만, 파일을 빠르게 재생할 때(FrameSource.replay)는
+    무손실 구독자가 모든 프레임을 받을 때까지 캡처 스레드가 기다립니다 (재현 가능한 재생).
+    """
+
+    def __init__(self, source=""):
+        self.source = source
+        # 파일/디렉토리 재생이 끝났는지 여부
+        self.ended = False
+        # 현재 공급원이 파일 재생(FrameSource.replay)인지 여부
+        self.replay = False
+        self._cond = threading.Condition()
+        self._latest = None
+        self._next_id = 0
+        self._subscribers = 0
+        self._lossless = set()
+        self._thread = None
+
+    def subscribe(self, lossless=False):
+        """
+        버스를 구독하고, 필요하면 캡처 스레드를 시작합니다.
+
+        Args:
+            lossless: True이면 파일 재생 중 프레임을 건너뛰지 않고 모두 받음
+                      (카메라처럼 실시간 공급원에서는 일반 구독과 같음)
+
+        Returns:
+            FrameSubscription 객체 (사용 후 close() 또는 with 문으로 해제)
+        """
+        subscription = FrameSubscription(self, lossless)
+        with self._cond:
+            self._subscribers += 1
+            if lossless:
+                self._lossless.add(subscription)
+            if self._thread is None:
+                self.ended = False
+                self._start_capture_thread()
+        return subscription
+
+    def _start_capture_thread(self):
+        # self._cond를 잡은 상태에서 호출해야 합니다
+        self._thread = threading.Thread(
+            target=self._capture_loop, name=f"frame-bus-{self.source}"
+        )
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _unsubscribe(self, subscription):
+        with self._cond:
+            self._subscribers -= 1
+            self._lossless.discard(subscription)
+            self._cond.notify_all()
+
+    @property
+    def subscriber_count(self):
+        with self._cond:
+            return self._subscribers
+
+    def latest(self):
+        """가장 최근에 캡처된 FramePacket을 기다리지 않고 반환합니다 (없으면 None)."""
+        with self._cond:
+            return self._latest
+
+    def wait_for_frame(self, last_id, timeout=None, pending=None):
+        """
+        frame_id가 last_id보다 큰 프레임이 들어올 때까지 기다립니다.
+
+        Args:
+            pending: 무손실 구독자의 프레임 대기열 (있으면 최신 프레임보다 먼저 꺼냄)
+
+        Returns:
+            가장 최신 FramePacket, 시간 초과 또는 재생이 끝난 경우 None
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._latest is None or self._latest.frame_id <= last_id:
+                if pending:
+                    break
+                if self.ended:
+                    return None
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+            if pending:
+                # 대기열에 자리가 났으므로 기다리던 캡처 스레드를 깨움
+                self._cond.notify_all()
+                return pending.popleft()
+            return self._latest
+
+    def _publish(self, frame, timestamp):
+        with self._cond:
+            if self.replay:
+                # 파일 재생은 무손실 구독자의 대기열에 자리가 날 때까지 기다림
+                while any(
+                    len(subscription._pending) >= REPLAY_QUEUE_SIZE
+                    for subscription in self._lossless
+                ):
+                    self._cond.wait()
+            self._next_id += 1
+            self._latest = FramePacket(self._next_id, timestamp, frame)
+            if self.replay:
+                for subscription in self._lossless:
+                    subscription._pending.append(self._latest)
+            self._cond.notify_all()
+
+    def _capture_loop(self):
+        source = None
+        print(f"프레임 버스 캡처 시작 (공급원: {self.source or '웹캠'})")
+        try:
+            while self.subscriber_count > 0:
+                try:
+                    if source is None:
+                        source = open_frame_source(self.source)
+                        source.open()
+                        with self._cond:
+                            self.replay = source.replay
+                    self._publish(*source.read())
+                except EndOfStream:
+                    print(f"프레임 공급원 재생 완료: {source.name}")
+                    with self._cond:
+                        self.ended = True
+                        self._cond.notify_all()
+                    break
+                except Exception as e:
+                    print(f"프레임 버스 캡처 중 오류 발생: {e}")
+                    if source is not None:
+                        source.release()
+                        source = None
+                    time.sleep(CAPTURE_RETRY_DELAY)
+        finally:
+            if source is not None:
+                source.release()
+            print(f"프레임 버스 캡처 종료 (공급원: {self.source or '웹캠'})")
+            with self._cond:
+                self._thread = None
+                self._latest = None
+                # 종료 중에 새 구독자가 들어왔다면 캡처를 다시 시작
+                if self._subscribers > 0 and not self.ended:
+                    self._start_capture_thread()
+
+
+# 공급원별 프레임 버스 (같은 카메라는 항상 같은 버스를 공유)
+_buses = {}
+_buses_lock = threading.Lock()
+
+
+def get_frame_bus(source=None):
+    """
+    프레임 공급원에 해당하는 공유 프레임 버스를 반환합니다.
+
+    Args:
+        source: 프레임 공급원 지정 문자열 (None이면 FRAME_SOURCE 환경변수,
+                비어 있으면 운영체제 기본 카메라, utils.frame_source.open_frame_source 참고)
+
+    Returns:
+        FrameBus 객체
+    """
+    key = str(FRAME_SOURCE if source is None else source).strip()
+    with _buses_lock:
+        bus = _buses.get(key)
+        if bus is None:
+            bus = FrameBus(key)
+            _buses[key] = bus
+        return bus
@@ -0,0 +1,253 @@
+import cv2
+import glob
+import numpy as np
+import os
+import time
+
+from utils.camera import initialize_camera, read_frame
+
+# 프레임 공급원 지정 (비워두면 웹캠, 숫자면 카메라 인덱스, rtsp/http URL, 동영상 파일, 이미지 디렉토리,
+# synthetic 또는 synthetic:1280x720 형식이면 카메라 없이 생성한 프레임)
+FRAME_SOURCE = os.environ.get("FRAME_SOURCE", "")
+# 파일/디렉토리 재생 속도: true이면 원래 FPS로, false이면 가능한 한 빠르게
+FRAME_SOURCE_REALTIME = (
+    os.environ.get("FRAME_SOURCE_REALTIME", "true").lower() != "false"
+)
+# 파일/디렉토리 끝에 도달하면 처음부터 다시 재생
+FRAME_SOURCE_LOOP = os.environ.get("FRAME_SOURCE_LOOP", "false").lower() == "true"
+# 이미지 디렉토리를 실시간 재생할 때의 FPS
+IMAGE_DIRECTORY_FPS = float(os.environ.get("IMAGE_DIRECTORY_FPS", "1.0"))
+
+# 이미지 디렉토리에서 읽을 확장자
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+class EndOfStream(Exception):
+    """동영상 파일이나 이미지 디렉토리의 마지막 프레임까지 읽은 경우"""
+
+
+class FrameSource:
+    """
+    프레임 공급원의 공통 인터페이스.
+    read()는 (프레임, 캡처 시각(time.monotonic 기준))을 반환합니다.
+    """
+
+    name = "source"
+    # 원래 속도와 관계없이 파일을 끝까지 재생하는 공급원인지 여부
+    # (True이면 프레임 버스가 프레임을 버리지 않고 무손실 구독자에게 모두 전달)
+    replay = False
+
+    def open(self):
+        pass
+
+    def read(self):
+        raise NotImplementedError
+
+    def release(self):
+        pass
+
+
+class _Pacer:
+    # 실시간 재생 시 프레임 간격을 원본 FPS에 맞춤
+    def __init__(self, fps, realtime):
+        self.interval = 1.0 / fps if realtime and fps and fps > 0 else 0.0
+        self._next = None
+
+    def wait(self):
+        if not self.interval:
+            return
+        now = time.monotonic()
+        if self._next is not None and self._next > now:
+            time.sleep(self._next - now)
+            now = self._next
+        self._next = now + self.interval
+
+
+class WebcamSource(FrameSource):
+    """로컬 USB/내장 웹캠 (utils.camera의 초기화/읽기 로직 사용)"""
+
+    def __init__(self, index=None):
+        self.index = index
+        self.name = f"webcam:{index if index is not None else 'auto'}"
+        self._cap = None
+
+    def open(self):
+        self._cap = initialize_camera(self.index)
+
+    def read(self):
+        return read_frame(self._cap)
+
+    def release(self):
+        if self._cap is not None:
+            self._cap.release()
+            self._cap = None
+
+
+class VideoFileSource(FrameSource):
+    """녹화된 동영상 파일 재생"""
+
+    def __init__(self, path, realtime=True, loop=False):
+        self.path = path
+        self.name = f"file:{path}"
+        self.realtime = realtime
+        self.replay = not realtime
+        self.loop = loop
+        self._cap = None
+        self._pacer = None
+
+    def open(self):
+        self._cap = cv2.VideoCapture(self.path)
+        if not self._cap.isOpened():
+            raise RuntimeError(f"동영상 파일을 열 수 없습니다: {self.path}")
+        self._pacer = _Pacer(self._cap.get(cv2.CAP_PROP_FPS), self.realtime)
+
+    def read(self):
+        self._pacer.wait()
+        success, frame = self._cap.read()
+        if not success and self.loop:
+            self._cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            success, frame = self._cap.read()
+        if not success:
+            raise EndOfStream(self.path)
+        return frame, time.monotonic()
+
+    def release(self):
+        if self._cap is not None:
+            self._cap.release()
+            self._cap = None
+
+
+class StreamUrlSource(FrameSource):
+    """RTSP/HTTP IP 카메라 스트림"""
+
+    def __init__(self, url):
+        self.url = url
+        self.name = f"url:{url}"
+        self._cap = None
+
+    def open(self):
+        self._cap = cv2.VideoCapture(self.url, cv2.CAP_FFMPEG)
+        if not self._cap.isOpened():
+            raise RuntimeError(f"스트림에 연결할 수 없습니다: {self.url}")
+        # 네트워크 스트림도 오래된 프레임이 쌓이지 않도록 버퍼 최소화
+        self._cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
+    def read(self):
+        success, frame = self._cap.read()
+        if not success or frame is None:
+            raise RuntimeError(f"스트림에서 프레임을 읽을 수 없습니다: {self.url}")
+        return frame, time.monotonic()
+
+    def release(self):
+        if self._cap is not None:
+            self._cap.release()
+            self._cap = None
+
+
+class ImageDirectorySource(FrameSource):
+    """디렉토리의 이미지 파일을 이름 순서대로 재생"""
+
+    def __init__(self, path, fps=1.0, realtime=True, loop=False):
+        self.path = path
+        self.name = f"images:{path}"
+        self.loop = loop
+        self.replay = not realtime
+        self._pacer = _Pacer(fps, realtime)
+        self._files = []
+        self._position = 0
+
+    def open(self):
+        self._files = sorted(
+            file
+            for file in glob.glob(os.path.join(self.path, "*"))
+            if file.lower().endswith(IMAGE_EXTENSIONS)
+        )
+        if not self._files:
+            raise RuntimeError(f"이미지 파일이 없습니다: {self.path}")
+        self._position = 0
+
+    def read(self):
+        if self._position >= len(self._files):
+            if not self.loop:
+                raise EndOfStream(self.path)
+            self._position = 0
+        self._pacer.wait()
+        file = self._files[self._position]
+        self._position += 1
+        frame = cv2.imread(file)
+        if frame is None:
+            raise RuntimeError(f"이미지를 읽을 수 없습니다: {file}")
+        return frame, time.monotonic()
+
+
+class SyntheticSource(FrameSource):
+    """카메라 없이 벤치마크/CI용 프레임을 생성 (미리 만든 몇 장을 순환)"""
+
+    def __init__(self, width=1280, height=720, fps=30.0, realtime=True):
+        self.name = f"synthetic:{width}x{height}"
+        self.width = width
+        self.height = height
+        self._pacer = _Pacer(fps, realtime)
+        self._frames = []
+        self._position = 0
+
+    def open(self):
+        rng = np.random.default_rng(0)
+        self._frames = []
+        for i in range(8):
+            frame = rng.integers(0, 256, (self.height, self.width, 3), dtype=np.uint8)
+            # 프레임 간 차이가 생기도록 움직이는 사각형 추가
+            x = (i * self.width // 8) % max(1, self.width - 100)
+            cv2.rectangle(
+                frame,
+                (x, self.height // 4),
+                (x + 100, self.height // 2),
+                (255, 255, 255),
+                -1,
+            )
+            self._frames.append(frame)
+        self._position = 0
+
+    def read(self):
+        self._pacer.wait()
+        frame = self._frames[self._position % len(self._frames)]
+        self._position += 1
+        return frame, time.monotonic()
+
+
+def open_frame_source(spec=None, realtime=None, loop=None):
+    """
+    지정 문자열로 프레임 공급원을 만듭니다 (아직 열지 않은 상태).
+
+    Args:
+        spec: 비어 있으면 웹캠 자동 선택, 숫자면 카메라 인덱스,
+              rtsp:// 또는 http(s):// 이면 IP 카메라, 디렉토리면 이미지 디렉토리,
+              synthetic[:WxH]이면 생성 프레임, 그 외에는 동영상 파일 경로
+              (None이면 FRAME_SOURCE 환경변수 사용)
+        realtime: 파일/디렉토리를 원래 속도로 재생할지 여부 (None이면 환경변수 사용)
+        loop: 파일/디렉토리를 반복 재생할지 여부 (None이면 환경변수 사용)
+
+    Returns:
+        FrameSource 객체
+    """
+    if spec is None:
+        spec = FRAME_SOURCE
+    if realtime is None:
+        realtime = FRAME_SOURCE_REALTIME
+    if loop is None:
+        loop = FRAME_SOURCE_LOOP
+
+    spec = str(spec).strip()
+    if not spec:
+        return WebcamSource()
+    if spec == "synthetic" or spec.startswith("synthetic:"):
+        size = spec.partition(":")[2] or "1280x720"
+        width, height = (int(value) for value in size.lower().split("x"))
+        return SyntheticSource(width, height, realtime=realtime)
+    if spec.isdigit():
+        return WebcamSource(int(spec))
+    if spec.startswith(("rtsp://", "rtsps://", "http://", "https://")):
+        return StreamUrlSource(spec)
+    if os.path.isdir(spec):
+        return ImageDirectorySource(spec, IMAGE_DIRECTORY_FPS, realtime, loop)
+    return VideoFileSource(spec, realtime, loop)
@@ -0,0 +1,66 @@
+import threading
+import time
+from contextlib import contextmanager
+
+# 프로세스 시작 시점 (main.py가 가장 먼저 import하므로 기동 시각으로 사용)
+PROCESS_START = time.monotonic()
+
+_phases = []
+_lock = threading.Lock()
+
+
+@contextmanager
+def startup_phase(name):
+    """
+    기동 단계 하나의 소요 시간을 측정하여 기록합니다.
+
+    Args:
+        name: 단계 이름 (예: "import:routers.vision", "vision:model_load")
+    """
+    start = time.monotonic()
+    try:
+        yield
+    finally:
+        record_phase(name, time.monotonic() - start, start)
+
+
+def record_phase(name, duration, start=None):
+    """
+    기동 단계의 소요 시간을 기록하고 로그로 출력합니다.
+
+    Args:
+        name: 단계 이름
+        duration: 소요 시간(초)
+        start: 단계 시작 시각 (time.monotonic 기준, None이면 지금 끝난 것으로 간주)
+    """
+    if start is None:
+        start = time.monotonic() - duration
+    with _lock:
+        _phases.append(
+            {
+                "phase": name,
+                "started_at": round(start - PROCESS_START, 3),
+                "duration": round(duration, 3),
+            }
+        )
+    print(f"[기동] {name}: {duration * 1000:.0f}ms")
+
+
+def mark(name):
+    """프로세스 시작부터 지금까지 걸린 시간을 하나의 단계로 기록합니다."""
+    record_phase(name, time.monotonic() - PROCESS_START, PROCESS_START)
+
+
+def get_startup_report():
+    """
+    지금까지 기록된 기동 단계별 소요 시간을 반환합니다.
+
+    Returns:
+        프로세스 가동 시간과 단계 목록(시작 순)을 담은 딕셔너리
+    """
+    with _lock:
+        phases = sorted(_phases, key=lambda phase: phase["started_at"])
+    return {
+        "uptime": round(time.monotonic() - PROCESS_START, 3),
+        "phases": phases,
+    }
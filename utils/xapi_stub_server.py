@@ -0,0 +1,210 @@
+"""
+시스코 디바이스 xAPI 스텁 서버 (실제 디바이스 없이 화상통화 발신 경로를 시험할 때 사용).
+
+/xmlapi/session/begin, /putxml, /getxml을 흉내 내고 받은 명령을 출력합니다.
+
+사용 예:
+    python -m utils.xapi_stub_server --port 8443 --username admin --password secret
+    # 다른 터미널에서
+    DEVICE_IP=127.0.0.1:8443 DEVICE_SCHEME=http DEVICE_USERNAME=admin \\
+        DEVICE_PASSWORD=secret python main.py
+
+--cert/--key를 지정하면 HTTPS로 동작합니다.
+"""
+
+import argparse
+import base64
+import secrets
+import ssl
+import threading
+import xml.etree.ElementTree as ET
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class StubDevice:
+    """스텁 디바이스의 상태 (진행 중인 통화, 감지된 인원 수 등)"""
+
+    def __init__(self, username, password, people=0):
+        self.username = username
+        self.password = password
+        self.people = people
+        self.sessions = set()
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def status_xml(self, location):
+        with self.lock:
+            calls = "".join(
+                f'<Call item="{index}"><RemoteNumber>{number}</RemoteNumber>'
+                f"<Status>Connected</Status></Call>"
+                for index, number in enumerate(self.calls, start=1)
+            )
+            people = self.people
+            active_calls = len(self.calls)
+        status = ET.fromstring(
+            "<Status>"
+            f"{calls}"
+            "<SystemUnit><State>"
+            f"<NumberOfActiveCalls>{active_calls}</NumberOfActiveCalls>"
+            "</State></SystemUnit>"
+            "<RoomAnalytics><PeopleCount>"
+            f"<Current>{people}</Current>"
+            "</PeopleCount><PeoplePresence>"
+            f"{'Yes' if people > 0 else 'No'}"
+            "</PeoplePresence></RoomAnalytics>"
+            "</Status>"
+        )
+        # location 경로에 해당하는 부분만 남김 (예: /Status/RoomAnalytics/PeopleCount)
+        parts = [part for part in location.strip("/").split("/") if part]
+        if not parts or parts[0] != "Status":
+            return None
+        node = status
+        for part in parts[1:]:
+            node = node.find(part)
+            if node is None:
+                return None
+        # 조회한 요소를 상위 경로 요소로 감싸서 반환
+        for part in reversed(parts[1:-1]):
+            wrapper = ET.Element(part)
+            wrapper.append(node)
+            node = wrapper
+        if len(parts) > 1:
+            root = ET.Element("Status")
+            root.append(node)
+            node = root
+        return ET.tostring(node, encoding="unicode")
+
+
+def make_handler(device):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send(self, status, body="", headers=None):
+            data = body.encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "text/xml")
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _basic_auth_ok(self):
+            header = self.headers.get("Authorization", "")
+            if not header.startswith("Basic "):
+                return False
+            expected = f"{device.username}:{device.password}".encode()
+            return base64.b64decode(header[6:]) == expected
+
+        def _authorized(self):
+            cookies = self.headers.get("Cookie", "")
+            for cookie in cookies.split(";"):
+                name, _, value = cookie.strip().partition("=")
+                if name == "SessionId" and value in device.sessions:
+                    return True
+            return self._basic_auth_ok()
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            body = self.rfile.read(length).decode() if length else ""
+            path = urlparse(self.path).path
+
+            if path == "/xmlapi/session/begin":
+                if not self._basic_auth_ok():
+                    return self._send(401)
+                session_id = secrets.token_hex(16)
+                device.sessions.add(session_id)
+                return self._send(
+                    204, headers={"Set-Cookie": f"SessionId={session_id}; Path=/"}
+                )
+
+            if path != "/putxml":
+                return self._send(404)
+            if not self._authorized():
+                return self._send(401)
+
+            try:
+                command = ET.fromstring(body)
+            except ET.ParseError:
+                return self._send(400)
+            dial = command.find("Dial")
+            if command.tag == "Command" and dial is not None:
+                number = dial.findtext("Number", "")
+                with device.lock:
+                    device.calls.append(number)
+                    call_id = len(device.calls)
+                print(f"[스텁] Dial 명령 수신: {number}")
+                return self._send(
+                    200,
+                    '<?xml version="1.0"?><Command><DialResult status="OK">'
+                    f"<CallId>{call_id}</CallId><ConferenceId>{call_id}</ConferenceId>"
+                    "</DialResult></Command>",
+                )
+            print(f"[스텁] 지원하지 않는 명령: {body}")
+            return self._send(
+                200,
+                '<?xml version="1.0"?><Command><Result status="Error">'
+                "<Reason>Unknown command</Reason></Result></Command>",
+            )
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path != "/getxml":
+                return self._send(404)
+            if not self._authorized():
+                return self._send(401)
+            location = parse_qs(url.query).get("location", ["/Status"])[0]
+            xml = device.status_xml(location)
+            if xml is None:
+                return self._send(
+                    200,
+                    '<?xml version="1.0"?><Status><Result status="Error">'
+                    "<Reason>No match on address expression</Reason></Result></Status>",
+                )
+            return self._send(200, '<?xml version="1.0"?>' + xml)
+
+        def log_message(self, format, *args):
+            print(f"[스텁] {self.address_string()} {format % args}")
+
+    return Handler
+
+
+def serve(host="127.0.0.1", port=8443, device=None, certfile=None, keyfile=None):
+    """
+    스텁 서버를 만들어 반환합니다 (serve_forever()는 호출하는 쪽에서 실행).
+    """
+    if device is None:
+        device = StubDevice("admin", "")
+    server = ThreadingHTTPServer((host, port), make_handler(device))
+    if certfile:
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(certfile, keyfile)
+        server.socket = context.wrap_socket(server.socket, server_side=True)
+    server.device = device
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="시스코 디바이스 xAPI 스텁 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8443)
+    parser.add_argument("--username", default="admin")
+    parser.add_argument("--password", default="")
+    parser.add_argument("--people", type=int, default=0, help="보고할 인원 수")
+    parser.add_argument("--cert", help="HTTPS 인증서 파일")
+    parser.add_argument("--key", help="HTTPS 개인 키 파일")
+    args = parser.parse_args()
+
+    device = StubDevice(args.username, args.password, args.people)
+    server = serve(args.host, args.port, device, args.cert, args.key)
+    scheme = "https" if args.cert else "http"
+    print(f"xAPI 스텁 서버 시작: {scheme}://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("xAPI 스텁 서버 종료")
+
+
+if __name__ == "__main__":
+    main()